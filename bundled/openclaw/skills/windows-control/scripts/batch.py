@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch - Run many actions in one invocation, sharing the desktop and resolved windows
+Usage: py batch.py steps.jsonl              # JSON lines (one action per line)
+       py batch.py steps.yaml               # YAML list (needs PyYAML)
+       py batch.py < steps.jsonl            # Read actions from stdin
+       py batch.py steps.jsonl --keep-going # Don't stop at the first failed step
+       py batch.py steps.jsonl --timeout 10 # Default per-step timeout (seconds)
+
+Each step is an object with an "action" plus its arguments:
+    {"action": "key_press", "keys": "win"}
+    {"action": "type_text", "text": "notepad"}
+    {"action": "key_press", "keys": "enter"}
+    {"action": "wait_for_window", "window": "Notepad", "timeout": 10}
+    {"action": "wait", "any": [{"window": "Save As"}, {"dialog": true}], "timeout": 10}
+    {"action": "click_element", "name": "File", "window": "Notepad", "type": "MenuItem"}
+    {"action": "wait_screen", "until": "stable", "window": "Notepad", "stable_ms": 500}
+    {"action": "click_element", "id": "65568:42.65568.4.9"}   # id from read/list output
+    {"action": "dialog_click", "button": "Save"}
+    {"action": "read_window", "window": "Notepad"}
+    {"script": "read_ui_elements", "argv": ["Notepad", "--json"]}
+
+Optional per-step keys: "timeout" (seconds), "continue_on_error" (bool).
+Prints one JSON result per step: {"step", "action", "ok", "message", "ms", ...}
+"""
+import sys
+import json
+import time
+import argparse
+import concurrent.futures
+
+from wincontrol import get_backend
+from wincontrol.backend import init_com_thread
+from wincontrol.screenwait import wait_screen
+from wincontrol.waits import text_in_window, wait_for, window_exists
+from wincontrol.windows import find_window
+
+import click_element
+import close_window
+import focus_window
+import handle_dialog
+import key_press
+import maximize_window
+import minimize_window
+import read_window
+import type_text
+import wait_for_window
+
+
+class StepError(Exception):
+    """A step could not run (bad arguments, window not found)."""
+
+
+class Session:
+    """Desktop handle shared by all steps of a batch.
+
+    Resolved windows are shared through the process-wide window index, so
+    later steps targeting the same window only re-check the z-order above it.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def window(self, title):
+        """Resolve a window filter or raise StepError."""
+        window = find_window(self.backend, title)
+        if window is None:
+            raise StepError(f"Window containing '{title}' not found")
+        return window
+
+
+def require(step, key):
+    if step.get(key) in (None, ''):
+        raise StepError(f"'{key}' is required")
+    return step[key]
+
+
+def step_click(session, step):
+    x, y = int(require(step, 'x')), int(require(step, 'y'))
+    button = step.get('button', 'left')
+    clicks = int(step.get('clicks', 1))
+    session.backend.input().click(x, y, clicks=clicks, button=button)
+    return True, f"Clicked {button} button at ({x}, {y}) {clicks} time(s)", None
+
+
+def step_key_press(session, step):
+    keys = require(step, 'keys')
+    key_press.press_keys(keys)
+    return True, f"Pressed: {keys}", None
+
+
+def step_type_text(session, step):
+    text = require(step, 'text')
+    type_text.type_text(text)
+    return True, f"Typed: {text}", None
+
+
+def step_focus_window(session, step):
+    window = session.window(require(step, 'window'))
+    return True, f"Focused: {focus_window.focus(window)}", None
+
+
+def step_close_window(session, step):
+    window = session.window(require(step, 'window'))
+    return True, f"Closed: {close_window.close(window)}", None
+
+
+def step_maximize_window(session, step):
+    return True, maximize_window.maximize(session.window(require(step, 'window'))), None
+
+
+def step_minimize_window(session, step):
+    return True, minimize_window.minimize(session.window(require(step, 'window'))), None
+
+
+def step_wait_for_window(session, step):
+    title = require(step, 'window')
+    window = wait_for_window.wait_for_window(session.backend, title, float(step.get('timeout', 30)))
+    if window is None:
+        return False, f"Timeout: Window '{title}' not found", None
+    return True, f"Found window '{window.window_text()}'", None
+
+
+def wait_condition(spec):
+    """{"window": t} | {"text": s, "window": t} | {"dialog": t or true} -> Condition."""
+    if not isinstance(spec, dict):
+        raise StepError("Wait conditions must be objects")
+    if 'dialog' in spec:
+        title = spec['dialog']
+        return handle_dialog.dialog_open(title if isinstance(title, str) else None)
+    if 'text' in spec:
+        return text_in_window(spec['text'], require(spec, 'window'))
+    return window_exists(require(spec, 'window'))
+
+
+def step_wait(session, step):
+    mode = 'all' if 'all' in step else 'any'
+    specs = step.get(mode)
+    if not isinstance(specs, list) or not specs:
+        raise StepError(f"'{mode}' must be a non-empty list of conditions")
+    conditions = [wait_condition(spec) for spec in specs]
+    result = wait_for(session.backend, conditions, mode=mode, timeout=float(step.get('timeout', 30)))
+    met = [c.label for c in result.met(conditions)]
+    if not result.ok:
+        missing = [c.label for c in conditions if c.label not in met]
+        return False, f"Timeout: {', '.join(missing)} not met", {'met': met}
+    return True, f"Met {', '.join(met)} after {result.elapsed:.1f}s", {'met': met}
+
+
+def step_wait_screen(session, step):
+    window = session.window(step['window']) if step.get('window') else None
+    result = wait_screen(region=step.get('region'), window=window, until=step.get('until', 'change'),
+                         stable=float(step.get('stable_ms', 500)) / 1000,
+                         interval=float(step.get('interval_ms', 100)) / 1000,
+                         timeout=float(step.get('timeout', 10)), ignore=int(step.get('ignore', 0)))
+    data = {'elapsed': round(result.elapsed, 3), 'frames': result.frames}
+    if not result.ok:
+        return False, f"Timeout: screen did not {'change' if result.until == 'change' else 'settle'}", data
+    return True, f"Screen {'changed' if result.until == 'change' else 'stable'} after {result.elapsed:.2f}s", data
+
+
+def step_read_window(session, step):
+    window = session.window(require(step, 'window'))
+    texts = read_window.read_text(window)
+    return True, f"Read {len(texts)} text item(s)", {'text': texts}
+
+
+def step_click_element(session, step):
+    if step.get('id'):
+        ok, msg = click_element.click_by_id(session.backend, step['id'])
+        return ok, msg, None
+    name = require(step, 'name')
+    windows = [session.window(step['window'])] if step.get('window') else None
+    ok, msg = click_element.find_and_click(
+        session.backend, name,
+        control_type=step.get('type'),
+        exact=bool(step.get('exact')),
+        fuzzy=bool(step.get('fuzzy')),
+        windows=windows,
+        ambiguity=bool(step.get('ambiguous'))
+    )
+    return ok, msg, None
+
+
+def dialog_target(session, step):
+    if step.get('window'):
+        return session.window(step['window'])
+    target = handle_dialog.find_target(session.backend)
+    if target is None:
+        raise StepError("No dialog found")
+    return target
+
+
+def step_dialog_click(session, step):
+    if step.get('id'):
+        ok, msg = handle_dialog.click_by_id(step['id'])
+        return ok, msg, None
+    ok, msg = handle_dialog.click_button(dialog_target(session, step), require(step, 'button'))
+    return ok, msg, None
+
+
+def step_dialog_type(session, step):
+    if step.get('id'):
+        ok, msg = handle_dialog.type_by_id(step['id'], require(step, 'text'))
+        return ok, msg, None
+    target = dialog_target(session, step)
+    field = step.get('field')
+    ok, msg = handle_dialog.type_in_field(target, require(step, 'text'),
+                                          int(field) if field is not None else None)
+    return ok, msg, None
+
+
+def step_dialog_dismiss(session, step):
+    ok, msg = handle_dialog.dismiss_dialog(dialog_target(session, step))
+    return ok, msg, None
+
+
+def step_sleep(session, step):
+    seconds = float(step.get('seconds', 0.5))
+    time.sleep(seconds)
+    return True, f"Slept {seconds}s", None
+
+
+def step_script(session, step):
+    """Run any other script in-process and capture its output."""
+    from wincontrol.server import run_script
+    argv = [str(a) for a in step.get('argv', [])]
+    result = run_script(require(step, 'script'), argv)
+    output = result['stdout'].rstrip('\n')
+    if result['stderr'].strip():
+        output = (output + '\n' + result['stderr'].rstrip('\n')).strip('\n')
+    return result['code'] == 0, output, {'code': result['code']}
+
+
+ACTIONS = {
+    'click': step_click,
+    'key_press': step_key_press,
+    'type_text': step_type_text,
+    'focus_window': step_focus_window,
+    'close_window': step_close_window,
+    'maximize_window': step_maximize_window,
+    'minimize_window': step_minimize_window,
+    'wait_for_window': step_wait_for_window,
+    'wait': step_wait,
+    'wait_screen': step_wait_screen,
+    'read_window': step_read_window,
+    'click_element': step_click_element,
+    'dialog_click': step_dialog_click,
+    'dialog_type': step_dialog_type,
+    'dialog_dismiss': step_dialog_dismiss,
+    'sleep': step_sleep,
+}
+
+
+def parse_steps(text, fmt=None):
+    """Parse a JSON-lines, JSON array or YAML action list."""
+    stripped = text.strip()
+    if not stripped:
+        return []
+    if fmt != 'yaml':
+        if stripped.startswith('['):
+            return json.loads(stripped)
+        try:
+            return [json.loads(line) for line in stripped.splitlines()
+                    if line.strip() and not line.lstrip().startswith('#')]
+        except ValueError:
+            if fmt == 'json':
+                raise
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("Input is not JSON lines and PyYAML is not installed for YAML input")
+    steps = yaml.safe_load(stripped)
+    if isinstance(steps, dict):
+        steps = steps.get('steps', [])
+    return steps or []
+
+
+def run_step(session, step):
+    if 'script' in step and 'action' not in step:
+        return step_script(session, step)
+    action = step.get('action')
+    handler = ACTIONS.get(action)
+    if handler is None:
+        raise StepError(f"Unknown action '{action}'")
+    return handler(session, step)
+
+
+def run_batch(steps, timeout=None, stop_on_error=True, emit=None):
+    """Run steps in order on one worker thread. Returns the list of step results."""
+    session = None
+    results = []
+    executor = None
+    failed = False
+
+    def new_executor():
+        # Steps run on this worker; it joins the COM apartment shared with the caller
+        return concurrent.futures.ThreadPoolExecutor(max_workers=1, initializer=init_com_thread)
+
+    try:
+        executor = new_executor()
+        for i, step in enumerate(steps):
+            name = step.get('action') or step.get('script') if isinstance(step, dict) else None
+            result = {'step': i, 'action': name}
+            if failed:
+                result.update(ok=False, skipped=True, message="Skipped after earlier failure", ms=0.0)
+                results.append(result)
+                if emit:
+                    emit(result)
+                continue
+
+            step_timeout = step.get('timeout', timeout) if isinstance(step, dict) else timeout
+            if isinstance(step, dict) and step.get('action') in ('wait_for_window', 'wait', 'wait_screen') and 'timeout' in step:
+                # The wait's own timeout is its budget; give it a little headroom
+                step_timeout = float(step['timeout']) + 5
+            start = time.perf_counter()
+            try:
+                if not isinstance(step, dict):
+                    raise StepError("Step must be an object")
+                if session is None:
+                    session = executor.submit(lambda: Session(get_backend())).result()
+                future = executor.submit(run_step, session, step)
+                ok, message, data = future.result(timeout=step_timeout)
+            except concurrent.futures.TimeoutError:
+                ok, message, data = False, f"Timed out after {step_timeout}s", {'timeout': True}
+                # The worker is still busy with the abandoned step; use a fresh one
+                executor.shutdown(wait=False)
+                executor = new_executor()
+            except StepError as e:
+                ok, message, data = False, str(e), None
+            except Exception as e:
+                ok, message, data = False, f"Error: {e}", None
+
+            result.update(ok=bool(ok), message=message, ms=round((time.perf_counter() - start) * 1000, 1))
+            if data:
+                result.update(data)
+            results.append(result)
+            if emit:
+                emit(result)
+
+            continue_on_error = isinstance(step, dict) and step.get('continue_on_error')
+            if not ok and stop_on_error and not continue_on_error:
+                failed = True
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Run a list of windows-control actions in one process')
+    parser.add_argument('file', nargs='?', default='-', help='JSON-lines/YAML file (default: stdin)')
+    parser.add_argument('--format', choices=['json', 'yaml'], help='Input format (default: auto-detect)')
+    parser.add_argument('--timeout', '-t', type=float, default=None, help='Default per-step timeout (seconds)')
+    parser.add_argument('--keep-going', '-k', action='store_true', help='Continue after a failed step')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.file == '-':
+            text = sys.stdin.read()
+        else:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                text = f.read()
+        fmt = args.format or ('yaml' if args.file.lower().endswith(('.yaml', '.yml')) else None)
+        steps = parse_steps(text, fmt)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not isinstance(steps, list):
+        print("Error: Expected a list of steps")
+        sys.exit(1)
+
+    def emit(result):
+        print(json.dumps(result, ensure_ascii=False))
+        sys.stdout.flush()
+
+    start = time.perf_counter()
+    results = run_batch(steps, timeout=args.timeout, stop_on_error=not args.keep_going, emit=emit)
+    failed = [r for r in results if not r['ok']]
+    print(json.dumps({'summary': {
+        'steps': len(results),
+        'ok': len(results) - len(failed),
+        'failed': len(failed),
+        'ms': round((time.perf_counter() - start) * 1000, 1)
+    }}))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    known, _ = build_parser().parse_known_args()
+    run(__file__, main, stdin=known.file == '-')
@@ -2,22 +2,56 @@
 """
 Click - Click at coordinates (x, y, button, clicks)
 Usage: py click.py 500 300 left 1
+       py click.py 500 300 --describe    # Also say which element is there
+
+--describe reads the window under the point once and hit-tests it (see
+element_at.py) before clicking.
 """
-import pyautogui
 import sys
+from wincontrol import get_backend
+from wincontrol.spatial import element_at
+
+
+def describe_target(x, y):
+    """One line naming the element at (x, y)."""
+    cached = []
+    try:
+        window, tree, hits = element_at(x, y, hits=cached)
+    except Exception as e:
+        return f"Target: unknown ({e})"
+    for entry in cached:
+        print(entry.describe(), file=sys.stderr)
+    if window is None:
+        return "Target: no window"
+    if not hits:
+        return f"Target: window '{window.window_text()}'"
+    node = tree.node(hits[0])
+    return f"Target: [{node.control_type}] '{(node.name or '').strip()}' in '{window.window_text()}'"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    describe = '--describe' in argv
+    argv = [a for a in argv if a != '--describe']
+    if len(argv) < 2:
+        print("Usage: py click.py X Y [button] [clicks] [--describe]")
+        sys.exit(1)
+
+    x = int(argv[0])
+    y = int(argv[1])
+    button = argv[2] if len(argv) > 2 else "left"
+    clicks = int(argv[3]) if len(argv) > 3 else 1
+
+    try:
+        if describe:
+            print(describe_target(x, y))
+        get_backend().input().click(x, y, clicks=clicks, button=button)
+        print(f"Clicked {button} button at ({x}, {y}) {clicks} time(s)")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
 
-if len(sys.argv) < 3:
-    print("Usage: py click.py X Y [button] [clicks]")
-    sys.exit(1)
-
-x = int(sys.argv[1])
-y = int(sys.argv[2])
-button = sys.argv[3] if len(sys.argv) > 3 else "left"
-clicks = int(sys.argv[4]) if len(sys.argv) > 4 else 1
-
-try:
-    pyautogui.click(x, y, clicks=clicks, button=button)
-    print(f"Clicked {button} button at ({x}, {y}) {clicks} time(s)")
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -6,141 +6,177 @@ Usage: py click_element.py "Save"                    # Click "Save" button anywh
        py click_element.py "OK" --window "Notepad"   # Click OK in specific window
        py click_element.py "Submit" --type Button    # Click only buttons named Submit
        py click_element.py "File" --type MenuItem    # Click menu items
+       py click_element.py "Cancle" --fuzzy          # Tolerate typos (best n-gram match)
+       py click_element.py --id 65568:42.65568.4.9   # Click an element from earlier output
+       py click_element.py 'sel:Window[name~=Notepad] > MenuBar > MenuItem[name=File]'
 
 Supports: Button, Hyperlink, MenuItem, TabItem, ListItem, CheckBox, RadioButton
+
+Names match case-insensitively and ignore full-width/half-width
+differences ("ＯＫ" finds "OK"). --fuzzy also accepts a near miss when
+nothing matches as a substring; it is never used unless asked for, since
+a wrong guess would click the wrong control.
 """
 import sys
-import io
-import argparse
-from pywinauto import Desktop
 import time
-
-# Fix Windows console encoding
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+import argparse
+import itertools
+from wincontrol import cache, get_backend
+from wincontrol.scan import ScanReport, scan_windows
+from wincontrol.handles import element_id, remember, resolve
+from wincontrol.query import QueryError
+from wincontrol.search import (best_match, confirm_match, find_elements, iter_desktop_matches,
+                               iter_matches)
+from wincontrol.snapshot import BASIC, node_wrapper
+from wincontrol.windows import find_window
 
 CLICKABLE_TYPES = ['Button', 'Hyperlink', 'MenuItem', 'TabItem', 'ListItem', 
                    'CheckBox', 'RadioButton', 'TreeItem', 'DataItem']
 
 
-def find_and_click(desktop, element_name, window_title=None, control_type=None, exact=False):
-    """Find and click a UI element by name."""
+def find_and_click(desktop, element_name, window_title=None, control_type=None, exact=False,
+                   windows=None, ambiguity=False, workers=None, report=None, fuzzy=False,
+                   retry=True):
+    """Find and click a UI element by name.
+
+    Windows are scanned in parallel (`workers` threads, see
+    wincontrol.scan) but ranked in z-order, and the search stops at the
+    first exact name match. Otherwise the best-ranked match wins (exact,
+    case-insensitive exact, prefix, substring, and with fuzzy=True the most
+    similar name as a last resort). With ambiguity=True every
+    window is searched and nothing is clicked if several elements tie for
+    the best rank.
+
+    Pass `windows` to search already-resolved windows instead of looking
+    them up by window_title (batch mode reuses its resolved windows).
+    Pass a ScanReport as `report` to learn which windows timed out.
+    element_name may be a "sel:" selector (see wincontrol.query).
+
+    The chosen element is re-read before the click (it may come from a
+    cached snapshot); if it is gone or renamed the search runs once more
+    on fresh data (retry).
+    """
     
-    # Determine which windows to search
-    if window_title:
-        windows = []
-        for w in desktop.windows():
-            if window_title.lower() in w.window_text().lower():
-                windows.append(w)
-        if not windows:
-            return False, f"Window '{window_title}' not found"
+    # Type (and exact name) conditions run provider-side; only substring matching is done here
+    search = dict(control_types=[control_type] if control_type else CLICKABLE_TYPES,
+                  mode='exact' if exact else 'fuzzy' if fuzzy else 'substring',
+                  predicate=lambda node: node.enabled)
+    if windows is not None:
+        matches = iter_matches(windows, element_name, **search)
     else:
-        # Search all visible windows
-        windows = desktop.windows()
-    
-    element_name_lower = element_name.lower()
-    candidates = []
-    
-    for window in windows:
-        try:
-            for ctrl in window.descendants():
-                try:
-                    ctrl_type = ctrl.element_info.control_type
-                    name = ctrl.window_text().strip() if ctrl.window_text() else ""
-                    
-                    # Skip if control type filter doesn't match
-                    if control_type and ctrl_type != control_type:
-                        continue
-                    
-                    # Check if clickable
-                    if ctrl_type not in CLICKABLE_TYPES:
-                        continue
-                    
-                    # Match name
-                    if exact:
-                        name_match = name == element_name
-                    else:
-                        name_match = element_name_lower in name.lower()
-                    
-                    if name_match and ctrl.is_enabled():
-                        rect = ctrl.rectangle()
-                        candidates.append({
-                            'control': ctrl,
-                            'name': name,
-                            'type': ctrl_type,
-                            'window': window.window_text(),
-                            'center': ((rect.left + rect.right) // 2, (rect.top + rect.bottom) // 2)
-                        })
-                except:
-                    continue
-        except:
-            continue
-    
-    if not candidates:
+        if window_title and not find_window(desktop, window_title):
+            return False, f"Window '{window_title}' not found"
+        matches = iter_desktop_matches(desktop, element_name, window_title, workers=workers,
+                                       report=report, **search)
+    try:
+        best, ties = best_match(matches, ambiguity=ambiguity)
+    except QueryError as e:
+        return False, str(e)
+    
+    if best is None:
         return False, f"Element '{element_name}' not found"
     
-    # If multiple matches, prefer exact matches
-    exact_matches = [c for c in candidates if c['name'].lower() == element_name_lower]
-    if exact_matches:
-        candidates = exact_matches
+    if len(ties) > 1:
+        lines = [f"Ambiguous: {len(ties)} elements match '{element_name}' ({best.tier_name}):"]
+        for match in ties:
+            lines.append(f"  [{match.node.control_type}] '{match.name}' in {match.window.window_text()} @ {match.node.center}")
+        return False, "\n".join(lines)
     
-    # Click the first matching element
-    target = candidates[0]
+    confirmed = confirm_match(best, backend=desktop)
+    if confirmed is None:
+        if retry:
+            return find_and_click(desktop, element_name, window_title, control_type, exact,
+                                  windows, ambiguity, workers, report, fuzzy, retry=False)
+        return False, f"Element '{best.name}' changed before it could be clicked"
+    best = confirmed
+    if best.node.enabled is False:
+        return False, f"Element [{best.node.control_type}] '{best.name}' is disabled"
+    
+    # Click the best matching element
     try:
-        target['control'].click()
-        return True, f"Clicked [{target['type']}] '{target['name']}' in {target['window']} @ {target['center']}"
+        node_wrapper(best.node).click()
     except Exception as e:
         return False, f"Click failed: {e}"
+    cache.invalidate(best.window.handle)
+    msg = f"Clicked [{best.node.control_type}] '{best.name}' in {best.window.window_text()} @ {best.node.center}"
+    if best.tier_name == 'fuzzy':
+        msg += f" (fuzzy match, similarity {best.score:.2f})"
+    return True, msg
 
 
-def list_clickable(desktop, window_title=None):
+def click_by_id(desktop, handle):
+    """Click an element by the id from read/list output (see wincontrol.handles)."""
+    try:
+        resolved = resolve(handle, backend=desktop)
+    except (ValueError, LookupError) as e:
+        return False, str(e)
+    
+    node = resolved.node
+    if node.enabled is False:
+        return False, f"Element [{node.control_type}] '{resolved.name}' is disabled"
+    try:
+        node_wrapper(node).click()
+    except Exception as e:
+        return False, f"Click failed: {e}"
+    cache.invalidate(resolved.window.handle)
+    msg = f"Clicked [{node.control_type}] '{resolved.name}' in {resolved.window.window_text()} @ {node.center}"
+    if resolved.how == 're-searched':
+        msg += f" (element was re-created, new id {resolved.id})"
+    return True, msg
+
+
+def list_clickable(desktop, window_title=None, workers=None, report=None):
     """List all clickable elements."""
-    if window_title:
-        windows = []
-        for w in desktop.windows():
-            if window_title.lower() in w.window_text().lower():
-                windows.append(w)
-    else:
-        windows = desktop.windows()[:5]  # Limit to first 5 windows
+    def job(window):
+        return window.window_text(), find_elements(window, control_types=CLICKABLE_TYPES,
+                                                   props=BASIC + ('runtime_id',))
+    
+    scan = scan_windows(desktop, job, window_title, workers=workers, report=report)
+    if not window_title:
+        scan = itertools.islice(scan, 5)  # Limit to first 5 windows
     
     elements = []
-    for window in windows:
-        try:
-            win_title = window.window_text()
-            for ctrl in window.descendants():
-                try:
-                    ctrl_type = ctrl.element_info.control_type
-                    name = ctrl.window_text().strip() if ctrl.window_text() else ""
-                    
-                    if ctrl_type in CLICKABLE_TYPES and name and ctrl.is_enabled():
-                        rect = ctrl.rectangle()
-                        elements.append({
-                            'name': name,
-                            'type': ctrl_type,
-                            'window': win_title,
-                            'center': ((rect.left + rect.right) // 2, (rect.top + rect.bottom) // 2)
-                        })
-                except:
-                    continue
-        except:
-            continue
+    for window, (win_title, nodes) in scan:
+        shown = []
+        for node in nodes:
+            name = node.name.strip() if node.name else ""
+            if name and node.enabled:
+                elements.append({
+                    'name': name,
+                    'type': node.control_type,
+                    'window': win_title,
+                    'center': node.center,
+                    'id': element_id(window, node)
+                })
+                shown.append(node)
+        remember(window, shown)
     
     return elements
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Click UI element by name')
     parser.add_argument('element', nargs='?', help='Element name/text to click')
     parser.add_argument('--window', '-w', help='Target specific window')
     parser.add_argument('--type', '-t', dest='control_type', help='Control type filter (Button, Hyperlink, etc.)')
     parser.add_argument('--exact', '-e', action='store_true', help='Exact name match only')
+    parser.add_argument('--fuzzy', '-f', action='store_true',
+                        help='Accept the most similar name if nothing contains the text (typos)')
+    parser.add_argument('--ambiguous', '-a', action='store_true',
+                        help='Search every window and refuse to click if several elements match equally well')
+    parser.add_argument('--id', dest='element_id', help='Element id from read/list output')
     parser.add_argument('--list', '-l', action='store_true', help='List clickable elements')
+    parser.add_argument('--workers', type=int, help='Windows scanned in parallel (default 4)')
     parser.add_argument('--delay', '-d', type=float, default=0, help='Delay before clicking (seconds)')
     
-    args = parser.parse_args()
-    desktop = Desktop(backend="uia")
+    args = parser.parse_args(argv)
+    desktop = get_backend()
+    report = ScanReport()
     
     if args.list:
-        elements = list_clickable(desktop, args.window)
+        elements = list_clickable(desktop, args.window, workers=args.workers, report=report)
+        if report.partial:
+            print(report.summary(), file=sys.stderr)
         if not elements:
             print("No clickable elements found")
         else:
@@ -150,27 +186,40 @@ def main():
                 if elem['window'] != current_window:
                     current_window = elem['window']
                     print(f"\n=== {current_window} ===")
-                print(f"  [{elem['type']}] {elem['name']} @ {elem['center']}")
+                handle = f" id={elem['id']}" if elem['id'] else ""
+                print(f"  [{elem['type']}] {elem['name']} @ {elem['center']}{handle}")
         return
     
-    if not args.element:
-        print("Error: Element name required (or use --list)")
+    if not args.element and not args.element_id:
+        print("Error: Element name required (or use --id / --list)")
         sys.exit(1)
     
     if args.delay > 0:
         time.sleep(args.delay)
     
+    if args.element_id:
+        success, msg = click_by_id(desktop, args.element_id)
+        print(msg)
+        sys.exit(0 if success else 1)
+    
     success, msg = find_and_click(
         desktop, 
         args.element, 
         window_title=args.window,
         control_type=args.control_type,
-        exact=args.exact
+        exact=args.exact,
+        fuzzy=args.fuzzy,
+        ambiguity=args.ambiguous,
+        workers=args.workers,
+        report=report
     )
+    if report.partial:
+        print(report.summary(), file=sys.stderr)
     
     print(msg)
     sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
-    main()
+    from wincontrol.client import run
+    run(__file__, main)
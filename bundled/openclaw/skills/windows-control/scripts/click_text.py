@@ -2,64 +2,76 @@
 # -*- coding: utf-8 -*-
 """
 Click Text - Find and click element by text content
-Usage: py click_text.py "Button Text" ["Window Name"]
+Usage: py click_text.py "Button Text" ["Window Name"] [--fuzzy]
        py click_text.py "Save"
        py click_text.py "Submit" "Chrome"
+       py click_text.py "Sbumit" --fuzzy
+
+The best match wins: exact text, then case-insensitive exact, prefix and
+substring (case and full-width/half-width forms are ignored). The search
+stops at the first exact match. --fuzzy also accepts the most similar
+text when nothing contains it.
 """
 import sys
-import io
-from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
-import pyautogui
+from wincontrol import cache, get_backend
+from wincontrol.scan import ScanReport
+from wincontrol.search import best_match, confirm_match, iter_desktop_matches
+
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+def find_text(backend, search_text, window_filter=None, fuzzy=False, report=None):
+    """Best match for the text across windows, re-read so its position is current.
 
-if len(sys.argv) < 2:
-    print("Usage: py click_text.py \"text\" [\"window\"]")
-    sys.exit(1)
+    A match that went stale (from a cached snapshot) is searched once more.
+    """
+    for _ in range(2):
+        # Each window's name index is searched in parallel; matches are ranked in z-order
+        matches = iter_desktop_matches(backend, search_text, window_filter, skip_untitled=True,
+                                       mode='fuzzy' if fuzzy else 'substring',
+                                       props=('name', 'rect'), predicate=lambda node: node.rect,
+                                       report=report)
+        best, _ = best_match(matches)
+        if best is None:
+            return None
+        best = confirm_match(best, props=('name', 'rect'), backend=backend)
+        if best is not None and best.node.rect:
+            return best
+    return None
 
-search_text = sys.argv[1]
-window_filter = sys.argv[2] if len(sys.argv) > 2 else None
 
-try:
-    desktop = Desktop(backend="uia")
-    
-    # Get windows to search
-    if window_filter:
-        windows = [w for w in desktop.windows() if window_filter.lower() in w.window_text().lower()]
-    else:
-        windows = desktop.windows()
-    
-    found = False
-    for window in windows:
-        if not window.window_text():
-            continue
-            
-        try:
-            for ctrl in window.descendants():
-                try:
-                    text = ctrl.window_text()
-                    if text and search_text.lower() in text.lower():
-                        # Found it! Get coordinates and click
-                        rect = ctrl.rectangle()
-                        center_x = (rect.left + rect.right) // 2
-                        center_y = (rect.top + rect.bottom) // 2
-                        
-                        pyautogui.click(center_x, center_y)
-                        print(f"Clicked '{text}' at ({center_x}, {center_y})")
-                        found = True
-                        break
-                except:
-                    pass
-            if found:
-                break
-        except:
-            pass
-    
-    if not found:
-        print(f"Error: Text '{search_text}' not found")
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    fuzzy = '--fuzzy' in argv
+    argv = [a for a in argv if a != '--fuzzy']
+    if len(argv) < 1:
+        print("Usage: py click_text.py \"text\" [\"window\"] [--fuzzy]")
         sys.exit(1)
-        
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+
+    search_text = argv[0]
+    window_filter = argv[1] if len(argv) > 1 else None
+
+    try:
+        backend = get_backend()
+
+        report = ScanReport()
+        best = find_text(backend, search_text, window_filter, fuzzy, report)
+        if report.partial:
+            print(report.summary(), file=sys.stderr)
+
+        if best is None:
+            print(f"Error: Text '{search_text}' not found")
+            sys.exit(1)
+
+        center_x, center_y = best.node.center
+        backend.input().click(center_x, center_y)
+        cache.invalidate(best.window.handle)
+        fuzzy_note = f" (fuzzy match, similarity {best.score:.2f})" if best.tier_name == 'fuzzy' else ""
+        print(f"Clicked '{best.node.name}' at ({center_x}, {center_y}){fuzzy_note}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
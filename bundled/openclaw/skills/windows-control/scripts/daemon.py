@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Daemon - Keep a warm UI Automation session so scripts skip Python + pywinauto startup
+Usage: py daemon.py start                 # Start in the background
+       py daemon.py status                # Show pid, uptime, commands served
+       py daemon.py stop                  # Shut it down
+       py daemon.py serve                 # Run in the foreground
+
+While the daemon runs, every other script forwards its command to it and
+prints the same output. Without it, scripts run on their own as before.
+Exits by itself after --idle-timeout seconds without requests (default 1800).
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+from wincontrol import state
+from wincontrol.client import STATE_FILE, fix_console, request
+
+
+def start(idle_timeout):
+    reply = request({'op': 'ping'})
+    if reply:
+        print(f"Daemon already running (pid {reply['pid']})")
+        return 0
+
+    log = open(state.state_path('daemon.log'), 'ab')
+    cmd = [sys.executable, os.path.abspath(__file__), 'serve', '--idle-timeout', str(idle_timeout)]
+    kwargs = {'stdin': subprocess.DEVNULL, 'stdout': log, 'stderr': log, 'close_fds': True}
+    if sys.platform == 'win32':
+        kwargs['creationflags'] = (subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                                   | subprocess.CREATE_NO_WINDOW)
+    else:
+        kwargs['start_new_session'] = True
+    proc = subprocess.Popen(cmd, **kwargs)
+
+    # First start pays the pywinauto import + UIA warm-up, give it a while
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            print(f"Error: daemon exited with code {proc.returncode}, see {state.state_path('daemon.log')}")
+            return 1
+        reply = request({'op': 'ping'})
+        if reply:
+            print(f"Daemon started (pid {reply['pid']}, backend {reply['backend']})")
+            return 0
+        time.sleep(0.1)
+    print("Error: daemon did not come up within 20s")
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Resident windows-control daemon')
+    parser.add_argument('action', choices=['start', 'stop', 'status', 'serve'], help='Action to perform')
+    parser.add_argument('--idle-timeout', type=int, default=1800,
+                        help='Exit after this many seconds without requests (0 = never)')
+    args = parser.parse_args(argv)
+
+    if args.action == 'serve':
+        from wincontrol.server import Server
+        Server(idle_timeout=args.idle_timeout).serve()
+        return
+
+    if args.action == 'start':
+        sys.exit(start(args.idle_timeout))
+
+    reply = request({'op': 'ping'})
+    if args.action == 'status':
+        if not reply:
+            print("Daemon not running")
+            sys.exit(1)
+        print(f"Daemon running (pid {reply['pid']}, backend {reply['backend']})")
+        print(f"Uptime: {reply['uptime']}s, commands served: {reply['served']}")
+        stats = reply.get('cache')
+        if stats:
+            print(f"Snapshot cache: {stats['entries']} entries ({stats['bytes'] // 1024} KB), "
+                  f"{stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['invalidations']} invalidated by events, {stats['evictions']} evicted")
+    elif args.action == 'stop':
+        if not reply:
+            print("Daemon not running")
+            state.remove(STATE_FILE)
+            return
+        request({'op': 'shutdown'})
+        print(f"Daemon stopped (pid {reply['pid']})")
+
+
+if __name__ == "__main__":
+    fix_console()
+    main()
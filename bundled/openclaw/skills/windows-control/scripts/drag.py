@@ -6,22 +6,31 @@ Usage: py drag.py x1 y1 x2 y2 [duration]
        py drag.py 100 100 500 300 1.0
 """
 import sys
-import pyautogui
+from wincontrol import get_backend
 
-if len(sys.argv) < 5:
-    print("Usage: py drag.py x1 y1 x2 y2 [duration]")
-    sys.exit(1)
 
-x1 = int(sys.argv[1])
-y1 = int(sys.argv[2])
-x2 = int(sys.argv[3])
-y2 = int(sys.argv[4])
-duration = float(sys.argv[5]) if len(sys.argv) > 5 else 0.5
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 4:
+        print("Usage: py drag.py x1 y1 x2 y2 [duration]")
+        sys.exit(1)
 
-try:
-    pyautogui.moveTo(x1, y1)
-    pyautogui.drag(x2 - x1, y2 - y1, duration=duration, button='left')
-    print(f"Dragged from ({x1}, {y1}) to ({x2}, {y2})")
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+    x1 = int(argv[0])
+    y1 = int(argv[1])
+    x2 = int(argv[2])
+    y2 = int(argv[3])
+    duration = float(argv[4]) if len(argv) > 4 else 0.5
+
+    try:
+        mouse = get_backend().input()
+        mouse.moveTo(x1, y1)
+        mouse.drag(x2 - x1, y2 - y1, duration=duration, button='left')
+        print(f"Dragged from ({x1}, {y1}) to ({x2}, {y2})")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
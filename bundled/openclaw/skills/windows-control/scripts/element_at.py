@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Element At - Which UI element is at a screen point
+Usage: py element_at.py X Y
+       py element_at.py 640 522 --window "Save As"
+       py element_at.py 640 522 --json
+
+The top-level window under the point is found from window rects (no UI
+Automation), read once, and hit-tested through a spatial grid over the
+element rects. Prints the innermost element (with an id for
+click_element.py --id) and the elements that contain it.
+"""
+import sys
+import json
+import argparse
+from wincontrol import get_backend
+from wincontrol.handles import remember
+from wincontrol.spatial import describe_node, element_at
+from wincontrol.windows import find_window
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find the UI element at a screen point')
+    parser.add_argument('x', type=int)
+    parser.add_argument('y', type=int)
+    parser.add_argument('--window', '-w', help='Window to hit-test (default: the one under the point)')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+    args = parser.parse_args(argv)
+
+    try:
+        desktop = get_backend()
+        window = None
+        if args.window:
+            window = find_window(desktop, args.window)
+            if not window:
+                print(f"Error: Window containing '{args.window}' not found")
+                sys.exit(1)
+        cached = []
+        window, tree, hits = element_at(args.x, args.y, window, backend=desktop, hits=cached)
+        for entry in cached:
+            print(entry.describe(), file=sys.stderr)
+        if window is None:
+            print(f"Nothing at ({args.x}, {args.y}): no window there")
+            sys.exit(1)
+
+        nodes = [tree.node(i) for i in hits]
+        remember(window, nodes[:1])
+        if args.json:
+            print(json.dumps({
+                'window': window.window_text(),
+                'element': describe_node(window, nodes[0]) if nodes else None,
+                'ancestors': [describe_node(window, node) for node in nodes[1:]],
+            }, indent=2, ensure_ascii=False))
+            return
+
+        print(f"Window: {window.window_text()}")
+        if not nodes:
+            print(f"No element at ({args.x}, {args.y}) (only the window itself)")
+            return
+        info = describe_node(window, nodes[0])
+        rect = info['rect']
+        print(f"Element: [{info['type']}] '{info['name']}'" + ("" if info['enabled'] else " [DISABLED]"))
+        print(f"Coordinates: x={rect['center_x']}, y={rect['center_y']}")
+        print(f"Bounds: left={rect['left']}, top={rect['top']}, right={rect['right']}, bottom={rect['bottom']}")
+        if 'id' in info:
+            print(f"Id: {info['id']}")
+        if len(nodes) > 1:
+            print("Inside:")
+            for node in nodes[1:]:
+                print(f"  [{node.control_type}] '{(node.name or '').strip()}'")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Elements In Region - List the UI elements inside a screen rectangle
+Usage: py elements_in_region.py X1 Y1 X2 Y2
+       py elements_in_region.py 300 450 800 550 --window "Save As"
+       py elements_in_region.py 0 0 640 400 --partial        # Also elements crossing the edge
+       py elements_in_region.py 0 0 640 400 --type Button --json
+
+The window under the center of the rectangle (or --window) is read once
+(or answered from a fresh cached snapshot, see wincontrol.cache); a
+spatial grid over the element rects answers the region query. By
+default only named elements (and edit/document fields) are listed, in
+tree order, each with an id for click_element.py --id.
+"""
+import sys
+import json
+import argparse
+from wincontrol import cache, get_backend
+from wincontrol.handles import remember
+from wincontrol.snapshot import BASIC
+from wincontrol.spatial import describe_node, window_at
+from wincontrol.windows import find_window
+
+REGION_PROPS = BASIC + ('runtime_id',)
+
+
+def elements_in_region(window, region, partial=False, types=None, include_unnamed=False,
+                       hits=None):
+    """Nodes of window inside region (or crossing it, with partial), in tree order.
+
+    The window's snapshot may be a fresh cached one; its cache entry is
+    then appended to hits.
+    """
+    tree, entry = cache.snapshot(window, REGION_PROPS)
+    if entry is not None and hits is not None:
+        hits.append(entry)
+    hits = tree.select(types=types, region=region, contained=not partial)
+    if not include_unnamed:
+        named = set(tree.select(named=True)) | set(tree.select(types=['Edit', 'Document']))
+        hits = [i for i in hits if i in named]
+    return [tree.node(i) for i in hits]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List UI elements inside a screen rectangle')
+    parser.add_argument('coords', type=int, nargs=4, metavar='N', help='X1 Y1 X2 Y2')
+    parser.add_argument('--window', '-w', help='Window to search (default: the one under the center)')
+    parser.add_argument('--partial', action='store_true', help='Include elements that only overlap the region')
+    parser.add_argument('--type', '-t', action='append', dest='types', help='Only this control type (repeatable)')
+    parser.add_argument('--all', action='store_true', help='Include unnamed elements')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+    args = parser.parse_args(argv)
+
+    x1, y1, x2, y2 = args.coords
+    region = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    try:
+        desktop = get_backend()
+        if args.window:
+            window = find_window(desktop, args.window)
+            if not window:
+                print(f"Error: Window containing '{args.window}' not found")
+                sys.exit(1)
+        else:
+            window = window_at(desktop, (region[0] + region[2]) // 2, (region[1] + region[3]) // 2)
+            if window is None:
+                print(f"Error: No window under the center of {region}")
+                sys.exit(1)
+
+        cached = []
+        nodes = elements_in_region(window, region, args.partial, args.types, args.all, cached)
+        for entry in cached:
+            print(entry.describe(), file=sys.stderr)
+        remember(window, nodes)
+        elements = [describe_node(window, node) for node in nodes]
+        if args.json:
+            print(json.dumps({'window': window.window_text(), 'region': list(region),
+                              'elements': elements}, indent=2, ensure_ascii=False))
+            return
+
+        print(f"Window: {window.window_text()}")
+        if not elements:
+            print(f"No elements in {region}")
+            return
+        print(f"{len(elements)} element(s) in {region}:")
+        for item in elements:
+            coords = ""
+            if 'rect' in item:
+                coords = f" @ ({item['rect']['center_x']}, {item['rect']['center_y']})"
+            enabled = "" if item['enabled'] else " [DISABLED]"
+            handle = f" id={item['id']}" if 'id' in item else ""
+            print(f"  [{item['type']}] {item['name']}{coords}{enabled}{handle}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
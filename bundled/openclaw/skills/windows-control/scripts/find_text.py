@@ -2,56 +2,192 @@
 # -*- coding: utf-8 -*-
 """
 Find Text - Find text and return coordinates
-Usage: py find_text.py "text" ["window"]
+Usage: py find_text.py "text" ["window"] [--all] [--fuzzy] [--top N]
+       py find_text.py -q "text" [-q "text" ...] ["window"] [--all] [--fuzzy]
        py find_text.py "Submit"
        py find_text.py "Save" "Notepad"
+       py find_text.py "Save" --all       # List every equally good match
+       py find_text.py "Sevae" --fuzzy    # Tolerate typos
+       py find_text.py "保存" --top 5      # The 5 best candidates, with scores
+       py find_text.py -q Username -q Password -q "Sign in" "Chrome"
+       py find_text.py --id ID            # Where is the element with this id now?
+
+The best match is reported: exact text, then case-insensitive exact, prefix
+and substring (full-width/half-width forms compare equal). --fuzzy adds
+names similar to the text (n-gram similarity) as a last tier. Without
+--all the search stops at the first exact match. When nothing is found,
+up to three similar names are suggested.
+With -q (repeatable) several texts are looked up in one pass: each window
+is read once and its names are matched against all texts together; the
+result is reported per text.
+Each match is printed with an id that --id (and click_element.py --id)
+resolve directly later.
 """
 import sys
-import io
-from pywinauto import Desktop
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-if len(sys.argv) < 2:
-    print("Usage: py find_text.py \"text\" [\"window\"]")
-    sys.exit(1)
-
-search_text = sys.argv[1]
-window_filter = sys.argv[2] if len(sys.argv) > 2 else None
-
-try:
-    desktop = Desktop(backend="uia")
-    
-    if window_filter:
-        windows = [w for w in desktop.windows() if window_filter.lower() in w.window_text().lower()]
-    else:
-        windows = desktop.windows()
-    
-    for window in windows:
-        if not window.window_text():
+from wincontrol import get_backend
+from wincontrol.handles import element_id, remember, resolve
+from wincontrol.scan import ScanReport
+from wincontrol.search import best_match, best_matches, iter_desktop_matches, top_matches
+
+PROPS = ('name', 'rect', 'runtime_id')
+SUGGESTIONS = 3
+
+
+def print_match(match, score=False):
+    left, top, right, bottom = match.node.rect
+    center_x, center_y = match.node.center
+    note = ""
+    if score:
+        similarity = f", similarity {match.score:.2f}" if match.tier_name == 'fuzzy' else ""
+        note = f" ({match.tier_name}{similarity})"
+    print(f"Found: '{match.node.name}'{note}")
+    print(f"Coordinates: x={center_x}, y={center_y}")
+    print(f"Bounds: left={left}, top={top}, right={right}, bottom={bottom}")
+    handle = element_id(match.window, match.node)
+    if handle:
+        print(f"Id: {handle}")
+
+
+def take_option(argv, flag):
+    """Remove `flag VALUE` from argv; return VALUE (None if absent)."""
+    if flag not in argv:
+        return None
+    position = argv.index(flag)
+    value = argv[position + 1] if position + 1 < len(argv) else ''
+    del argv[position:position + 2]
+    return value
+
+
+def take_all(argv, *flags):
+    """Remove every `flag VALUE` from argv; return the VALUEs in order."""
+    values = []
+    position = 0
+    while position < len(argv):
+        if argv[position] in flags:
+            values.append(argv[position + 1] if position + 1 < len(argv) else '')
+            del argv[position:position + 2]
+        else:
+            position += 1
+    return values
+
+
+def find_many(backend, queries, window_filter, report_all, fuzzy):
+    """Look up every query in one scan and print a section per query."""
+    report = ScanReport()
+    results = best_matches(backend, queries, window_filter, skip_untitled=True,
+                           mode='fuzzy' if fuzzy else 'substring', props=PROPS,
+                           predicate=lambda node: node.rect, ambiguity=report_all, report=report)
+    if report.partial:
+        print(report.summary(), file=sys.stderr)
+    missing = 0
+    for query, (best, ties) in zip(queries, results):
+        print(f"== '{query}'")
+        if best is None:
+            print(f"Not found: '{query}'")
+            missing += 1
             continue
-            
+        if len(ties) > 1:
+            print(f"{len(ties)} equally good matches ({best.tier_name}):")
+        for match in ties:
+            remember(match.window, [match.node])
+            print_match(match, score=best.tier_name == 'fuzzy')
+    return missing
+
+
+def search(backend, search_text, window_filter, mode, report):
+    return iter_desktop_matches(backend, search_text, window_filter, skip_untitled=True,
+                                mode=mode, props=PROPS, predicate=lambda node: node.rect,
+                                report=report)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    report_all = '--all' in argv
+    fuzzy = '--fuzzy' in argv
+    argv = [a for a in argv if a not in ('--all', '--fuzzy')]
+    top = take_option(argv, '--top')
+    queries = take_all(argv, '-q', '--query')
+    try:
+        top = int(top) if top is not None else None
+    except ValueError:
+        print(f"Error: --top expects a number, got '{top}'")
+        sys.exit(1)
+    if '--id' in argv:
+        position = argv.index('--id')
+        handle = argv[position + 1] if position + 1 < len(argv) else ''
+        try:
+            resolved = resolve(handle, props=('name', 'rect'))
+        except (ValueError, LookupError) as e:
+            print(f"Not found: {e}")
+            sys.exit(1)
+        if not resolved.node.rect:
+            print(f"Not found: element {handle} has no bounds")
+            sys.exit(1)
+        print_match(resolved)
+        sys.exit(0)
+    if queries:
+        if top:
+            print("Error: --top takes a single text, not -q")
+            sys.exit(1)
         try:
-            for ctrl in window.descendants():
-                try:
-                    text = ctrl.window_text()
-                    if text and search_text.lower() in text.lower():
-                        rect = ctrl.rectangle()
-                        center_x = (rect.left + rect.right) // 2
-                        center_y = (rect.top + rect.bottom) // 2
-                        
-                        print(f"Found: '{text}'")
-                        print(f"Coordinates: x={center_x}, y={center_y}")
-                        print(f"Bounds: left={rect.left}, top={rect.top}, right={rect.right}, bottom={rect.bottom}")
-                        sys.exit(0)
-                except:
-                    pass
-        except:
-            pass
-    
-    print(f"Not found: '{search_text}'")
-    sys.exit(1)
-    
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+            missing = find_many(get_backend(), queries, argv[0] if argv else None, report_all, fuzzy)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        sys.exit(1 if missing else 0)
+    if len(argv) < 1:
+        print("Usage: py find_text.py \"text\" [\"window\"] [--all] [--fuzzy] [--top N]"
+              " | -q TEXT [-q TEXT ...] [\"window\"] | --id ID")
+        sys.exit(1)
+
+    search_text = argv[0]
+    window_filter = argv[1] if len(argv) > 1 else None
+
+    try:
+        backend = get_backend()
+
+        report = ScanReport()
+        mode = 'fuzzy' if fuzzy or top else 'substring'
+        if top:
+            ranked = top_matches(search(backend, search_text, window_filter, mode, report), top)
+            if report.partial:
+                print(report.summary(), file=sys.stderr)
+            if not ranked:
+                print(f"Not found: '{search_text}'")
+                sys.exit(1)
+            print(f"{len(ranked)} best matches:")
+            for match in ranked:
+                remember(match.window, [match.node])
+                print_match(match, score=True)
+            sys.exit(0)
+
+        best, ties = best_match(search(backend, search_text, window_filter, mode, report),
+                                ambiguity=report_all)
+        if report.partial:
+            print(report.summary(), file=sys.stderr)
+
+        if best is None:
+            print(f"Not found: '{search_text}'")
+            if not fuzzy:
+                # The windows' name indexes are still fresh, so this costs no extra fetch
+                similar = top_matches(search(backend, search_text, window_filter, 'fuzzy',
+                                             ScanReport()), SUGGESTIONS)
+                if similar:
+                    print("Did you mean: " + ", ".join(f"'{m.name}'" for m in similar))
+            sys.exit(1)
+
+        if len(ties) > 1:
+            print(f"{len(ties)} equally good matches ({best.tier_name}):")
+        for match in ties:
+            remember(match.window, [match.node])
+            print_match(match, score=best.tier_name == 'fuzzy')
+        sys.exit(0)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -7,37 +7,44 @@ Usage: py focus_window.py "Window Title"
        py focus_window.py "Notepad"
 """
 import sys
-import io
-from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-if len(sys.argv) < 2:
-    print("Usage: py focus_window.py \"Window Title\"")
-    sys.exit(1)
-
-window_title = sys.argv[1]
-
-try:
-    desktop = Desktop(backend="uia")
-    windows = desktop.windows()
-    
-    for window in windows:
-        title = window.window_text()
-        if window_title.lower() in title.lower():
-            # Restore if minimized
-            if window.is_minimized():
-                window.restore()
-            
-            # Set focus
-            window.set_focus()
-            print(f"Focused: {title}")
+from wincontrol import get_backend
+from wincontrol.windows import find_window
+
+
+def focus(window):
+    """Restore (if minimized) and focus a window. Returns its title."""
+    title = window.window_text()
+    # Restore if minimized
+    if window.is_minimized():
+        window.restore()
+
+    # Set focus
+    window.set_focus()
+    return title
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
+        print("Usage: py focus_window.py \"Window Title\"")
+        sys.exit(1)
+
+    window_title = argv[0]
+
+    try:
+        window = find_window(get_backend(), window_title)
+        if window:
+            print(f"Focused: {focus(window)}")
             sys.exit(0)
-    
-    print(f"Error: Window containing '{window_title}' not found")
-    sys.exit(1)
-    
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+
+        print(f"Error: Window containing '{window_title}' not found")
+        sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Focused - Which UI element has keyboard focus
+Usage: py focused.py                 # Focused element, its window and ancestor path
+       py focused.py --json
+       py focused.py --no-ancestors  # Just the element (one UI Automation call)
+
+Reads the focus directly from UI Automation instead of searching a window
+for it, so the cost depends on how deep the element sits, not on how big
+the window is. Prints name, type, value and position, plus an id for
+click_element.py --id.
+"""
+import sys
+import json
+import argparse
+from wincontrol import get_backend
+from wincontrol.focus import focused
+from wincontrol.handles import remember
+from wincontrol.spatial import describe_node
+
+
+def describe_focus(focus):
+    """Output dict for a Focus: window, element (with value) and ancestors."""
+    window = focus.window
+    if window is not None:
+        element = describe_node(window, focus.node)
+    else:
+        element = {'name': focus.name, 'type': focus.node.control_type,
+                   'enabled': focus.node.enabled if focus.node.enabled is not None else True}
+    if focus.node.value is not None:
+        element['value'] = focus.node.value
+    return {
+        'window': window.window_text() if window is not None else None,
+        'element': element,
+        'ancestors': [{'name': (node.name or '').strip(), 'type': node.control_type}
+                      for node in focus.ancestors],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show the element with keyboard focus')
+    parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--no-ancestors', action='store_true',
+                        help='Read only the focused element, not its window and parents')
+    args = parser.parse_args(argv)
+
+    try:
+        focus = focused(ancestors=not args.no_ancestors, backend=get_backend())
+        if focus is None:
+            if args.json:
+                print(json.dumps({'element': None}))
+            else:
+                print("No element has keyboard focus")
+            sys.exit(1)
+
+        if focus.window is not None:
+            remember(focus.window, [focus.node])
+        info = describe_focus(focus)
+        if args.json:
+            print(json.dumps(info, indent=2, ensure_ascii=False))
+            return
+
+        element = info['element']
+        print(f"Focused: [{element['type']}] '{element['name']}'" +
+              ("" if element['enabled'] else " [DISABLED]"))
+        if 'value' in element:
+            print(f"Value: {element['value']}")
+        if info['window'] is not None:
+            print(f"Window: {info['window']}")
+        rect = element.get('rect')
+        if rect:
+            print(f"Coordinates: x={rect['center_x']}, y={rect['center_y']}")
+            print(f"Bounds: left={rect['left']}, top={rect['top']}, right={rect['right']}, bottom={rect['bottom']}")
+        if 'id' in element:
+            print(f"Id: {element['id']}")
+        if focus.ancestors:
+            print(f"Path: {focus.path()}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -5,17 +5,21 @@ Get Active Window - Print title of currently focused window
 Usage: py get_active_window.py
 """
 import sys
-import io
-import pygetwindow as gw
+from wincontrol import get_backend
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
-try:
-    active = gw.getActiveWindow()
-    if active:
-        print(active.title)
-    else:
-        print("No active window found")
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+def main(argv=None):
+    try:
+        title = get_backend().active_title()
+        if title is not None:
+            print(title)
+        else:
+            print("No active window found")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -4,24 +4,31 @@
 Handle Dialogs - Detect, read, and interact with Windows dialogs
 Usage: py handle_dialog.py list              # List all open dialogs
        py handle_dialog.py read              # Read current active dialog
+       py handle_dialog.py read --max-nodes 200 --time-budget-ms 500   # Bounded read
        py handle_dialog.py click "OK"        # Click button in dialog
        py handle_dialog.py click "Save"      # Click Save button
-       py handle_dialog.py type "filename"   # Type into dialog text field
+       py handle_dialog.py type "filename"   # Type into the first text field
+       py handle_dialog.py type "x" --field 1  # Type into the second text field
+       py handle_dialog.py type "x" --focused  # Type into the focused field (else the first)
        py handle_dialog.py dismiss           # Click OK/Close/Cancel
+       py handle_dialog.py click --id ID     # Click the element with an id from `read`
+       py handle_dialog.py type "x" --id ID  # Type into the field with that id
 
 Handles: Save dialogs, Open dialogs, Message boxes, Alerts, Confirmations, etc.
 """
 import sys
-import io
 import json
 import argparse
-from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
+from wincontrol import cache, get_backend
+from wincontrol.focus import focused, label
+from wincontrol.handles import element_id, remember, resolve
+from wincontrol.query import QueryError
+from wincontrol.search import best_match, confirm_match, find_elements, iter_matches
+from wincontrol.snapshot import Budget, node_wrapper, read_nodes
+from wincontrol.waits import Condition, wait_for
+from wincontrol.windows import find_windows
 import time
 
-# Fix Windows console encoding
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
 # Common dialog control types and window classes
 DIALOG_CLASSES = [
     '#32770',  # Standard Windows dialog
@@ -37,56 +44,94 @@ DIALOG_TYPES = [
     'Pane'
 ]
 
+# Properties read_dialog() fetches for every control in one batch
+DIALOG_PROPS = ('name', 'control_type', 'rect', 'enabled', 'value', 'toggle_state', 'runtime_id')
+
 # Common button names for dismissing dialogs
 DISMISS_BUTTONS = ['OK', 'Close', 'Cancel', 'Yes', 'No', 'Dismiss', 'Got it', 'Accept', 'Done']
 
 
-def find_dialogs(desktop):
-    """Find all open dialogs/popups."""
+def dialog_info(window):
+    """Describe a window if it looks like a dialog, else return None."""
+    title = window.window_text()
+    ctrl_type = window.element_info.control_type
+    class_name = window.element_info.class_name
+    
+    # Check if it's a dialog-like window
+    is_dialog = (
+        ctrl_type in DIALOG_TYPES or
+        any(dc in class_name for dc in DIALOG_CLASSES) or
+        'dialog' in title.lower() or
+        'save' in title.lower() or
+        'open' in title.lower() or
+        'confirm' in title.lower() or
+        'warning' in title.lower() or
+        'error' in title.lower() or
+        'alert' in title.lower()
+    )
+    
+    if not (is_dialog and title):
+        return None
+    
+    # Get dialog info
+    rect = window.rectangle()
+    return {
+        'title': title,
+        'class': class_name,
+        'type': ctrl_type,
+        'rect': {
+            'left': rect.left,
+            'top': rect.top,
+            'right': rect.right,
+            'bottom': rect.bottom
+        },
+        'window': window
+    }
+
+
+def find_dialogs(desktop, window_title=None):
+    """Find all open dialogs/popups, optionally only windows matching a filter."""
     dialogs = []
     
-    for window in desktop.windows():
+    for window in find_windows(desktop, window_title):
         try:
-            title = window.window_text()
-            ctrl_type = window.element_info.control_type
-            class_name = window.element_info.class_name
-            
-            # Check if it's a dialog-like window
-            is_dialog = (
-                ctrl_type in DIALOG_TYPES or
-                any(dc in class_name for dc in DIALOG_CLASSES) or
-                'dialog' in title.lower() or
-                'save' in title.lower() or
-                'open' in title.lower() or
-                'confirm' in title.lower() or
-                'warning' in title.lower() or
-                'error' in title.lower() or
-                'alert' in title.lower()
-            )
-            
-            if is_dialog and title:
-                # Get dialog info
-                rect = window.rectangle()
-                dialogs.append({
-                    'title': title,
-                    'class': class_name,
-                    'type': ctrl_type,
-                    'rect': {
-                        'left': rect.left,
-                        'top': rect.top,
-                        'right': rect.right,
-                        'bottom': rect.bottom
-                    },
-                    'window': window
-                })
+            info = dialog_info(window)
+            if info:
+                dialogs.append(info)
         except:
             continue
     
     return dialogs
 
 
-def read_dialog(window):
-    """Read all content from a dialog."""
+def dialog_open(window_title=None):
+    """Wait condition: a dialog (matching window_title) is open; result is its info."""
+    def first_dialog(desktop):
+        dialogs = find_dialogs(desktop, window_title)
+        return dialogs[0] if dialogs else None
+    return Condition(f"dialog '{window_title}'" if window_title else 'dialog', first_dialog)
+
+
+def find_target(desktop, window_title=None, fallback_active=True):
+    """Pick the dialog to act on: by title, else the first dialog, else the active window."""
+    dialogs = find_dialogs(desktop, window_title)
+    if window_title:
+        return dialogs[0]['window'] if dialogs else None
+    if dialogs:
+        # Get the frontmost/most recent dialog
+        return dialogs[0]['window']
+    if fallback_active:
+        # Try finding button in active window
+        return desktop.active_window()
+    return None
+
+
+def read_dialog(window, budget=None, root=None, hits=None):
+    """Read all content from a dialog (optionally bounded, see snapshot.Budget).
+
+    Unbounded reads may come from a fresh cached snapshot (wincontrol.cache);
+    its entry is then appended to hits.
+    """
     content = {
         'title': window.window_text(),
         'message': [],
@@ -96,87 +141,140 @@ def read_dialog(window):
         'dropdowns': [],
         'list_items': []
     }
+    shown = []
     
     try:
-        for ctrl in window.descendants():
-            try:
-                ctrl_type = ctrl.element_info.control_type
-                name = ctrl.window_text().strip() if ctrl.window_text() else ""
-                
-                elem = {
-                    'name': name,
-                    'type': ctrl_type,
-                    'enabled': ctrl.is_enabled() if hasattr(ctrl, 'is_enabled') else True
-                }
-                
-                # Get coordinates
-                try:
-                    rect = ctrl.rectangle()
-                    elem['center'] = ((rect.left + rect.right) // 2, (rect.top + rect.bottom) // 2)
-                except:
-                    pass
-                
-                if ctrl_type == 'Button' and name:
-                    content['buttons'].append(elem)
-                elif ctrl_type in ['Text', 'Static'] and name:
-                    content['message'].append(name)
-                elif ctrl_type in ['Edit', 'ComboBox']:
-                    try:
-                        elem['value'] = ctrl.get_value() if hasattr(ctrl, 'get_value') else name
-                    except:
-                        elem['value'] = name
-                    content['text_fields'].append(elem)
-                elif ctrl_type == 'CheckBox':
-                    try:
-                        elem['checked'] = ctrl.get_toggle_state() == 1
-                    except:
-                        pass
-                    content['checkboxes'].append(elem)
-                elif ctrl_type == 'ListItem' and name:
-                    content['list_items'].append(elem)
-                    
-            except:
-                continue
+        if root or (budget is not None and budget.any()):
+            nodes = read_nodes(window, DIALOG_PROPS, budget, root)
+        else:
+            tree, entry = cache.snapshot(window, DIALOG_PROPS)
+            if entry is not None and hits is not None:
+                hits.append(entry)
+            nodes = (tree.node(i) for i in range(len(tree)))
+        for node in nodes:
+            ctrl_type = node.control_type
+            name = node.name.strip() if node.name else ""
+            
+            elem = {
+                'name': name,
+                'type': ctrl_type,
+                'enabled': node.enabled if node.enabled is not None else True
+            }
+            
+            # Get coordinates
+            if node.rect:
+                elem['center'] = node.center
+            
+            # Handle for click/type --id
+            handle = element_id(window, node)
+            if handle:
+                elem['id'] = handle
+            
+            if ctrl_type == 'Button' and name:
+                content['buttons'].append(elem)
+                shown.append(node)
+            elif ctrl_type in ['Text', 'Static'] and name:
+                content['message'].append(name)
+            elif ctrl_type in ['Edit', 'ComboBox']:
+                elem['value'] = node.value if node.value is not None else name
+                content['text_fields'].append(elem)
+                shown.append(node)
+            elif ctrl_type == 'CheckBox':
+                if node.toggle_state is not None:
+                    elem['checked'] = node.toggle_state == 1
+                content['checkboxes'].append(elem)
+                shown.append(node)
+            elif ctrl_type == 'ListItem' and name:
+                content['list_items'].append(elem)
+                shown.append(node)
                 
     except Exception as e:
         print(f"Error reading dialog: {e}", file=sys.stderr)
     
+    remember(window, shown)
+    
+    if budget is not None and budget.truncated:
+        content['truncated'] = budget.truncated
+    
     # Clean up empty fields
     return {k: v for k, v in content.items() if v}
 
 
 def click_button(window, button_name):
-    """Click a button in the dialog by name."""
-    button_name_lower = button_name.lower()
-    
-    for ctrl in window.descendants():
+    """Click a button in the dialog by name (best-ranked match, see wincontrol.search)."""
+    for _ in range(2):
         try:
-            ctrl_type = ctrl.element_info.control_type
-            name = ctrl.window_text().strip() if ctrl.window_text() else ""
-            
-            if ctrl_type == 'Button' and button_name_lower in name.lower():
-                if ctrl.is_enabled():
-                    ctrl.click()
-                    return True, f"Clicked button: {name}"
-                else:
-                    return False, f"Button '{name}' is disabled"
-        except:
-            continue
+            best, _ = best_match(iter_matches([window], button_name, control_types=['Button']))
+        except QueryError as e:
+            return False, str(e)
+        if best is None:
+            return False, f"Button '{button_name}' not found"
+        # Re-read it: the match may come from a cached snapshot
+        best = confirm_match(best)
+        if best is not None:
+            break
+    else:
+        return False, f"Button '{button_name}' changed before it could be clicked"
     
-    return False, f"Button '{button_name}' not found"
+    if not best.node.enabled:
+        return False, f"Button '{best.name}' is disabled"
+    node_wrapper(best.node).click()
+    cache.invalidate(window.handle)
+    return True, f"Clicked button: {best.name}"
 
 
-def type_in_field(window, text, field_index=0):
-    """Type text into a text field in the dialog."""
-    fields = []
+def click_by_id(handle):
+    """Click the element with an id from `read` output (see wincontrol.handles)."""
+    try:
+        resolved = resolve(handle)
+    except (ValueError, LookupError) as e:
+        return False, str(e)
     
-    for ctrl in window.descendants():
-        try:
-            ctrl_type = ctrl.element_info.control_type
-            if ctrl_type in ['Edit', 'ComboBox'] and ctrl.is_enabled():
-                fields.append(ctrl)
-        except:
-            continue
+    if resolved.node.enabled is False:
+        return False, f"Button '{resolved.name}' is disabled"
+    node_wrapper(resolved.node).click()
+    cache.invalidate(resolved.window.handle)
+    return True, f"Clicked button: {resolved.name}"
+
+
+def type_by_id(handle, text):
+    """Type into the field with an id from `read` output."""
+    try:
+        resolved = resolve(handle)
+    except (ValueError, LookupError) as e:
+        return False, str(e)
+    
+    try:
+        field = node_wrapper(resolved.node)
+        field.set_focus()
+        time.sleep(0.1)
+        field.type_keys(text, with_spaces=True)
+        cache.invalidate(resolved.window.handle)
+        return True, f"Typed into field '{resolved.name}'"
+    except Exception as e:
+        return False, f"Failed to type: {e}"
+
+
+def type_in_field(window, text, field_index=0, focused_field=False):
+    """Type text into a text field in the dialog.
+
+    With focused_field the field that already has keyboard focus is used
+    when it is a text field of this dialog (read from the focus, no search
+    of the dialog); otherwise field field_index.
+    """
+    if focused_field:
+        focus = focused()
+        if focus is not None and focus.accepts_text and focus.in_window(window):
+            try:
+                node_wrapper(focus.node).type_keys(text, with_spaces=True)
+            except Exception as e:
+                return False, f"Failed to type: {e}"
+            cache.invalidate(window.handle)
+            return True, f"Typed into focused field {label(focus.node)}"
+    
+    fields = [node for node in find_elements(window, control_types=['Edit', 'ComboBox'],
+                                             props=('control_type', 'enabled'))
+              if node.enabled]
     
     if not fields:
         return False, "No text fields found in dialog"
@@ -185,10 +283,11 @@ def type_in_field(window, text, field_index=0):
         return False, f"Field index {field_index} out of range (found {len(fields)} fields)"
     
     try:
-        field = fields[field_index]
+        field = node_wrapper(fields[field_index])
         field.set_focus()
         time.sleep(0.1)
         field.type_keys(text, with_spaces=True)
+        cache.invalidate(window.handle)
         return True, f"Typed into field {field_index}"
     except Exception as e:
         return False, f"Failed to type: {e}"
@@ -211,18 +310,25 @@ def dismiss_dialog(window):
     return False, "Could not find any dismiss button"
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Handle Windows dialogs')
     parser.add_argument('action', choices=['list', 'read', 'click', 'type', 'dismiss', 'wait'],
                        help='Action to perform')
     parser.add_argument('value', nargs='?', default='', help='Button name or text to type')
     parser.add_argument('--window', '-w', help='Target specific window by title')
     parser.add_argument('--field', '-f', type=int, default=0, help='Field index for typing')
+    parser.add_argument('--focused', action='store_true',
+                        help='type: into the focused field if it is in the dialog (else --field)')
+    parser.add_argument('--id', dest='element_id', help='click/type: element id from `read` output')
     parser.add_argument('--timeout', '-t', type=int, default=10, help='Timeout for wait action')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--max-depth', type=int, help='read: do not expand below this depth')
+    parser.add_argument('--max-nodes', type=int, help='read: stop after this many elements')
+    parser.add_argument('--time-budget-ms', type=int, help='read: stop reading after this long')
+    parser.add_argument('--root', help='read: only the subtree at this path')
     
-    args = parser.parse_args()
-    desktop = Desktop(backend="uia")
+    args = parser.parse_args(argv)
+    desktop = get_backend()
     
     if args.action == 'list':
         dialogs = find_dialogs(desktop)
@@ -241,25 +347,20 @@ def main():
                     print()
     
     elif args.action == 'read':
-        dialogs = find_dialogs(desktop)
-        
-        if args.window:
-            target = None
-            for d in dialogs:
-                if args.window.lower() in d['title'].lower():
-                    target = d['window']
-                    break
-            if not target:
+        target = find_target(desktop, args.window, fallback_active=False)
+        if not target:
+            if args.window:
                 print(f"Dialog '{args.window}' not found")
-                sys.exit(1)
-        elif dialogs:
-            # Get the frontmost/most recent dialog
-            target = dialogs[0]['window']
-        else:
-            print("No dialogs found")
+            else:
+                print("No dialogs found")
             sys.exit(1)
         
-        content = read_dialog(target)
+        budget = Budget(args.max_depth, args.max_nodes,
+                        args.time_budget_ms / 1000.0 if args.time_budget_ms is not None else None)
+        hits = []
+        content = read_dialog(target, budget, args.root, hits)
+        for entry in hits:
+            print(entry.describe(), file=sys.stderr)
         if args.json:
             # Convert tuples to lists for JSON
             for key in ['buttons', 'text_fields', 'checkboxes']:
@@ -280,32 +381,30 @@ def main():
                 for btn in content['buttons']:
                     enabled = "" if btn['enabled'] else " [DISABLED]"
                     coords = f" @ {btn['center']}" if 'center' in btn else ""
-                    print(f"  [{btn['name']}]{coords}{enabled}")
+                    handle = f" id={btn['id']}" if 'id' in btn else ""
+                    print(f"  [{btn['name']}]{coords}{enabled}{handle}")
                 print()
             if 'text_fields' in content:
                 print("Text Fields:")
                 for i, field in enumerate(content['text_fields']):
-                    print(f"  {i}: {field.get('value', '(empty)')}")
+                    handle = f" id={field['id']}" if 'id' in field else ""
+                    print(f"  {i}: {field.get('value', '(empty)')}{handle}")
                 print()
+            if 'truncated' in content:
+                print(f"Truncated ({budget.visited} elements read); read more with --root PATH:")
+                print("\n".join(budget.summary()))
     
     elif args.action == 'click':
+        if args.element_id:
+            success, msg = click_by_id(args.element_id)
+            print(msg)
+            sys.exit(0 if success else 1)
+        
         if not args.value:
             print("Error: Button name required")
             sys.exit(1)
         
-        dialogs = find_dialogs(desktop)
-        if args.window:
-            target = None
-            for d in dialogs:
-                if args.window.lower() in d['title'].lower():
-                    target = d['window']
-                    break
-        elif dialogs:
-            target = dialogs[0]['window']
-        else:
-            # Try finding button in active window
-            target = desktop.window(active_only=True)
-        
+        target = find_target(desktop, args.window)
         if not target:
             print("No dialog found")
             sys.exit(1)
@@ -319,23 +418,17 @@ def main():
             print("Error: Text to type required")
             sys.exit(1)
         
-        dialogs = find_dialogs(desktop)
-        if args.window:
-            target = None
-            for d in dialogs:
-                if args.window.lower() in d['title'].lower():
-                    target = d['window']
-                    break
-        elif dialogs:
-            target = dialogs[0]['window']
-        else:
-            target = desktop.window(active_only=True)
+        if args.element_id:
+            success, msg = type_by_id(args.element_id, args.value)
+            print(msg)
+            sys.exit(0 if success else 1)
         
+        target = find_target(desktop, args.window)
         if not target:
             print("No dialog found")
             sys.exit(1)
         
-        success, msg = type_in_field(target, args.value, args.field)
+        success, msg = type_in_field(target, args.value, args.field, args.focused)
         print(msg)
         sys.exit(0 if success else 1)
     
@@ -347,37 +440,26 @@ def main():
         
         target = dialogs[0]['window']
         if args.window:
-            for d in dialogs:
-                if args.window.lower() in d['title'].lower():
-                    target = d['window']
-                    break
+            matching = find_dialogs(desktop, args.window)
+            if matching:
+                target = matching[0]['window']
         
         success, msg = dismiss_dialog(target)
         print(msg)
         sys.exit(0 if success else 1)
     
     elif args.action == 'wait':
-        """Wait for a dialog to appear."""
-        start_time = time.time()
+        """Wait for a dialog to appear (woken by window-opened events)."""
         dialog_title = args.value if args.value else None
-        
-        while time.time() - start_time < args.timeout:
-            dialogs = find_dialogs(desktop)
-            
-            if dialog_title:
-                for d in dialogs:
-                    if dialog_title.lower() in d['title'].lower():
-                        print(f"Dialog found: {d['title']}")
-                        sys.exit(0)
-            elif dialogs:
-                print(f"Dialog found: {dialogs[0]['title']}")
-                sys.exit(0)
-            
-            time.sleep(0.5)
+        result = wait_for(desktop, [dialog_open(dialog_title)], timeout=args.timeout)
+        if result.ok:
+            print(f"Dialog found: {result.results[0]['title']}")
+            sys.exit(0)
         
         print(f"Timeout: No dialog found after {args.timeout}s")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    from wincontrol.client import run
+    run(__file__, main)
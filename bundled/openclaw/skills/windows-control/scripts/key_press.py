@@ -4,24 +4,37 @@ Key Press - Press key combination
 Usage: py key_press.py "ctrl+s"
        py key_press.py "enter"
 """
-import pyautogui
 import sys
+from wincontrol import get_backend
 
-if len(sys.argv) < 2:
-    print("Usage: py key_press.py \"key_combo\"")
-    sys.exit(1)
 
-key_combo = sys.argv[1]
-
-try:
+def press_keys(key_combo):
+    """Press a single key or a '+'-joined combination."""
+    keyboard = get_backend().input()
     # Handle key combinations (e.g., "ctrl+s")
     if "+" in key_combo:
         keys = key_combo.split("+")
-        pyautogui.hotkey(*keys)
+        keyboard.hotkey(*keys)
     else:
-        pyautogui.press(key_combo)
-    
-    print(f"Pressed: {key_combo}")
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+        keyboard.press(key_combo)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
+        print("Usage: py key_press.py \"key_combo\"")
+        sys.exit(1)
+
+    key_combo = argv[0]
+
+    try:
+        press_keys(key_combo)
+        print(f"Pressed: {key_combo}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
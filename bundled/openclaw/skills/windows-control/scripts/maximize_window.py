@@ -5,32 +5,39 @@ Maximize Window
 Usage: py maximize_window.py "Window Title"
 """
 import sys
-import io
-from pywinauto import Desktop
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-if len(sys.argv) < 2:
-    print("Usage: py maximize_window.py \"Window Title\"")
-    sys.exit(1)
-
-window_title = sys.argv[1]
-
-try:
-    desktop = Desktop(backend="uia")
-    windows = desktop.windows()
-    
-    for window in windows:
-        if window_title.lower() in window.window_text().lower():
-            if not window.is_maximized():
-                window.maximize()
-                print(f"Maximized: {window.window_text()}")
-            else:
-                print(f"Already maximized: {window.window_text()}")
+from wincontrol import get_backend
+from wincontrol.windows import find_window
+
+
+def maximize(window):
+    """Maximize a window unless it already is. Returns a status message."""
+    if not window.is_maximized():
+        window.maximize()
+        return f"Maximized: {window.window_text()}"
+    return f"Already maximized: {window.window_text()}"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
+        print("Usage: py maximize_window.py \"Window Title\"")
+        sys.exit(1)
+
+    window_title = argv[0]
+
+    try:
+        window = find_window(get_backend(), window_title)
+        if window:
+            print(maximize(window))
             sys.exit(0)
-            
-    print(f"Error: Window containing '{window_title}' not found")
-    sys.exit(1)
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+
+        print(f"Error: Window containing '{window_title}' not found")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
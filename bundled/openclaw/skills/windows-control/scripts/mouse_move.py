@@ -3,19 +3,27 @@
 Mouse Move - Move mouse to coordinates
 Usage: py mouse_move.py 500 300
 """
-import pyautogui
 import sys
+from wincontrol import get_backend
 
-if len(sys.argv) < 3:
-    print("Usage: py mouse_move.py X Y")
-    sys.exit(1)
 
-x = int(sys.argv[1])
-y = int(sys.argv[2])
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print("Usage: py mouse_move.py X Y")
+        sys.exit(1)
 
-try:
-    pyautogui.moveTo(x, y, duration=0.2)
-    print(f"Moved mouse to ({x}, {y})")
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+    x = int(argv[0])
+    y = int(argv[1])
+
+    try:
+        get_backend().input().moveTo(x, y, duration=0.2)
+        print(f"Moved mouse to ({x}, {y})")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -6,21 +6,44 @@ Usage: py read_ui_elements.py "Window Title"
        py read_ui_elements.py "Chrome"
        py read_ui_elements.py "Chrome" --buttons-only
        py read_ui_elements.py "Chrome" --links-only
+       py read_ui_elements.py "Chrome" --max-depth 4 --max-nodes 300 --time-budget-ms 500
+       py read_ui_elements.py "Chrome" --root 0.1     # Drill into a truncated subtree
 
 Returns structured list of interactive elements with their names and types.
+Each element carries an id (window handle + runtime id) that
+click_element.py --id accepts without searching again.
 """
 import sys
-import io
 import json
 import argparse
-from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
+from wincontrol import cache, get_backend
+from wincontrol.handles import element_id, remember
+from wincontrol.snapshot import BASIC, Budget, rect_dict, walk
+from wincontrol.windows import find_window, window_titles
 
-# Fix Windows console encoding
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+# Runtime ids make up the element handles in the output
+ELEMENT_PROPS = BASIC + ('runtime_id',)
 
-def get_ui_elements(window, buttons_only=False, links_only=False):
-    """Extract interactive UI elements from a window."""
+
+def iter_nodes(window, budget=None, root=None, hits=None):
+    """Nodes worth reporting: a bounded walk, or a columnar capture of the whole window.
+
+    The capture may be a fresh cached one (wincontrol.cache); its entry is
+    then appended to hits.
+    """
+    if root or (budget is not None and budget.any()):
+        return walk(window, ELEMENT_PROPS, budget=budget, root=root)
+    # Columnar capture; Nodes are only built for elements that are output
+    tree, entry = cache.snapshot(window, ELEMENT_PROPS)
+    if entry is not None and hits is not None:
+        hits.append(entry)
+    wanted = set(tree.select(named=True)) | set(tree.select(types=['Edit', 'Document']))
+    return (tree.node(i) for i in sorted(wanted))
+
+
+def get_ui_elements(window, buttons_only=False, links_only=False, budget=None, root=None,
+                    hits=None):
+    """Extract interactive UI elements from a window (optionally bounded, see Budget)."""
     elements = {
         'buttons': [],
         'links': [],
@@ -33,66 +56,62 @@ def get_ui_elements(window, buttons_only=False, links_only=False):
         'dropdowns': [],
         'other': []
     }
+    shown = []
     
     try:
-        for ctrl in window.descendants():
-            try:
-                ctrl_type = ctrl.element_info.control_type
-                name = ctrl.window_text().strip() if ctrl.window_text() else ""
-                
-                # Skip empty names for most types
-                if not name and ctrl_type not in ['Edit', 'Document']:
-                    continue
-                
-                elem_info = {
-                    'name': name,
-                    'type': ctrl_type,
-                    'enabled': ctrl.is_enabled() if hasattr(ctrl, 'is_enabled') else True
-                }
-                
-                # Try to get bounding rect for click coordinates
-                try:
-                    rect = ctrl.rectangle()
-                    elem_info['rect'] = {
-                        'left': rect.left,
-                        'top': rect.top,
-                        'right': rect.right,
-                        'bottom': rect.bottom,
-                        'center_x': (rect.left + rect.right) // 2,
-                        'center_y': (rect.top + rect.bottom) // 2
-                    }
-                except:
-                    pass
-                
-                # Categorize by control type
-                if ctrl_type == 'Button':
-                    elements['buttons'].append(elem_info)
-                elif ctrl_type == 'Hyperlink':
-                    elements['links'].append(elem_info)
-                elif ctrl_type == 'MenuItem':
-                    elements['menu_items'].append(elem_info)
-                elif ctrl_type == 'ListItem':
-                    elements['list_items'].append(elem_info)
-                elif ctrl_type == 'TabItem':
-                    elements['tabs'].append(elem_info)
-                elif ctrl_type == 'CheckBox':
-                    elements['checkboxes'].append(elem_info)
-                elif ctrl_type == 'RadioButton':
-                    elements['radio_buttons'].append(elem_info)
-                elif ctrl_type in ['Edit', 'Document']:
-                    elem_info['value'] = name[:100] if name else ""  # Truncate long text
-                    elements['text_fields'].append(elem_info)
-                elif ctrl_type == 'ComboBox':
-                    elements['dropdowns'].append(elem_info)
-                elif name:  # Other interactive elements with names
-                    elements['other'].append(elem_info)
-                    
-            except Exception:
+        for node in iter_nodes(window, budget, root, hits):
+            ctrl_type = node.control_type
+            name = node.name.strip() if node.name else ""
+            
+            # Skip empty names for most types
+            if not name and ctrl_type not in ['Edit', 'Document']:
                 continue
+            
+            elem_info = {
+                'name': name,
+                'type': ctrl_type,
+                'enabled': node.enabled if node.enabled is not None else True
+            }
+            
+            # Bounding rect for click coordinates
+            if node.rect:
+                elem_info['rect'] = rect_dict(node.rect)
+                elem_info['rect']['center_x'], elem_info['rect']['center_y'] = node.center
+            
+            handle = element_id(window, node)
+            if handle:
+                elem_info['id'] = handle
+                shown.append(node)
+            
+            # Categorize by control type
+            if ctrl_type == 'Button':
+                elements['buttons'].append(elem_info)
+            elif ctrl_type == 'Hyperlink':
+                elements['links'].append(elem_info)
+            elif ctrl_type == 'MenuItem':
+                elements['menu_items'].append(elem_info)
+            elif ctrl_type == 'ListItem':
+                elements['list_items'].append(elem_info)
+            elif ctrl_type == 'TabItem':
+                elements['tabs'].append(elem_info)
+            elif ctrl_type == 'CheckBox':
+                elements['checkboxes'].append(elem_info)
+            elif ctrl_type == 'RadioButton':
+                elements['radio_buttons'].append(elem_info)
+            elif ctrl_type in ['Edit', 'Document']:
+                elem_info['value'] = name[:100] if name else ""  # Truncate long text
+                elements['text_fields'].append(elem_info)
+            elif ctrl_type == 'ComboBox':
+                elements['dropdowns'].append(elem_info)
+            elif name:  # Other interactive elements with names
+                elements['other'].append(elem_info)
                 
     except Exception as e:
         print(f"Error scanning elements: {e}", file=sys.stderr)
     
+    # Keep the handed-out ids resolvable (click_element.py --id)
+    remember(window, shown)
+    
     # Filter if requested
     if buttons_only:
         return {'buttons': elements['buttons']}
@@ -103,41 +122,47 @@ def get_ui_elements(window, buttons_only=False, links_only=False):
     return {k: v for k, v in elements.items() if v}
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Read UI elements from a window')
     parser.add_argument('window_title', help='Window title to search for')
     parser.add_argument('--buttons-only', action='store_true', help='Only return buttons')
     parser.add_argument('--links-only', action='store_true', help='Only return links')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--max-depth', type=int, help='Do not expand elements below this depth')
+    parser.add_argument('--max-nodes', type=int, help='Stop after reading this many elements')
+    parser.add_argument('--time-budget-ms', type=int, help='Stop reading after this long')
+    parser.add_argument('--root', help='Read only the subtree at this path (from a truncated list)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    budget = Budget(args.max_depth, args.max_nodes,
+                    args.time_budget_ms / 1000.0 if args.time_budget_ms is not None else None)
     
     try:
-        desktop = Desktop(backend="uia")
-        windows = desktop.windows()
-        matching_window = None
-        
-        for window in windows:
-            title = window.window_text()
-            if args.window_title.lower() in title.lower():
-                matching_window = window
-                break
+        desktop = get_backend()
+        matching_window = find_window(desktop, args.window_title)
         
         if not matching_window:
             print(f"Error: Window containing '{args.window_title}' not found")
             print("\nAvailable windows:")
-            for w in windows:
-                if w.window_text():
-                    print(f"  - {w.window_text()}")
+            for title in window_titles(desktop):
+                print(f"  - {title}")
             sys.exit(1)
         
+        hits = []
         elements = get_ui_elements(
             matching_window, 
             buttons_only=args.buttons_only,
-            links_only=args.links_only
+            links_only=args.links_only,
+            budget=budget,
+            root=args.root,
+            hits=hits
         )
+        for entry in hits:
+            print(entry.describe(), file=sys.stderr)
         
         if args.json:
+            if budget.truncated:
+                elements['truncated'] = budget.truncated
             print(json.dumps(elements, indent=2, ensure_ascii=False))
         else:
             print(f"Window: {matching_window.window_text()}\n")
@@ -149,16 +174,18 @@ def main():
                         if 'rect' in item:
                             coords = f" @ ({item['rect']['center_x']}, {item['rect']['center_y']})"
                         enabled = "" if item.get('enabled', True) else " [DISABLED]"
-                        print(f"  [{item['type']}] {item['name']}{coords}{enabled}")
+                        handle = f" id={item['id']}" if 'id' in item else ""
+                        print(f"  [{item['type']}] {item['name']}{coords}{enabled}{handle}")
                     print()
+            if budget.truncated:
+                print(f"Truncated ({budget.visited} elements read); read more with --root PATH:")
+                print("\n".join(budget.summary()))
                     
-    except ElementNotFoundError:
-        print(f"Error: Window '{args.window_title}' not found")
-        sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    from wincontrol.client import run
+    run(__file__, main)
@@ -7,21 +7,33 @@ Usage: py read_webpage.py                           # Read active browser window
        py read_webpage.py "Firefox" --buttons       # Include buttons
        py read_webpage.py "Edge" --links            # Include links with URLs
        py read_webpage.py "Chrome" --full           # Full extraction (all elements)
+       py read_webpage.py "Chrome" -l --stream --max-links 10 --max-text 20   # NDJSON, stop early
+
+Limits (--max-text/--max-links/--max-buttons/--max-nodes/--max-bytes) are
+applied while walking the page: the walk stops once every requested
+category is full, so large pages are not read to the end. Limits that
+cannot end the walk (e.g. --max-text with --links uncapped) only trim
+the output of the usual one-batch capture. --stream prints one JSON
+object per line (kinds: page, heading, text, button, link, input,
+image, end); lines arrive as the page is walked when the limits can stop
+the walk, otherwise after the capture.
 
 Returns structured content from browser webpages.
 """
 import sys
-import io
 import json
+import time
 import argparse
-from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
-
-# Fix Windows console encoding
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+from wincontrol import cache, get_backend
+from wincontrol.handles import element_id, remember
+from wincontrol.snapshot import walk
+from wincontrol.windows import find_window, window_titles
 
 BROWSER_NAMES = ['chrome', 'firefox', 'edge', 'brave', 'opera', 'vivaldi', 'arc']
 
+# Fetched for the whole page in one batch; 'value' only for --full
+WEBPAGE_PROPS = ('name', 'control_type', 'rect', 'automation_id', 'runtime_id', 'value')
+
 
 def is_browser_window(title):
     """Check if window title indicates a browser."""
@@ -31,23 +43,188 @@ def is_browser_window(title):
 
 def find_browser_window(desktop, browser_hint=None):
     """Find a browser window."""
-    windows = desktop.windows()
-    
-    for window in windows:
-        try:
-            title = window.window_text()
-            if browser_hint:
-                if browser_hint.lower() in title.lower():
-                    return window, title
-            elif is_browser_window(title):
-                return window, title
-        except:
-            continue
+    if browser_hint:
+        window = find_window(desktop, browser_hint)
+    else:
+        window = find_window(desktop, 'regex:' + '|'.join(BROWSER_NAMES))
     
+    if window:
+        return window, window.window_text()
     return None, None
 
 
-def extract_webpage_content(window, include_buttons=False, include_links=False, full=False):
+# Stream line kind for each content category
+KINDS = {'text': 'text', 'headings': 'heading', 'buttons': 'button', 'links': 'link',
+         'inputs': 'input', 'images': 'image'}
+
+
+class Limits:
+    """Traversal-level output limits.
+
+    Per-category caps (max_text covers text and headings) plus overall
+    caps on nodes visited and output bytes. stop_reason() is set once
+    every requested category has reached its cap, so the walk can stop.
+    """
+
+    def __init__(self, max_text=None, max_links=None, max_buttons=None, max_nodes=None,
+                 max_bytes=None):
+        self.caps = {'text': max_text, 'links': max_links, 'buttons': max_buttons}
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.counts = {}
+        self.nodes = 0
+        self.bytes = 0
+        self.stopped = None
+
+    def any(self):
+        return any(v is not None for v in self.caps.values()) \
+            or self.max_nodes is not None or self.max_bytes is not None
+
+    def can_stop(self, requested):
+        """True if these limits can end a walk over requested before the page ends."""
+        if self.max_nodes is not None or self.max_bytes is not None:
+            return True
+        return all(self.caps.get(self.bucket(c)) is not None for c in requested)
+
+    def bucket(self, category):
+        return 'text' if category == 'headings' else category
+
+    def accepts(self, category):
+        cap = self.caps.get(self.bucket(category))
+        return cap is None or self.counts.get(self.bucket(category), 0) < cap
+
+    def count(self, category, size):
+        bucket = self.bucket(category)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.bytes += size
+
+    def stop_reason(self, requested):
+        """Why the walk should stop now ('max-nodes', ...), or None."""
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            return 'max-nodes'
+        if self.max_bytes is not None and self.bytes >= self.max_bytes:
+            return 'max-bytes'
+        buckets = {self.bucket(c) for c in requested}
+        if all(not self.accepts(b) for b in buckets):
+            return 'limits'
+        return None
+
+
+def requested_categories(include_buttons=False, include_links=False, full=False):
+    categories = ['headings', 'text']
+    if include_buttons or full:
+        categories.append('buttons')
+    if include_links or full:
+        categories.append('links')
+    if full:
+        categories += ['inputs', 'images']
+    return categories
+
+
+def classify(node, requested):
+    """(category, element dict) for a captured node, or None if not wanted."""
+    ctrl_type = node.control_type
+    name = node.name.strip() if node.name else ""
+    if not name:
+        return None
+    
+    # Skip very long text (probably not useful)
+    if len(name) > 1000:
+        name = name[:1000] + "..."
+    
+    elem = {'name': name, 'type': ctrl_type}
+    
+    # Get coordinates for clickable elements
+    if ctrl_type in ['Button', 'Hyperlink', 'Link'] and node.rect:
+        elem['center'] = node.center
+    
+    # Categorize content
+    if ctrl_type in ['Text', 'Static']:
+        # Check if it looks like a heading
+        if len(name) < 100 and name.isupper() or name.endswith(':'):
+            return 'headings', name
+        return 'text', name
+    if ctrl_type == 'Button' and 'buttons' in requested:
+        return 'buttons', elem
+    if ctrl_type in ['Hyperlink', 'Link'] and 'links' in requested:
+        # The URL is exposed as the automation id
+        automation_id = node.automation_id
+        if automation_id and automation_id.startswith('http'):
+            elem['url'] = automation_id
+        return 'links', elem
+    if ctrl_type in ['Edit', 'ComboBox'] and 'inputs' in requested:
+        elem['value'] = node.value or ""
+        return 'inputs', elem
+    if ctrl_type == 'Image' and 'images' in requested:
+        return 'images', elem
+    return None
+
+
+def stream_line(category, item):
+    """One NDJSON record for a content item."""
+    record = {'kind': KINDS[category]}
+    if isinstance(item, str):
+        record['name'] = item
+    else:
+        record.update(item)
+        if 'center' in record:
+            record['center'] = list(record['center'])
+    return json.dumps(record, ensure_ascii=False)
+
+
+def iter_webpage_content(window, include_buttons=False, include_links=False, full=False,
+                         limits=None):
+    """Yield (category, item) in page order, walking only as far as the limits need.
+
+    Text is de-duplicated as it is found. The page is captured in one
+    batch unless the limits can end the walk early (Limits.can_stop); then
+    it is walked lazily and the walk stops as soon as limits.stop_reason()
+    says so (kept in limits.stopped). Other limits only trim the output.
+    """
+    requested = requested_categories(include_buttons, include_links, full)
+    props = WEBPAGE_PROPS if full else WEBPAGE_PROPS[:-1]
+    if limits is not None and limits.can_stop(requested):
+        nodes = walk(window, props)
+    else:
+        # Columnar capture (or a fresh cached one); Nodes are only built for named elements
+        tree, _ = cache.snapshot(window, props)
+        nodes = (tree.node(i) for i in tree.select(named=True))
+    seen = set()
+    shown = []
+    try:
+        for node in nodes:
+            if limits is not None:
+                limits.nodes += 1
+            found = classify(node, requested)
+            if found is not None:
+                category, item = found
+                if category == 'text':
+                    if item in seen:
+                        found = None
+                    seen.add(item)
+            if found is not None and (limits is None or limits.accepts(category)):
+                if isinstance(item, dict):
+                    # Buttons, links and inputs get an id for click_element.py --id
+                    handle = element_id(window, node)
+                    if handle:
+                        item['id'] = handle
+                        shown.append(node)
+                if limits is not None:
+                    limits.count(category, len(stream_line(category, item).encode('utf-8')) + 1)
+                yield category, item
+            if limits is not None:
+                limits.stopped = limits.stop_reason(requested)
+                if limits.stopped:
+                    return
+    finally:
+        close = getattr(nodes, 'close', None)
+        if close:
+            close()
+        remember(window, shown)
+
+
+def extract_webpage_content(window, include_buttons=False, include_links=False, full=False,
+                            limits=None):
     """Extract content from a browser window."""
     content = {
         'title': window.window_text(),
@@ -60,106 +237,82 @@ def extract_webpage_content(window, include_buttons=False, include_links=False,
     }
     
     try:
-        for ctrl in window.descendants():
-            try:
-                ctrl_type = ctrl.element_info.control_type
-                name = ctrl.window_text().strip() if ctrl.window_text() else ""
-                
-                if not name:
-                    continue
-                
-                # Skip very long text (probably not useful)
-                if len(name) > 1000:
-                    name = name[:1000] + "..."
-                
-                elem = {'name': name, 'type': ctrl_type}
-                
-                # Get coordinates for clickable elements
-                if ctrl_type in ['Button', 'Hyperlink', 'Link']:
-                    try:
-                        rect = ctrl.rectangle()
-                        elem['center'] = ((rect.left + rect.right) // 2, (rect.top + rect.bottom) // 2)
-                    except:
-                        pass
-                
-                # Categorize content
-                if ctrl_type in ['Text', 'Static']:
-                    # Check if it looks like a heading
-                    if len(name) < 100 and name.isupper() or name.endswith(':'):
-                        content['headings'].append(name)
-                    else:
-                        content['text'].append(name)
-                        
-                elif ctrl_type == 'Button' and (include_buttons or full):
-                    content['buttons'].append(elem)
-                    
-                elif ctrl_type in ['Hyperlink', 'Link'] and (include_links or full):
-                    # Try to get the URL
-                    try:
-                        automation_id = ctrl.element_info.automation_id
-                        if automation_id and automation_id.startswith('http'):
-                            elem['url'] = automation_id
-                    except:
-                        pass
-                    content['links'].append(elem)
-                    
-                elif ctrl_type in ['Edit', 'ComboBox'] and full:
-                    try:
-                        elem['value'] = ctrl.get_value() if hasattr(ctrl, 'get_value') else ""
-                    except:
-                        elem['value'] = ""
-                    content['inputs'].append(elem)
-                    
-                elif ctrl_type == 'Image' and full:
-                    content['images'].append(elem)
-                    
-            except:
-                continue
-                
+        for category, item in iter_webpage_content(window, include_buttons, include_links,
+                                                    full, limits):
+            content[category].append(item)
     except Exception as e:
         content['error'] = str(e)
     
-    # Remove duplicates from text
-    seen = set()
-    unique_text = []
-    for t in content['text']:
-        if t not in seen:
-            seen.add(t)
-            unique_text.append(t)
-    content['text'] = unique_text
+    if limits is not None and limits.stopped:
+        content['stopped'] = limits.stopped
     
     # Clean up empty fields
     return {k: v for k, v in content.items() if v}
 
 
-def main():
+def stream_webpage_content(window, include_buttons=False, include_links=False, full=False,
+                           limits=None):
+    """Print one NDJSON record per item as soon as it is found."""
+    start = time.perf_counter()
+    limits = limits or Limits()
+    print(json.dumps({'kind': 'page', 'title': window.window_text()}, ensure_ascii=False),
+          flush=True)
+    items = 0
+    error = None
+    try:
+        for category, item in iter_webpage_content(window, include_buttons, include_links,
+                                                    full, limits):
+            print(stream_line(category, item), flush=True)
+            items += 1
+    except Exception as e:
+        error = str(e)
+    end = {'kind': 'end', 'items': items, 'nodes': limits.nodes,
+           'stopped': limits.stopped,
+           'ms': round((time.perf_counter() - start) * 1000, 1)}
+    if error:
+        end['error'] = error
+    print(json.dumps(end, ensure_ascii=False), flush=True)
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Read content from browser window')
     parser.add_argument('browser', nargs='?', help='Browser name to target')
     parser.add_argument('--buttons', '-b', action='store_true', help='Include buttons')
     parser.add_argument('--links', '-l', action='store_true', help='Include links')
     parser.add_argument('--full', '-f', action='store_true', help='Full extraction (all elements)')
     parser.add_argument('--json', '-j', action='store_true', help='Output as JSON')
-    parser.add_argument('--max-text', type=int, default=50, help='Max text items to show')
+    parser.add_argument('--max-text', type=int, help='Max text items (and headings) to read')
+    parser.add_argument('--max-links', type=int, help='Max links to read')
+    parser.add_argument('--max-buttons', type=int, help='Max buttons to read')
+    parser.add_argument('--max-nodes', type=int, help='Stop after visiting this many elements')
+    parser.add_argument('--max-bytes', type=int, help='Stop after this much output (JSON bytes)')
+    parser.add_argument('--stream', '-s', action='store_true',
+                        help='Print NDJSON records as elements are found')
     
-    args = parser.parse_args()
-    desktop = Desktop(backend="uia")
+    args = parser.parse_args(argv)
+    desktop = get_backend()
     
     window, title = find_browser_window(desktop, args.browser)
     
     if not window:
         print("No browser window found")
         print("\nAvailable windows:")
-        for w in desktop.windows():
-            t = w.window_text()
-            if t:
-                print(f"  - {t}")
+        for t in window_titles(desktop):
+            print(f"  - {t}")
         sys.exit(1)
     
+    limits = Limits(args.max_text, args.max_links, args.max_buttons, args.max_nodes, args.max_bytes)
+    
+    if args.stream:
+        stream_webpage_content(window, args.buttons, args.links, args.full, limits)
+        return
+    
     content = extract_webpage_content(
         window,
         include_buttons=args.buttons,
         include_links=args.links,
-        full=args.full
+        full=args.full,
+        limits=limits if limits.any() else None
     )
     
     if args.json:
@@ -180,20 +333,22 @@ def main():
             print()
         
         if 'text' in content:
+            max_text = args.max_text or 50
             print("=== TEXT CONTENT ===")
-            for i, t in enumerate(content['text'][:args.max_text]):
+            for i, t in enumerate(content['text'][:max_text]):
                 # Clean up text for display
                 display = t.replace('\n', ' ').replace('\r', '')[:200]
                 print(f"  {display}")
-            if len(content['text']) > args.max_text:
-                print(f"  ... and {len(content['text']) - args.max_text} more items")
+            if len(content['text']) > max_text:
+                print(f"  ... and {len(content['text']) - max_text} more items")
             print()
         
         if 'buttons' in content:
             print("=== BUTTONS ===")
             for btn in content['buttons'][:20]:
                 coords = f" @ {btn['center']}" if 'center' in btn else ""
-                print(f"  [{btn['name']}]{coords}")
+                handle = f" id={btn['id']}" if 'id' in btn else ""
+                print(f"  [{btn['name']}]{coords}{handle}")
             print()
         
         if 'links' in content:
@@ -201,7 +356,8 @@ def main():
             for link in content['links'][:30]:
                 url = f" -> {link['url']}" if 'url' in link else ""
                 coords = f" @ {link['center']}" if 'center' in link else ""
-                print(f"  {link['name']}{url}{coords}")
+                handle = f" id={link['id']}" if 'id' in link else ""
+                print(f"  {link['name']}{url}{coords}{handle}")
             print()
         
         if 'inputs' in content:
@@ -209,7 +365,11 @@ def main():
             for inp in content['inputs'][:10]:
                 print(f"  [{inp['name']}]: {inp.get('value', '')}")
             print()
+        
+        if 'stopped' in content:
+            print(f"(Stopped early: {content['stopped']} reached after {limits.nodes} elements)")
 
 
 if __name__ == "__main__":
-    main()
+    from wincontrol.client import run
+    run(__file__, main)
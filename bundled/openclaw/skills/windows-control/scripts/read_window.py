@@ -5,73 +5,176 @@ Read Window - Extract text from a specific window
 Usage: py read_window.py "Window Title"
        py read_window.py "Notepad"
        py read_window.py "Visual Studio Code"
+       py read_window.py "Notepad" --token              # Also print a change token
+       py read_window.py "Notepad" --changes-since TOKEN  # Only what changed since then
+       py read_window.py "Chrome" --max-depth 3 --max-nodes 500 --time-budget-ms 800
+       py read_window.py "Chrome" --root 0.2.1       # Only the subtree at that path
+
+--changes-since prints "+ text" for new controls, "~ text" for changed
+ones and "- text" for removed ones, followed by a fresh "Token: ..." line.
+
+--max-depth/--max-nodes/--time-budget-ms walk the window lazily and stop
+at the limit; subtrees left unread are listed with their path, which
+--root reads on a follow-up call.
 """
 import sys
-import io
-from pywinauto import Desktop
-from pywinauto.findwindows import ElementNotFoundError
-
-# Fix Windows console encoding
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-if len(sys.argv) < 2:
-    print("Usage: py read_window.py \"Window Title\"")
-    sys.exit(1)
-
-window_title = sys.argv[1]
-
-try:
-    # Get all windows
-    desktop = Desktop(backend="uia")
-    
-    # Find window by partial title match
-    windows = desktop.windows()
-    matching_window = None
-    
-    for window in windows:
-        title = window.window_text()
-        if window_title.lower() in title.lower():
-            matching_window = window
-            break
-    
-    if not matching_window:
-        print(f"Error: Window containing '{window_title}' not found")
-        print("\nAvailable windows:")
-        for w in windows:
-            if w.window_text():  # Only show windows with titles
-                print(f"  - {w.window_text()}")
-        sys.exit(1)
-    
-    # Get all text from the window
+from wincontrol import cache, get_backend
+from wincontrol.deadline import DeadlineExceeded
+from wincontrol.snapshot import Budget, capture, read_nodes
+from wincontrol.treediff import diff, fingerprint, load_state, save_state
+from wincontrol.windows import find_window, window_titles
+
+# Properties needed to fingerprint a window for --changes-since
+DIFF_PROPS = ('name', 'control_type', 'runtime_id')
+
+
+def unique_texts(names):
+    """Non-empty stripped names, de-duplicated in order."""
+    seen = set()
     texts = []
+    for name in names:
+        text = name.strip() if name else ''
+        if text and text not in seen:
+            seen.add(text)
+            texts.append(text)
+    return texts
+
+
+def read_text(window, budget=None, root=None, hits=None):
+    """All non-empty control texts in a window, de-duplicated in order.
+
+    Unbounded reads fetch every control's text in one batched request, or
+    reuse a fresh snapshot of the window (wincontrol.cache; the cache entry
+    is appended to hits when one is used). With a budget or root the
+    window is walked lazily (see snapshot.walk). Raises DeadlineExceeded
+    if the window does not answer in time and LookupError if root does
+    not exist.
+    """
+    try:
+        if root or (budget is not None and budget.any()):
+            return unique_texts(node.name for node in read_nodes(window, ('name',), budget, root))
+        tree, entry = cache.snapshot(window, ('name',))
+        if entry is not None and hits is not None:
+            hits.append(entry)
+        return unique_texts(tree.name(i) for i in range(len(tree)))
+    except (DeadlineExceeded, LookupError):
+        raise
+    except Exception:
+        return []
+
+
+def read_changes(window, token=None):
+    """Diff the window against the state stored under token.
+
+    Returns (changes, old_state, state, new_token); changes is None when
+    there is no usable previous state (no token, expired, other window).
+    """
+    owner = str(window.handle)
+    state, _ = fingerprint(capture(window, DIFF_PROPS))
+    old = load_state(token, owner) if token else None
+    changes = diff(old, state) if old is not None else None
+    return changes, old, state, save_state(state, owner)
+
+
+def print_changes(changes, old, state):
+    if not changes:
+        print("No changes")
+        return
+    for key in changes.appeared:
+        if state.names[key]:
+            print(f"+ {state.names[key]}")
+    for key in changes.changed:
+        print(f"~ {state.names[key]}")
+    for key in changes.removed:
+        if old.names.get(key):
+            print(f"- {old.names[key]}")
+
+
+def print_truncated(budget):
+    if budget.truncated:
+        print(f"\nTruncated ({budget.visited} elements read); read more with --root PATH:")
+        print("\n".join(budget.summary()))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    positional, token, want_token, root = [], None, False, None
+    limits = {}
+    args = iter(argv)
+    try:
+        for arg in args:
+            if arg == '--token':
+                want_token = True
+            elif arg == '--changes-since':
+                token = next(args, '')
+            elif arg in ('--max-depth', '--max-nodes', '--time-budget-ms'):
+                limits[arg] = int(next(args, ''))
+            elif arg == '--root':
+                root = next(args, '')
+            else:
+                positional.append(arg)
+    except ValueError:
+        print("Error: --max-depth, --max-nodes and --time-budget-ms take a number")
+        sys.exit(1)
+    if len(positional) < 1:
+        print("Usage: py read_window.py \"Window Title\" [--token | --changes-since TOKEN]"
+              " [--max-depth N] [--max-nodes N] [--time-budget-ms MS] [--root PATH]")
+        sys.exit(1)
+    budget = Budget(limits.get('--max-depth'), limits.get('--max-nodes'),
+                    limits['--time-budget-ms'] / 1000.0 if '--time-budget-ms' in limits else None)
+    if (want_token or token is not None) and (budget.any() or root):
+        print("Error: --token/--changes-since need the whole window; drop the limits and --root")
+        sys.exit(1)
+
+    window_title = positional[0]
+
     try:
-        # Try to get all child controls with text
-        for ctrl in matching_window.descendants():
+        # Find window by partial title match
+        backend = get_backend()
+        matching_window = find_window(backend, window_title)
+
+        if not matching_window:
+            print(f"Error: Window containing '{window_title}' not found")
+            print("\nAvailable windows:")
+            for title in window_titles(backend):  # Only show windows with titles
+                print(f"  - {title}")
+            sys.exit(1)
+
+        if want_token or token is not None:
             try:
-                text = ctrl.window_text()
-                if text and text.strip():
-                    texts.append(text.strip())
-            except:
-                pass
-    except:
-        pass
-    
-    if texts:
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_texts = []
-        for t in texts:
-            if t not in seen:
-                seen.add(t)
-                unique_texts.append(t)
-        
-        print("\n".join(unique_texts))
-    else:
-        print(f"No text found in window: {matching_window.window_text()}")
-    
-except ElementNotFoundError:
-    print(f"Error: Window '{window_title}' not found")
-    sys.exit(1)
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+                changes, old, state, new_token = read_changes(matching_window, token)
+            except DeadlineExceeded as e:
+                print(f"Error: Window '{window_title}' is not responding ({e})")
+                sys.exit(1)
+            if changes is not None:
+                print_changes(changes, old, state)
+            else:
+                if token:
+                    print(f"Unknown or expired token '{token}', showing full text", file=sys.stderr)
+                texts = unique_texts(state.names[key] for key in state.names)
+                print("\n".join(texts) if texts else f"No text found in window: {window_title}")
+            print(f"Token: {new_token}")
+            return
+
+        hits = []
+        try:
+            texts = read_text(matching_window, budget, root, hits)
+        except DeadlineExceeded as e:
+            print(f"Error: Window '{window_title}' is not responding ({e})")
+            sys.exit(1)
+        for entry in hits:
+            print(entry.describe(), file=sys.stderr)
+        if texts:
+            print("\n".join(texts))
+        else:
+            print(f"No text found in window: {matching_window.window_text()}")
+        print_truncated(budget)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -3,46 +3,145 @@
 Screenshot - Capture screen and save to file.
 DO NOT output base64 to stdout - it will overflow the context window.
 Instead, save to file and let the AI use the read tool to view it.
+
+Usage: py screenshot.py                          # All monitors
+       py screenshot.py --monitor 1              # One monitor
+       py screenshot.py --window "Notepad"       # One window's rectangle
+       py screenshot.py --region 0 0 1280 720    # left top right bottom
+       py screenshot.py --max-edge 1568          # Downscale for the model
+       py screenshot.py --target-kb 300 --format webp
+       py screenshot.py --format png --optimize
+       py screenshot.py --delta                  # Only what changed since the last --delta
+
+Captures go through wincontrol.capture (BitBlt into a reused buffer on
+Windows), so a monitor, window or region costs only its own pixels.
+Encoding is done by wincontrol.encode. When the image is scaled down
+the output says by how much: screen x = origin x + image x / scale.
+
+Files are kept by wincontrol.shots (an index with bounded retention). If
+the same area looks exactly as it did in a kept screenshot taken with the
+same options, that file is returned without encoding again (--new forces
+a fresh file).
+
+--delta (wincontrol.delta) compares the capture with the previous --delta
+capture of the same area and saves only the changed regions, one image
+each, with their screen rectangles. It saves the full capture instead the
+first time, or when more than --full-above of the area changed.
 """
-import pyautogui
-import os
 import sys
-import time
+import argparse
+from wincontrol import get_backend
+from wincontrol import delta as deltas
+from wincontrol.capture import grab
+from wincontrol.encode import DEFAULT_QUALITY, FORMATS, get_encoder
+from wincontrol.shots import Fingerprint, ScreenshotStore
+from wincontrol.windows import find_window
 
-try:
-    # Take screenshot
-    screenshot = pyautogui.screenshot()
 
-    # Save to temp directory
-    temp_dir = os.environ.get('TEMP', os.environ.get('TMP', '/tmp'))
-    screenshot_dir = os.path.join(temp_dir, 'openclaw-screenshots')
-    os.makedirs(screenshot_dir, exist_ok=True)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Capture the screen to an image file')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--monitor', '-m', type=int, help='Monitor number (1, 2, ...; 0 = all)')
+    target.add_argument('--window', '-w', help='Capture this window (partial title)')
+    target.add_argument('--region', '-r', type=int, nargs=4,
+                        metavar=('LEFT', 'TOP', 'RIGHT', 'BOTTOM'), help='Capture a screen region')
+    parser.add_argument('--format', '-f', default='jpeg', type=str.lower,
+                        choices=list(FORMATS) + ['jpg'], help='Image format (default jpeg)')
+    parser.add_argument('--quality', '-q', type=int, default=DEFAULT_QUALITY,
+                        help=f'JPEG/WebP quality 1-100 (default {DEFAULT_QUALITY})')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Extra compression pass (smaller file, much more CPU)')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--max-edge', type=int, help='Scale down so the longer side is at most N pixels')
+    size.add_argument('--target-kb', type=int, help='Scale down until the file fits in N KB')
+    parser.add_argument('--delta', action='store_true',
+                        help='Save only the regions changed since the last --delta screenshot')
+    parser.add_argument('--full-above', type=float, default=deltas.FULL_ABOVE,
+                        help=f'With --delta, save the full capture when more than this fraction '
+                             f'changed (default {deltas.FULL_ABOVE})')
+    parser.add_argument('--new', action='store_true',
+                        help='Always encode a new file, even if an identical screenshot is kept')
+    args = parser.parse_args(argv)
 
-    # Clean up old screenshots (keep last 20)
     try:
-        files = sorted(
-            [f for f in os.listdir(screenshot_dir) if f.startswith('screenshot-')],
-            key=lambda x: os.path.getmtime(os.path.join(screenshot_dir, x))
-        )
-        for old_file in files[:-20]:
-            os.remove(os.path.join(screenshot_dir, old_file))
-    except Exception:
-        pass
-
-    timestamp = int(time.time() * 1000)
-    filename = f'screenshot-{timestamp}.jpg'
-    filepath = os.path.join(screenshot_dir, filename)
-
-    # Save as JPEG (quality 85 for good visual quality, much smaller than PNG)
-    screenshot.save(filepath, format='JPEG', quality=85, optimize=True)
-
-    # Output ONLY the file path - NO base64!
-    # The AI should use the read tool to view the image.
-    print(f"Screenshot saved: {filepath}")
-    print(f"Screen size: {screenshot.size[0]}x{screenshot.size[1]}")
-    print(f"To view this screenshot, use the read tool on the file path above.")
-    print(f"To show the user, include [screenshot: {filepath}] in your response.")
-
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+        window = None
+        if args.window:
+            window = find_window(get_backend(), args.window)
+            if not window:
+                print(f"Error: Window containing '{args.window}' not found", file=sys.stderr)
+                sys.exit(1)
+
+        # Take screenshot
+        frame = grab(region=args.region, monitor=args.monitor, window=window)
+        change = None
+        if args.delta:
+            # Signatures are stored by deltas.commit() once the files are written
+            change = deltas.compute(frame, full_above=args.full_above, update=False)
+        if change is not None and change.unchanged:
+            print("Delta: no change since the last --delta screenshot")
+            print(f"Screen size: {frame.width}x{frame.height}")
+            return
+        options = dict(format=args.format.replace('jpg', 'jpeg'), quality=args.quality,
+                       optimize=args.optimize, max_edge=args.max_edge,
+                       target_bytes=args.target_kb * 1024 if args.target_kb else None)
+        if change is not None and not change.full:
+            # Crops encode on the encoder thread while earlier ones are written
+            encoder = get_encoder()
+            pending = [encoder.submit(frame.crop(box), **options) for box in change.boxes]
+            store = ScreenshotStore()
+            print(f"Delta: {len(change.boxes)} changed region(s), {change.changed:.1%} of the "
+                  f"capture, since the last --delta screenshot")
+            name = store.new_name()
+            for number, (box, future) in enumerate(zip(change.boxes, pending), 1):
+                image = future.result()
+                filepath = store.path(store.add(image, name=f'{name}-{number}'))
+                left, top, right, bottom = box
+                scaled = f", scale {image.scale:.4f}" if image.scale != 1.0 else ""
+                print(f"Region {number}: left={left}, top={top}, right={right}, "
+                      f"bottom={bottom}{scaled} -> {filepath}")
+            deltas.commit(frame, change.signatures, stored=change.stored)
+            print("Each image's top-left pixel is its region's (left, top) on the screen; "
+                  "the rest of the screen is unchanged.")
+            print("To view a region, use the read tool on its file path.")
+            return
+
+        # Fingerprint first: an identical kept screenshot needs no encoding.
+        # Encoding runs on the encoder thread, from the first moment it is
+        # certain to be needed (with --new, while the frame is fingerprinted)
+        encoder = get_encoder()
+        pending = encoder.submit(frame, **options) if args.new else None
+        fingerprint = Fingerprint.of(frame)
+        key = ' '.join(str(value) for value in frame.rect + tuple(options.values()))
+        store = ScreenshotStore()
+        saved = None if args.new else store.find(fingerprint, key)
+        if saved is None:
+            pending = pending or encoder.submit(frame, **options)
+            saved = store.add(pending.result(), fingerprint=fingerprint, key=key)
+            note = ""
+        else:
+            note = " (unchanged - same image as a kept screenshot, not encoded again)"
+        filepath = store.path(saved)
+
+        if change is not None:
+            deltas.commit(frame, change.signatures, stored=change.stored)
+            print(f"Delta: full capture ({change.reason})")
+        # Output ONLY the file path - NO base64!
+        # The AI should use the read tool to view the image.
+        print(f"Screenshot saved: {filepath}{note}")
+        print(f"Screen size: {frame.width}x{frame.height}")
+        if saved['scale'] != 1.0:
+            print(f"Image size: {saved['width']}x{saved['height']}, scale {saved['scale']:.4f} - "
+                  f"divide image coordinates by the scale to get screen pixels")
+        if (frame.left, frame.top) != (0, 0):
+            print(f"Origin: ({frame.left}, {frame.top}) - add it to image coordinates to get screen coordinates")
+        print(f"To view this screenshot, use the read tool on the file path above.")
+        print(f"To show the user, include [screenshot: {filepath}] in your response.")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
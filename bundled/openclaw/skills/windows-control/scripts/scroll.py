@@ -4,26 +4,35 @@ Scroll - Scroll in direction
 Usage: py scroll.py up 5
        py scroll.py down 10
 """
-import pyautogui
 import sys
+from wincontrol import get_backend
 
-if len(sys.argv) < 3:
-    print("Usage: py scroll.py [up|down] amount")
-    sys.exit(1)
 
-direction = sys.argv[1]
-amount = int(sys.argv[2])
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print("Usage: py scroll.py [up|down] amount")
+        sys.exit(1)
+
+    direction = argv[0]
+    amount = int(argv[1])
+
+    try:
+        mouse = get_backend().input()
+        if direction == "up":
+            mouse.scroll(amount * 120)  # Windows uses 120 units per notch
+        elif direction == "down":
+            mouse.scroll(-amount * 120)
+        else:
+            print("Direction must be 'up' or 'down'")
+            sys.exit(1)
 
-try:
-    if direction == "up":
-        pyautogui.scroll(amount * 120)  # Windows uses 120 units per notch
-    elif direction == "down":
-        pyautogui.scroll(-amount * 120)
-    else:
-        print("Direction must be 'up' or 'down'")
+        print(f"Scrolled {direction} {amount} notches")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
-    
-    print(f"Scrolled {direction} {amount} notches")
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
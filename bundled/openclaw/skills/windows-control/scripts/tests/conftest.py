@@ -0,0 +1,37 @@
+"""
+Shared fixtures: every test runs against its own fake desktop and state directory.
+"""
+import os
+import sys
+import pytest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from wincontrol import cache, deadline, handles, set_backend, windows  # noqa: E402
+from wincontrol.fake import DEMO_TREE, FakeBackend  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Private %TEMP%, no daemon, and fresh process-wide caches."""
+    monkeypatch.setenv('TEMP', str(tmp_path))
+    monkeypatch.setenv('WINCONTROL_BACKEND', 'fake')
+    monkeypatch.setenv('WINCONTROL_NO_DAEMON', '1')
+    monkeypatch.setattr(cache, '_cache', cache.SnapshotCache())
+    monkeypatch.setattr(windows, '_index', windows.WindowIndex())
+    monkeypatch.setattr(deadline, '_breaker', None)
+    handles._known.clear()
+    handles._pending.clear()
+    handles._stored.clear()
+    yield
+    set_backend(None)
+
+
+@pytest.fixture
+def fake():
+    """The demo desktop (Notepad, Save As, Chrome), installed as the backend."""
+    backend = FakeBackend().load(DEMO_TREE)
+    set_backend(backend)
+    return backend
@@ -0,0 +1,66 @@
+"""
+Read-only commands answer a repeat read from the window's cached snapshot.
+"""
+import click
+from elements_in_region import elements_in_region
+from handle_dialog import click_by_id, read_dialog, type_by_id
+from wincontrol.spatial import element_at
+
+
+def save_as(fake):
+    return next(w for w in fake.top_windows if w.name == 'Save As')
+
+
+def test_element_at_reuses_the_snapshot(fake):
+    window = save_as(fake)
+    fake.reset_counters()
+    hits = []
+    _, tree, first = element_at(640, 522, window, hits=hits)
+    assert tree.node(first[0]).name == 'Save'
+    assert fake.calls['BuildUpdatedCache'] == 1 and hits == []
+    _, tree, again = element_at(640, 522, window, hits=hits)
+    assert fake.calls['BuildUpdatedCache'] == 1
+    assert again == first and [entry.hits for entry in hits] == [1]
+
+
+def test_click_describe_reports_the_cache_hit(fake, capsys):
+    fake.reset_counters()
+    target = "Target: [Button] 'Sign in' in 'Example Domain - Google Chrome'"
+    assert click.describe_target(1140, 100) == target
+    assert capsys.readouterr().err == ''
+    assert click.describe_target(1140, 100) == target
+    assert capsys.readouterr().err.startswith('Cache: snapshot ')
+    assert fake.calls['BuildUpdatedCache'] == 1
+
+
+def test_elements_in_region_reuses_the_snapshot(fake):
+    window = save_as(fake)
+    fake.reset_counters()
+    hits = []
+    region = (590, 500, 780, 540)
+    names = [node.name for node in elements_in_region(window, region, hits=hits)]
+    assert names == ['Save', 'Cancel'] and hits == []
+    assert [node.name for node in elements_in_region(window, region, hits=hits)] == names
+    assert fake.calls['BuildUpdatedCache'] == 1 and len(hits) == 1
+
+
+def test_read_dialog_reuses_the_snapshot(fake):
+    window = save_as(fake)
+    fake.reset_counters()
+    hits = []
+    first = read_dialog(window, hits=hits)
+    assert [b['name'] for b in first['buttons']] == ['Save', 'Cancel'] and hits == []
+    assert read_dialog(window, hits=hits) == first
+    assert fake.calls['BuildUpdatedCache'] == 1 and len(hits) == 1
+
+
+def test_dialog_actions_by_id_drop_the_snapshot(fake):
+    window = save_as(fake)
+    content = read_dialog(window)
+    assert click_by_id(content['buttons'][0]['id'])[0]
+    hits = []
+    read_dialog(window, hits=hits)
+    assert hits == []
+    assert type_by_id(content['text_fields'][0]['id'], 'notes')[0]
+    assert read_dialog(window, hits=hits)['text_fields'][0]['value'] == '*.txtnotes'
+    assert hits == []
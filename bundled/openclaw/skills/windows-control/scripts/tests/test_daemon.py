@@ -0,0 +1,82 @@
+"""
+Daemon protocol and dispatch: client <-> server over multiprocessing.connection.
+"""
+import sys
+import threading
+import time
+import pytest
+from wincontrol import client, state
+from wincontrol.server import Server
+
+
+@pytest.fixture
+def daemon(fake, monkeypatch):
+    """A Server accepting connections on a background thread."""
+    monkeypatch.delenv('WINCONTROL_NO_DAEMON')
+    server = Server(idle_timeout=0)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if state.load_json(client.STATE_FILE):
+            break
+        time.sleep(0.01)
+    else:
+        pytest.fail("daemon did not start")
+    yield server
+    client.request({'op': 'shutdown'})
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_ping_round_trip(daemon):
+    reply = client.request({'op': 'ping'})
+    assert reply['ok'] and reply['backend'] == 'fake'
+    assert reply['version'] == client.PROTOCOL_VERSION
+    assert client.request({'op': 'bogus'}) == {'ok': False, 'error': "unknown op 'bogus'"}
+
+
+def test_run_relays_output_and_exit_code(daemon, fake):
+    reply = client.request({'op': 'run', 'script': 'focus_window', 'argv': ['Notepad']})
+    assert reply == {'stdout': "Focused: Untitled - Notepad\n", 'stderr': '', 'code': 0}
+    assert ('set_focus' in fake.calls) and daemon.served == 1
+
+    reply = client.request({'op': 'run', 'script': 'focus_window', 'argv': ['No such window']})
+    assert reply['code'] == 1
+    assert reply['stdout'] == "Error: Window containing 'No such window' not found\n"
+
+    reply = client.request({'op': 'run', 'script': 'screenshot', 'argv': ['--window', 'Nope']})
+    assert reply == {'stdout': '', 'stderr': "Error: Window containing 'Nope' not found\n", 'code': 1}
+
+    reply = client.request({'op': 'run', 'script': 'daemon', 'argv': []})
+    assert reply['code'] == 1 and "unknown script 'daemon'" in reply['stderr']
+
+
+def test_client_run_uses_daemon(daemon, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['focus_window.py', 'Save As'])
+
+    def main():
+        pytest.fail("ran in-process although the daemon is up")
+
+    with pytest.raises(SystemExit) as exit:
+        client.run('focus_window.py', main)
+    assert exit.value.code == 0
+    assert capsys.readouterr().out == "Focused: Save As\n"
+
+
+def test_client_run_falls_back_in_process(fake, monkeypatch):
+    monkeypatch.delenv('WINCONTROL_NO_DAEMON')
+    assert state.load_json(client.STATE_FILE) is None
+    assert client.request({'op': 'ping'}) is None
+    ran = []
+    client.run('focus_window.py', lambda: ran.append(True))
+    assert ran == [True]
+
+
+def test_stale_state_file_falls_back(fake, monkeypatch):
+    monkeypatch.delenv('WINCONTROL_NO_DAEMON')
+    state.save_json(client.STATE_FILE, {'version': client.PROTOCOL_VERSION, 'family': 'AF_UNIX',
+                                        'address': state.state_path('gone.sock'),
+                                        'authkey': '00' * 32})
+    ran = []
+    client.run('focus_window.py', lambda: ran.append(True))
+    assert ran == [True]
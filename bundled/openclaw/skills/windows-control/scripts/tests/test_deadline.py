@@ -0,0 +1,95 @@
+"""
+Per-call deadlines and the hung-window breaker, against a fake provider that sleeps.
+"""
+import time
+import pytest
+from wincontrol import set_backend
+from wincontrol.deadline import (Breaker, DeadlineExceeded, call_timeout, call_with_timeout,
+                                 get_breaker)
+from wincontrol.fake import FakeBackend
+from wincontrol.scan import ScanReport, scan_windows
+from wincontrol.snapshot import capture
+
+MARGIN = 0.5
+
+
+@pytest.fixture
+def hung(monkeypatch):
+    """A desktop where 'Frozen' takes 5s to answer any provider call."""
+    monkeypatch.setenv('WINCONTROL_CALL_TIMEOUT', '0.2')
+    backend = FakeBackend().load({'windows': [
+        {'name': 'Editor', 'children': [{'name': 'Save', 'type': 'Button'}]},
+        {'name': 'Frozen', 'delay': 5.0, 'children': [{'name': 'OK', 'type': 'Button'}]},
+    ]})
+    set_backend(backend)
+    return backend
+
+
+def titles(backend):
+    report = ScanReport()
+    found = [window.name for window, _ in
+             scan_windows(backend, lambda w: capture(w, backend=backend), workers=1, report=report)]
+    return found, report
+
+
+def test_hung_call_returns_within_the_deadline(hung):
+    assert call_timeout() == 0.2
+    frozen = hung.top_windows[1]
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        capture(frozen, backend=hung)
+    assert time.monotonic() - started < call_timeout() + MARGIN
+    # A responsive window is unaffected
+    assert [n.name for n in capture(hung.top_windows[0], backend=hung)] == ['Save']
+
+
+def test_call_with_timeout_passes_results_and_errors():
+    assert call_with_timeout(lambda a, b: a + b, 1.0, 2, 3) == 5
+    with pytest.raises(KeyError):
+        call_with_timeout({}.__getitem__, 1.0, 'missing')
+    assert call_with_timeout(lambda: 'inline', None) == 'inline'
+
+
+def test_breaker_opens_after_configured_failures(hung, monkeypatch):
+    monkeypatch.setenv('WINCONTROL_BREAKER_FAILURES', '2')
+    frozen = hung.top_windows[1].handle
+
+    found, report = titles(hung)
+    assert found == ['Editor'] and report.timed_out == ['Frozen']
+    assert not get_breaker().is_open(frozen)
+
+    found, report = titles(hung)
+    assert report.timed_out == ['Frozen']
+    assert get_breaker().is_open(frozen)
+
+    # Now skipped without waiting for it
+    started = time.monotonic()
+    found, report = titles(hung)
+    assert found == ['Editor'] and report.skipped == ['Frozen'] and not report.timed_out
+    assert time.monotonic() - started < 0.1
+    # Naming the window tries it anyway
+    report = ScanReport()
+    job = lambda w: capture(w, backend=hung)
+    assert list(scan_windows(hung, job, title='Frozen', workers=1, report=report)) == []
+    assert report.timed_out == ['Frozen']
+
+
+def test_breaker_closes_after_cooldown(hung, monkeypatch):
+    monkeypatch.setenv('WINCONTROL_BREAKER_COOLDOWN', '0.3')
+    frozen = hung.top_windows[1]
+    titles(hung)
+    assert get_breaker().is_open(frozen.handle)
+    assert titles(hung)[1].skipped == ['Frozen']
+
+    time.sleep(0.35)
+    assert not get_breaker().is_open(frozen.handle)
+    frozen.delay = 0.0
+    found, report = titles(hung)
+    assert found == ['Editor', 'Frozen'] and not report.partial
+
+
+def test_breaker_state_is_shared_through_the_state_file():
+    Breaker(cooldown=60).trip(0x1234, 'Stuck')
+    assert Breaker().open_windows() == {0x1234: 'Stuck'}
+    Breaker().reset(0x1234)
+    assert not Breaker().is_open(0x1234)
@@ -0,0 +1,68 @@
+"""
+Delta screenshots: signatures are stored only after the images are saved.
+"""
+import pytest
+import screenshot
+from wincontrol import delta, state
+from wincontrol.capture import Frame
+from wincontrol.shots import ScreenshotStore
+
+REGION = ['--region', '0', '0', '300', '200', '--format', 'png']
+
+
+def solid(width=96, height=64, color=b'\x10\x20\x30\x00'):
+    return Frame(bytearray(color * (width * height)), width, height, 0, 0)
+
+
+@pytest.fixture
+def synthetic(monkeypatch, fake):
+    monkeypatch.setenv('WINCONTROL_CAPTURE', 'synthetic')
+    monkeypatch.setattr('wincontrol.capture._source', None)
+
+
+def test_compute_without_update_stores_nothing_until_commit():
+    frame = solid()
+    change = delta.compute(frame, update=False)
+    assert change.full and state.load_json(delta.DELTA_FILE) is None
+    delta.commit(frame, change.signatures)
+    assert delta.compute(frame, update=False).unchanged
+
+    frame.data[(10 * 96 + 40) * 4] ^= 0xFF
+    change = delta.compute(frame, update=False)
+    assert change.boxes == [(32, 0, 64, 32)]
+    # Not committed: the same change is reported again
+    assert delta.compute(frame).boxes == [(32, 0, 64, 32)]
+    assert delta.compute(frame).unchanged
+
+
+def test_failed_save_keeps_the_previous_signatures(synthetic, monkeypatch, capsys):
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    add = ScreenshotStore.add
+    monkeypatch.setattr(ScreenshotStore, 'add', broken)
+    with pytest.raises(SystemExit):
+        screenshot.main(REGION + ['--delta'])
+    assert "disk full" in capsys.readouterr().err
+    assert state.load_json(delta.DELTA_FILE) is None
+
+    monkeypatch.setattr(ScreenshotStore, 'add', add)
+    screenshot.main(REGION + ['--delta'])
+    assert "full capture (no previous capture" in capsys.readouterr().out
+    assert state.load_json(delta.DELTA_FILE)
+    screenshot.main(REGION + ['--delta'])
+    assert "no change" in capsys.readouterr().out
+
+
+def test_signatures_are_stored_packed_and_read_once(monkeypatch):
+    frame = solid(1920, 1080)
+    loads = []
+    load_json = state.load_json
+    monkeypatch.setattr(state, 'load_json', lambda *a: loads.append(a) or load_json(*a))
+    change = delta.compute(frame, update=False)
+    delta.commit(frame, change.signatures, stored=change.stored)
+    assert len(loads) == 1
+    entry = load_json(delta.DELTA_FILE)[delta.target_key(frame)]
+    assert len(entry['packed']) < 11 * 1024
+    assert list(delta.unpack(entry['packed'])) == change.signatures
+    assert delta.compute(frame).unchanged
@@ -0,0 +1,31 @@
+"""
+handle_dialog type: the first field by default, the focused one only with --focused.
+"""
+from handle_dialog import type_in_field
+
+
+def window(fake, name):
+    return next(w for w in fake.top_windows if w.name == name)
+
+
+def field(fake, name):
+    return next(e for w in fake.top_windows for e in w.iter_subtree() if e.name == name)
+
+
+def test_type_defaults_to_the_first_field(fake):
+    fake.focus(field(fake, 'Text Editor'))
+    ok, msg = type_in_field(window(fake, 'Save As'), 'notes')
+    assert ok and msg == "Typed into field 0"
+    assert field(fake, 'File name:').value == '*.txtnotes'
+    assert field(fake, 'Text Editor').value == ''
+
+
+def test_focused_field_is_opt_in(fake):
+    editor = field(fake, 'Text Editor')
+    fake.focus(editor)
+    ok, msg = type_in_field(window(fake, 'Untitled - Notepad'), 'hi', focused_field=True)
+    assert ok and msg.startswith("Typed into focused field")
+    assert editor.value == 'hi'
+    # Focus outside the dialog: falls back to the field index
+    ok, msg = type_in_field(window(fake, 'Save As'), 'x', focused_field=True)
+    assert ok and msg == "Typed into field 0"
@@ -0,0 +1,73 @@
+"""
+Element handles: handles.json is written once per command, and only for new ids.
+"""
+import pytest
+from wincontrol import client, handles, state
+from wincontrol.snapshot import capture
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    saved = []
+    real = state.save_json
+
+    def save_json(name, data):
+        if name == handles.HANDLES_FILE:
+            saved.append(dict(data))
+        real(name, data)
+
+    monkeypatch.setattr(state, 'save_json', save_json)
+    return saved
+
+
+def notepad_nodes(fake):
+    window = fake.top_windows[0]
+    return window, capture(window, ('name', 'control_type', 'runtime_id'), fake)
+
+
+def test_remember_writes_nothing_until_flush(fake, writes):
+    window, nodes = notepad_nodes(fake)
+    ids = handles.remember(window, nodes)
+    assert len(ids) == 6 and writes == []
+    handles.flush()
+    assert len(writes) == 1 and set(writes[0]) == set(ids)
+    assert state.load_json(handles.HANDLES_FILE)[next(iter(ids))] == ['Application', 'MenuBar']
+
+
+def test_known_ids_are_not_written_again(fake, writes):
+    window, nodes = notepad_nodes(fake)
+    handles.remember(window, nodes)
+    handles.flush()
+    handles.remember(window, nodes[:2])
+    handles.remember(window, nodes)
+    handles.flush()
+    assert len(writes) == 1
+    # Another process (or a restart) only reads the file before deciding
+    handles._stored.clear()
+    handles.remember(window, nodes)
+    handles.flush()
+    assert len(writes) == 1
+
+    nodes[0].name = 'Renamed'
+    handles.remember(window, nodes)
+    handles.flush()
+    assert len(writes) == 2 and writes[1][handles.element_id(window, nodes[0])][0] == 'Renamed'
+
+
+def test_queued_record_resolves_before_flush(fake):
+    window, nodes = notepad_nodes(fake)
+    handle = handles.element_id(window, nodes[1])
+    handles.remember(window, nodes)
+    assert handles.record(handle) == ['File', 'MenuItem']
+    assert state.load_json(handles.HANDLES_FILE) is None
+
+
+def test_client_run_flushes_once(fake, writes):
+    window, nodes = notepad_nodes(fake)
+
+    def main():
+        handles.remember(window, nodes[:3])
+        handles.remember(window, nodes[3:])
+
+    client.run('read_ui_elements.py', main)
+    assert len(writes) == 1 and len(writes[0]) == 6
@@ -0,0 +1,45 @@
+"""
+Name index: a node list searched once is scanned, the index is built on reuse.
+"""
+import random
+import pytest
+from wincontrol.names import FUZZY, NameIndex, scan
+from wincontrol.snapshot import Node
+
+NAMES = ['Save', 'save as', 'Save  As', 'save\tas', 'ＯＫ', 'OK', '另存为 PDF', 'Cancel', 'Button  12',
+         'button 12 more', '  Save  ', 'File name:', None, '', '   ']
+
+
+@pytest.fixture
+def nodes():
+    rng = random.Random(7)
+    return [Node(name=rng.choice(NAMES), control_type='Button') for _ in range(200)]
+
+
+@pytest.mark.parametrize('query', ['save', 'OK', 'ok', '另存为pdf', 'save as', 'button 12', 'Canel', ' '])
+@pytest.mark.parametrize('fuzzy', [False, True])
+@pytest.mark.parametrize('limit', [None, 3])
+def test_scan_matches_the_index(nodes, query, fuzzy, limit):
+    index = NameIndex(nodes).build()
+    index.searches = 1
+    indexed = index.search(query, fuzzy=fuzzy, limit=limit)
+    assert [(t, s, id(n)) for t, s, n in scan(nodes, query, fuzzy, limit)] == \
+        [(t, s, id(n)) for t, s, n in indexed]
+
+
+def test_first_search_scans_and_reuse_builds(nodes):
+    index = NameIndex(nodes)
+    first = index.search('save as')
+    assert index.raw is None and first
+    assert index.search('save as') == first
+    assert index.raw is not None and 'save as' in index.normal
+    assert index.search('Canel', fuzzy=True)[0][0] == FUZZY
+
+
+def test_several_queries_build_once(nodes):
+    index = NameIndex(nodes)
+    assert [len(hits) > 0 for hits in index.search_many(['ok'])] == [True]
+    assert index.raw is None
+    index = NameIndex(nodes)
+    ok, cancel, none = index.search_many(['ok', 'cancel', 'nothing'])
+    assert index.raw is not None and ok and cancel and none == []
@@ -0,0 +1,40 @@
+"""
+Selector queries: Window steps on process names keep their operator.
+"""
+import pytest
+from wincontrol.query import QueryError, compile_query
+from wincontrol.windows import find_windows
+
+NOTEPAD = ['Untitled - Notepad', 'Save As']
+CHROME = ['Example Domain - Google Chrome']
+
+
+def titles(fake, selector):
+    return [window.window_text() for window in find_windows(fake, selector)]
+
+
+@pytest.mark.parametrize('test, expected', [
+    ('process=chrome', CHROME),
+    ('process=CHROME.EXE', CHROME),
+    ('process!=chrome', NOTEPAD),
+    ('process^=chrome', CHROME),
+    ('process^=Note', NOTEPAD),
+    ('process$=pad.exe', NOTEPAD),
+    ('process$=.exe', NOTEPAD + CHROME),
+    ('process$=chrome', []),
+    ('process~=note', NOTEPAD),
+    ('process*=ROME', CHROME),
+    ('process*=firefox', []),
+])
+def test_window_process_operators(fake, test, expected):
+    assert titles(fake, f'sel:Window[{test}]') == expected
+
+
+def test_contains_operators_match_names_alike(fake):
+    assert titles(fake, 'sel:Window[name*=notepad]') == titles(fake, 'sel:Window[name~=notepad]') \
+        == ['Untitled - Notepad']
+
+
+def test_unknown_operator_is_an_error():
+    with pytest.raises(QueryError):
+        compile_query('sel:Window[process%=chrome]')
@@ -0,0 +1,44 @@
+"""
+read_webpage: limits walk the page only when they can end the walk early.
+"""
+import read_webpage
+from read_webpage import Limits, extract_webpage_content
+
+
+def chrome(fake):
+    return next(w for w in fake.top_windows if 'Chrome' in w.name)
+
+
+def test_uncapped_category_keeps_the_single_capture(fake):
+    window = chrome(fake)
+    fake.reset_counters()
+    limits = Limits(max_links=1)
+    content = extract_webpage_content(window, include_links=True, limits=limits)
+    # Text is uncapped, so a walk could never stop early
+    assert fake.calls['FindAllBuildCache'] == 0
+    assert fake.calls['BuildUpdatedCache'] == 1
+    assert [link['name'] for link in content['links']] == ['More information...']
+    assert content['text'] == ['Example Domain', 'This domain is for use in illustrative examples.']
+    assert 'stopped' not in content
+
+
+def test_every_category_capped_walks_and_stops(fake):
+    window = chrome(fake)
+    fake.reset_counters()
+    limits = Limits(max_text=1, max_links=1)
+    content = extract_webpage_content(window, include_links=True, limits=limits)
+    assert fake.calls['BuildUpdatedCache'] == 0
+    assert fake.calls['FindAllBuildCache'] > 0
+    assert content['stopped'] == 'limits'
+    assert content['text'] == ['Example Domain'] and len(content['links']) == 1
+
+
+def test_node_and_byte_caps_walk(fake):
+    requested = read_webpage.requested_categories(include_links=True)
+    assert Limits(max_nodes=5).can_stop(requested)
+    assert Limits(max_bytes=100).can_stop(requested)
+    assert not Limits(max_text=5).can_stop(requested)
+    assert Limits(max_text=5).can_stop(read_webpage.requested_categories())
+    fake.reset_counters()
+    content = extract_webpage_content(chrome(fake), limits=Limits(max_nodes=2))
+    assert content['stopped'] == 'max-nodes' and fake.calls['BuildUpdatedCache'] == 0
@@ -0,0 +1,63 @@
+"""
+Parallel window scan: z-order results, deadlines enforced without extra threads.
+"""
+import threading
+import time
+import pytest
+from wincontrol import set_backend
+from wincontrol.fake import FakeBackend
+from wincontrol.scan import ScanReport, scan_windows
+from wincontrol.snapshot import capture
+
+
+@pytest.fixture
+def desktop():
+    """Six windows; 'Hung 2' takes 2s for any provider call."""
+    backend = FakeBackend().load({'windows': [
+        {'name': f"{'Hung' if i == 2 else 'App'} {i}", 'delay': 2.0 if i == 2 else 0.0,
+         'children': [{'name': f"Button {i}", 'type': 'Button'}]}
+        for i in range(6)]})
+    set_backend(backend)
+    return backend
+
+
+def scan(desktop, workers, timeout=0.3):
+    report = ScanReport()
+    started = time.monotonic()
+    results = [(window.name, [n.name for n in nodes]) for window, nodes in
+               scan_windows(desktop, lambda w: capture(w, backend=desktop), workers=workers,
+                            report=report, timeout=timeout)]
+    return results, report, time.monotonic() - started
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_hung_window_is_skipped_in_z_order(desktop, workers):
+    results, report, elapsed = scan(desktop, workers)
+    assert results == [(f"App {i}", [f"Button {i}"]) for i in (0, 1, 3, 4, 5)]
+    assert report.timed_out == ['Hung 2']
+    assert elapsed < 1.5
+
+
+def test_pool_jobs_do_not_spawn_deadline_threads(desktop, monkeypatch):
+    names = []
+    start = threading.Thread.start
+
+    def record(thread):
+        names.append(thread.name)
+        return start(thread)
+
+    monkeypatch.setattr(threading.Thread, 'start', record)
+    results, report, _ = scan(desktop, 3)
+    assert len(results) == 5
+    assert not [name for name in names if name.startswith('wincontrol-call')]
+
+
+def test_queued_jobs_survive_hung_workers(monkeypatch):
+    # Two workers, both stuck in hung windows: the rest must still be scanned
+    backend = FakeBackend().load({'windows': [
+        {'name': f"Window {i}", 'delay': 2.0 if i < 2 else 0.0} for i in range(5)]})
+    set_backend(backend)
+    results, report, elapsed = scan(backend, 2)
+    assert [name for name, _ in results] == ['Window 2', 'Window 3', 'Window 4']
+    assert report.timed_out == ['Window 0', 'Window 1']
+    assert elapsed < 1.5
@@ -0,0 +1,107 @@
+"""
+Screenshot store: off-thread encoding on a dedup miss, locked index updates.
+"""
+import os
+import threading
+import time
+import pytest
+import screenshot
+from wincontrol.encode import Encoded, Encoder
+from wincontrol.shots import DEFAULT_MAX_MB, INDEX_FILE, PREFIX, ScreenshotStore
+from wincontrol.state import STALE_LOCK, file_lock
+
+REGION = ['--region', '0', '0', '300', '200', '--format', 'png']
+
+
+@pytest.fixture
+def submits(monkeypatch, fake):
+    monkeypatch.setenv('WINCONTROL_CAPTURE', 'synthetic')
+    monkeypatch.setattr('wincontrol.capture._source', None)
+    calls = []
+    real = Encoder.submit
+
+    def submit(self, frame, **options):
+        calls.append(options)
+        return real(self, frame, **options)
+
+    monkeypatch.setattr(Encoder, 'submit', submit)
+    return calls
+
+
+def test_encoding_goes_through_the_encoder_thread(submits, capsys):
+    screenshot.main(REGION)
+    assert len(submits) == 1
+    first = capsys.readouterr().out
+    # Dedup hit: nothing is encoded
+    screenshot.main(REGION)
+    assert len(submits) == 1 and "not encoded again" in capsys.readouterr().out
+    screenshot.main(REGION + ['--new'])
+    assert len(submits) == 2
+    assert capsys.readouterr().out.splitlines()[0] != first.splitlines()[0]
+
+
+def image(size=10):
+    return Encoded(b'x' * size, 'png', 4, 4, 1.0)
+
+
+def test_concurrent_adds_keep_every_entry(tmp_path):
+    directory = str(tmp_path / 'shots')
+    errors = []
+
+    def worker(number):
+        try:
+            for i in range(5):
+                ScreenshotStore(directory, keep=100).add(image(), name=f'{PREFIX}{number}-{i}')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    store = ScreenshotStore(directory)
+    assert len(store.entries) == 40 and store.total == 400
+    assert sorted(os.listdir(directory)) == sorted([e['file'] for e in store.entries] + [INDEX_FILE])
+
+
+def test_eviction_sees_entries_added_by_another_store(tmp_path):
+    directory = str(tmp_path / 'shots')
+    first, second = ScreenshotStore(directory, keep=2), ScreenshotStore(directory, keep=2)
+    first.add(image(), name=f'{PREFIX}a')
+    second.add(image(), name=f'{PREFIX}b')
+    first.add(image(), name=f'{PREFIX}c')
+    assert [e['file'] for e in ScreenshotStore(directory).entries] == \
+        [f'{PREFIX}b.png', f'{PREFIX}c.png']
+    assert not os.path.exists(os.path.join(directory, f'{PREFIX}a.png'))
+
+
+def test_first_add_is_not_adopted_twice(tmp_path):
+    store = ScreenshotStore(str(tmp_path / 'shots'))
+    store.add(image(), name=f'{PREFIX}only')
+    assert len(ScreenshotStore(store.directory).entries) == 1
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    path = str(tmp_path / 'index.lock')
+    open(path, 'w').close()
+    with pytest.raises(TimeoutError):
+        with file_lock(path, timeout=0.05):
+            pass
+    old = time.time() - STALE_LOCK - 1
+    os.utime(path, (old, old))
+    with file_lock(path, timeout=0.05):
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+
+
+def test_retention_settings_are_plain_numbers(tmp_path, monkeypatch):
+    monkeypatch.setenv('WINCONTROL_SHOTS_KEEP', '3')
+    monkeypatch.setenv('WINCONTROL_SHOTS_MB', '0.5')
+    store = ScreenshotStore(str(tmp_path / 'shots'))
+    assert store.keep == 3 and store.max_bytes == 512 * 1024
+    monkeypatch.setenv('WINCONTROL_SHOTS_KEEP', '0')
+    monkeypatch.setenv('WINCONTROL_SHOTS_MB', 'lots')
+    store = ScreenshotStore(str(tmp_path / 'shots'))
+    assert store.keep == 1 and store.max_bytes == DEFAULT_MAX_MB * 1024 * 1024
@@ -0,0 +1,85 @@
+"""
+Snapshot engine: provider round trips per capture/walk, counted by the fake backend.
+"""
+from collections import Counter
+import pytest
+from wincontrol import set_backend
+from wincontrol.fake import FakeBackend, synthetic_tree
+from wincontrol.snapshot import BASIC, Budget, capture, walk
+from wincontrol.tree import capture_tree
+
+# Per-node reads that a batched capture must never make
+PER_NODE_CALLS = ('window_text', 'rectangle', 'is_enabled', 'children', 'descendants',
+                  'element_info.control_type', 'element_info.name')
+
+
+@pytest.fixture
+def synthetic():
+    """One window with 4 + 16 + 64 = 84 descendants."""
+    backend = FakeBackend().load(synthetic_tree(windows=1, depth=3, fanout=4))
+    set_backend(backend)
+    return backend
+
+
+def test_capture_is_one_batched_call_per_window(synthetic):
+    window = synthetic.top_windows[0]
+    synthetic.reset_counters()
+    nodes = capture(window, BASIC + ('value',), backend=synthetic)
+    assert len(nodes) == 84
+    assert synthetic.calls == Counter({'BuildUpdatedCache': 1})
+    assert not any(name in synthetic.calls for name in PER_NODE_CALLS)
+
+
+def test_capture_matches_the_tree(fake):
+    window = fake.top_windows[0]
+    nodes = capture(window, backend=fake)
+    assert [(n.depth, n.control_type, n.name) for n in nodes] == [
+        (1, 'MenuBar', 'Application'), (2, 'MenuItem', 'File'), (2, 'MenuItem', 'Edit'),
+        (2, 'MenuItem', 'Help'), (1, 'Edit', 'Text Editor'), (1, 'Text', 'Ln 1, Col 1')]
+    assert [n.parent for n in nodes] == [-1, 0, 0, 0, -1, -1]
+    assert nodes[1].rect == (108, 131, 140, 150) and nodes[1].enabled is True
+
+
+def test_capture_tree_is_one_batched_call(synthetic):
+    synthetic.reset_counters()
+    tree = capture_tree(synthetic.top_windows[0], backend=synthetic)
+    assert len(tree) == 84
+    assert synthetic.calls == Counter({'BuildUpdatedCache': 1})
+
+
+def test_walk_yields_capture_order_with_one_call_per_expanded_node(synthetic):
+    window = synthetic.top_windows[0]
+    expected = [(n.depth, n.parent, n.name) for n in capture(window, backend=synthetic)]
+    synthetic.reset_counters()
+    walked = [(n.depth, n.parent, n.name) for n in walk(window, backend=synthetic)]
+    assert walked == expected
+    # The window itself plus every node (leaves answer with no children)
+    assert synthetic.calls == Counter({'FindAllBuildCache': 1 + 84})
+
+
+def test_walk_stopped_early_fetches_nothing_more(synthetic):
+    synthetic.reset_counters()
+    nodes = walk(synthetic.top_windows[0], backend=synthetic)
+    first = [next(nodes) for _ in range(3)]
+    nodes.close()
+    assert [n.depth for n in first] == [1, 2, 3]
+    # Window, the first node and the second node were expanded
+    assert synthetic.calls == Counter({'FindAllBuildCache': 3})
+
+
+def test_walk_budget_limits_calls(synthetic):
+    window = synthetic.top_windows[0]
+    synthetic.reset_counters()
+    budget = Budget(max_depth=1)
+    nodes = list(walk(window, backend=synthetic, budget=budget))
+    assert len(nodes) == 4
+    # Depth-1 nodes are fetched once to count their unread children
+    assert synthetic.calls == Counter({'FindAllBuildCache': 1 + 4})
+    assert [(cut['path'], cut['unread']) for cut in budget.truncated] == [
+        ('0', 4), ('1', 4), ('2', 4), ('3', 4)]
+
+    synthetic.reset_counters()
+    budget = Budget(max_nodes=10)
+    assert len(list(walk(window, backend=synthetic, budget=budget))) == 10
+    assert synthetic.calls['FindAllBuildCache'] == 1 + 10
+    assert budget.stopped == 'max-nodes'
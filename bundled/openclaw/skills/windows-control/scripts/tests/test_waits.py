@@ -0,0 +1,70 @@
+"""
+Wait engine: text conditions re-capture a window only after it reported a change.
+"""
+import threading
+import time
+from wincontrol import waits
+from wincontrol.waits import text_in_window, wait_for
+
+
+def later(seconds, action):
+    timer = threading.Timer(seconds, action)
+    timer.start()
+    return timer
+
+
+def test_unchanged_window_is_not_captured_again(fake):
+    fake.reset_counters()
+    result = wait_for(fake, [text_in_window('Saved', 'Notepad')], timeout=0.5)
+    assert not result.ok and result.events
+    # The first check and the safety re-check at the timeout; no event came from Notepad
+    assert fake.calls['BuildUpdatedCache'] == 2
+
+
+def test_events_from_other_windows_skip_the_capture(fake):
+    chrome = next(w for w in fake.top_windows if 'Chrome' in w.name)
+    fake.reset_counters()
+    timers = [later(0.1 * i, lambda: fake.notify(chrome)) for i in range(1, 4)]
+    result = wait_for(fake, [text_in_window('Saved', 'Notepad')], timeout=0.5)
+    for timer in timers:
+        timer.join()
+    assert not result.ok
+    assert fake.calls['BuildUpdatedCache'] == 2
+
+
+def test_change_event_recaptures_and_finds_the_text(fake):
+    notepad = fake.top_windows[0]
+    status = notepad.child_elements[-1]
+
+    def save():
+        status.name = 'Saved'
+        fake.notify(status)
+
+    fake.reset_counters()
+    timer = later(0.2, save)
+    result = wait_for(fake, [text_in_window('saved', 'Notepad')], timeout=2.0)
+    timer.join()
+    assert result.ok and result.elapsed < 1.0
+    node, how = result.results[0]
+    assert (node.name, how) == ('Saved', 'changed')
+    assert fake.calls['BuildUpdatedCache'] == 2
+
+
+def test_safety_recheck_captures_without_events(fake, monkeypatch):
+    monkeypatch.setattr(waits, 'EVENT_RECHECK', 0.2)
+    status = fake.top_windows[0].child_elements[-1]
+    fake.reset_counters()
+    # Renamed without an event: only the safety re-check can notice
+    timer = later(0.1, lambda: setattr(status, 'name', 'Saved'))
+    result = wait_for(fake, [text_in_window('Saved', 'Notepad')], timeout=2.0)
+    timer.join()
+    assert result.ok and result.results[0][1] == 'changed'
+    assert fake.calls['BuildUpdatedCache'] == 2
+
+
+def test_polling_captures_every_check(fake, monkeypatch):
+    monkeypatch.setattr(fake, 'subscribe', lambda callback: 1 / 0)
+    fake.reset_counters()
+    result = wait_for(fake, [text_in_window('Saved', 'Notepad')], timeout=0.5)
+    assert not result.ok and not result.events
+    assert fake.calls['BuildUpdatedCache'] > 3
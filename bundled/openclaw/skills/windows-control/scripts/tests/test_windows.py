@@ -0,0 +1,41 @@
+"""
+Window index: cached first matches, z-order and selector errors.
+"""
+import pytest
+from wincontrol import windows
+from wincontrol.windows import find_window, get_index
+
+
+def test_repeat_lookup_skips_enumeration(fake):
+    assert find_window(fake, 'Notepad').name == 'Untitled - Notepad'
+    fake.reset_counters()
+    assert find_window(fake, 'Notepad').name == 'Untitled - Notepad'
+    assert fake.calls['win32.EnumWindows'] == 1
+    assert 'win32.GetClassName' not in fake.calls
+    assert get_index().stats['hits'] == 1
+
+
+def test_newer_window_higher_in_z_order_wins(fake):
+    assert find_window(fake, 'Notepad').name == 'Untitled - Notepad'
+    fake.add_window({'name': 'notes.txt - Notepad', 'process': 'notepad.exe'}, index=0)
+    assert find_window(fake, 'Notepad').name == 'notes.txt - Notepad'
+
+
+def test_known_window_retitled_to_match_wins(fake):
+    assert find_window(fake, 'Notepad').name == 'Untitled - Notepad'
+    chrome = find_window(fake, 'Chrome')
+    chrome.name = 'Notepad tips - Google Chrome'
+    fake.focus(chrome.child_elements[0])
+    assert find_window(fake, 'Notepad').name == 'Notepad tips - Google Chrome'
+
+
+def test_selector_cache_is_bounded(fake, monkeypatch):
+    monkeypatch.setattr(windows, 'MAX_SELECTORS', 3)
+    for title in ('Notepad', 'Save', 'Chrome', 'Domain', 'exact:Save As'):
+        assert find_window(fake, title) is not None
+    assert list(get_index().hits) == ['contains:Chrome', 'contains:Domain', 'exact:Save As']
+
+
+def test_bad_regex_is_a_value_error(fake):
+    with pytest.raises(ValueError, match=r"Bad window filter 'regex:\('"):
+        find_window(fake, 'regex:(')
@@ -2,22 +2,79 @@
 """
 Type Text - Type text at current cursor position
 Usage: py type_text.py "Hello world"
+       py type_text.py "Hello world" --confirm          # Only if a text field has focus
+       py type_text.py "report.txt" --expect "Save As"  # ...and it is in/named "Save As"
+
+--confirm reads the focused element first (directly from UI Automation,
+no window search) and types nothing unless it is an enabled text field
+(Edit, ComboBox, Document). --expect TEXT also requires the field's name
+or its window's title to contain TEXT. Both report where the text went.
 """
-import pyautogui
 import sys
 import time
+from wincontrol import cache, get_backend
+from wincontrol.focus import focused, label
+from wincontrol.names import normalize
+
 
-if len(sys.argv) < 2:
-    print("Usage: py type_text.py \"text to type\"")
-    sys.exit(1)
+def check_target(expect=None):
+    """(focus, error): the focused text field, or why typing there is refused."""
+    focus = focused()
+    if focus is None:
+        return None, "Nothing has keyboard focus"
+    where = f" in {focus.window.window_text()}" if focus.window is not None else ""
+    if not focus.accepts_text:
+        return None, f"Focus is on {label(focus.node)}{where}, not a text field"
+    if expect:
+        wanted = normalize(expect)
+        title = focus.window.window_text() if focus.window is not None else ''
+        if wanted not in normalize(focus.name) and wanted not in normalize(title):
+            return None, f"Focus is on {label(focus.node)}{where}, not '{expect}'"
+    return focus, None
 
-text = sys.argv[1]
 
-try:
+def type_text(text):
+    """Type text at the current cursor position."""
     # Small delay to ensure window focus
     time.sleep(0.1)
-    pyautogui.write(text, interval=0.01)  # 10ms between keystrokes
-    print(f"Typed: {text}")
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
+    get_backend().input().write(text, interval=0.01)  # 10ms between keystrokes
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    confirm = '--confirm' in argv
+    argv = [a for a in argv if a != '--confirm']
+    expect = None
+    if '--expect' in argv:
+        position = argv.index('--expect')
+        expect = argv[position + 1] if position + 1 < len(argv) else ''
+        del argv[position:position + 2]
+    if len(argv) < 1:
+        print("Usage: py type_text.py \"text to type\" [--confirm] [--expect TEXT]")
+        sys.exit(1)
+
+    text = argv[0]
+
+    try:
+        focus = None
+        if confirm or expect:
+            focus, error = check_target(expect)
+            if error:
+                print(f"Error: {error}; nothing typed", file=sys.stderr)
+                sys.exit(1)
+        type_text(text)
+        if focus is None:
+            print(f"Typed: {text}")
+            return
+        where = f" in {focus.window.window_text()}" if focus.window is not None else ""
+        print(f"Typed: {text} (into {label(focus.node)}{where})")
+        if focus.window is not None:
+            cache.invalidate(focus.window.handle)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -5,48 +5,56 @@ Wait for Text - Wait until text appears in window
 Usage: py wait_for_text.py "text" "window" [timeout_seconds]
        py wait_for_text.py "Complete" "Terminal" 30
        py wait_for_text.py "Ready" "Chrome"
+       py wait_for_text.py "Done" "Terminal" 30 --text "Error"   # Whichever comes first
+       py wait_for_text.py "Name" "Form" 10 --text "Email" --all # Both
+
+Re-checks when UI Automation reports a change in the window instead of
+re-reading it every 500ms.
 """
 import sys
-import io
-import time
-from pywinauto import Desktop
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-if len(sys.argv) < 3:
-    print("Usage: py wait_for_text.py \"text\" \"window\" [timeout]")
-    sys.exit(1)
-
-search_text = sys.argv[1]
-window_filter = sys.argv[2]
-timeout = int(sys.argv[3]) if len(sys.argv) > 3 else 30
-
-try:
-    desktop = Desktop(backend="uia")
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        windows = [w for w in desktop.windows() if window_filter.lower() in w.window_text().lower()]
-        
-        for window in windows:
-            try:
-                for ctrl in window.descendants():
-                    try:
-                        text = ctrl.window_text()
-                        if text and search_text.lower() in text.lower():
-                            elapsed = time.time() - start_time
-                            print(f"Found '{search_text}' after {elapsed:.1f}s")
-                            sys.exit(0)
-                    except:
-                        pass
-            except:
-                pass
-        
-        time.sleep(0.5)  # Check every 500ms
-    
-    print(f"Timeout: Text '{search_text}' not found after {timeout}s")
-    sys.exit(1)
-    
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+from wincontrol import get_backend
+from wincontrol.waits import text_in_window, wait_for
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    texts, positional, mode = [], [], 'any'
+    args = iter(argv)
+    for arg in args:
+        if arg == '--all':
+            mode = 'all'
+        elif arg == '--text':
+            texts.append(next(args, ''))
+        else:
+            positional.append(arg)
+    if len(positional) < 2:
+        print("Usage: py wait_for_text.py \"text\" \"window\" [timeout] [--text \"other\"]... [--all]")
+        sys.exit(1)
+
+    texts.insert(0, positional[0])
+    window_filter = positional[1]
+    timeout = int(positional[2]) if len(positional) > 2 else 30
+
+    try:
+        backend = get_backend()
+        result = wait_for(backend, [text_in_window(text, window_filter) for text in texts],
+                          mode=mode, timeout=timeout)
+        if result.ok:
+            for text, found in zip(texts, result.results):
+                if found is not None:
+                    node, how = found
+                    print(f"Found '{text}' after {result.elapsed:.1f}s ({how}: '{node.name.strip()}')")
+            sys.exit(0)
+
+        missing = [text for text, node in zip(texts, result.results) if node is None]
+        print(f"Timeout: Text '{', '.join(missing)}' not found after {timeout}s")
+        sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -3,35 +3,58 @@
 """
 Wait for Window - Wait until a window with specific title exists
 Usage: py wait_for_window.py "Window Title" [timeout_seconds]
+       py wait_for_window.py "Save As" 10 --window "Confirm Save As"   # Either window
+       py wait_for_window.py "Notepad" 10 --window "Calculator" --all  # Both windows
+
+Wakes up as soon as UI Automation reports a new window (no fixed polling).
 """
 import sys
-import io
 import time
-from pywinauto import Desktop
-
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-
-if len(sys.argv) < 2:
-    print("Usage: py wait_for_window.py \"Window Title\" [timeout]")
-    sys.exit(1)
-
-window_title = sys.argv[1]
-timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-
-try:
-    desktop = Desktop(backend="uia")
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
-        windows = desktop.windows()
-        for window in windows:
-            if window_title.lower() in window.window_text().lower():
-                print(f"Found window '{window.window_text()}' after {time.time() - start_time:.1f}s")
-                sys.exit(0)
-        time.sleep(0.5)
-        
-    print(f"Timeout: Window '{window_title}' not found after {timeout}s")
-    sys.exit(1)
-except Exception as e:
-    print(f"Error: {e}")
-    sys.exit(1)
+from wincontrol import get_backend
+from wincontrol.waits import wait_for, window_exists
+
+
+def wait_for_window(desktop, window_title, timeout):
+    """Wait until a window matching window_title exists. Returns it or None."""
+    result = wait_for(desktop, [window_exists(window_title)], timeout=timeout)
+    return result.results[0]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    titles, positional, mode = [], [], 'any'
+    args = iter(argv)
+    for arg in args:
+        if arg == '--all':
+            mode = 'all'
+        elif arg == '--window':
+            titles.append(next(args, ''))
+        else:
+            positional.append(arg)
+    if len(positional) < 1:
+        print("Usage: py wait_for_window.py \"Window Title\" [timeout] [--window \"Other\"]... [--all]")
+        sys.exit(1)
+
+    titles.insert(0, positional[0])
+    timeout = int(positional[1]) if len(positional) > 1 else 30
+
+    try:
+        conditions = [window_exists(title) for title in titles]
+        result = wait_for(get_backend(), conditions, mode=mode, timeout=timeout)
+        if result.ok:
+            for window in result.results:
+                if window is not None:
+                    print(f"Found window '{window.window_text()}' after {result.elapsed:.1f}s")
+            sys.exit(0)
+
+        missing = [c.label for c, r in zip(conditions, result.results) if r is None]
+        print(f"Timeout: {', '.join(missing)} not found after {timeout}s")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
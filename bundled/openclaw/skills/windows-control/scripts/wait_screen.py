@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Wait Screen - Wait until part of the screen changes, or until it stops changing
+Usage: py wait_screen.py change --window "Notepad"             # Returns when the window repaints
+       py wait_screen.py stable --window "Chrome" --stable-ms 800
+       py wait_screen.py stable --region 0 0 1280 720 --timeout 20
+       py wait_screen.py change --interval-ms 50 --ignore 1     # Faster polls, ignore a caret
+
+Use after a click instead of a fixed sleep: `change` returns as soon as
+the app reacts, `stable` once it has finished drawing. Polls a cheap
+low-resolution signature of the area (wincontrol.screenwait), not full
+screenshots. Exits 0 when the condition is met, 1 on timeout.
+"""
+import sys
+import argparse
+from wincontrol import get_backend
+from wincontrol.screenwait import (DEFAULT_INTERVAL, DEFAULT_STABLE, DEFAULT_TIMEOUT, STEP, TILE,
+                                   UNTIL, wait_screen)
+from wincontrol.windows import find_window
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Wait for the screen to change or settle')
+    parser.add_argument('until', choices=UNTIL, help='change: any change; stable: no change for --stable-ms')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--window', '-w', help='Watch this window (partial title)')
+    target.add_argument('--region', '-r', type=int, nargs=4,
+                        metavar=('LEFT', 'TOP', 'RIGHT', 'BOTTOM'), help='Watch a screen region')
+    parser.add_argument('--stable-ms', type=int, default=int(DEFAULT_STABLE * 1000),
+                        help=f'How long the area must stay unchanged (default {int(DEFAULT_STABLE * 1000)})')
+    parser.add_argument('--interval-ms', type=int, default=int(DEFAULT_INTERVAL * 1000),
+                        help=f'Time between polls (default {int(DEFAULT_INTERVAL * 1000)})')
+    parser.add_argument('--timeout', '-t', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Give up after this many seconds (default {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('--ignore', type=int, default=0,
+                        help=f'Changes in at most this many tiles do not count (default 0); a tile '
+                             f'is {TILE} x --step screen pixels square ({TILE * STEP}px by default)')
+    parser.add_argument('--step', type=int, default=STEP,
+                        help=f'Compare every Nth pixel (default {STEP}; 1 = every pixel)')
+    args = parser.parse_args(argv)
+
+    try:
+        window = None
+        if args.window:
+            window = find_window(get_backend(), args.window)
+            if not window:
+                print(f"Error: Window containing '{args.window}' not found", file=sys.stderr)
+                sys.exit(1)
+
+        result = wait_screen(region=args.region, window=window, until=args.until,
+                             stable=args.stable_ms / 1000, interval=args.interval_ms / 1000,
+                             timeout=args.timeout, step=max(1, args.step), ignore=args.ignore)
+        if result.ok and result.until == 'change':
+            print(f"Changed after {result.elapsed:.2f}s ({result.changed} tile(s), {result.frames} frames)")
+        elif result.ok:
+            print(f"Stable for {args.stable_ms}ms after {result.elapsed:.2f}s ({result.frames} frames)")
+        elif result.until == 'change':
+            print(f"Timeout: no change after {args.timeout:g}s ({result.frames} frames)")
+            sys.exit(1)
+        else:
+            print(f"Timeout: still changing after {args.timeout:g}s ({result.frames} frames)")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    from wincontrol.client import run
+    run(__file__, main)
@@ -0,0 +1,11 @@
+"""
+wincontrol - Shared core for the windows-control scripts
+
+Every script in this directory talks to the desktop through this package
+instead of importing pywinauto/pyautogui directly. That lets the same code
+run in its own process, inside the resident daemon (daemon.py), or against
+the fake desktop used for development on non-Windows hosts.
+"""
+from .backend import get_backend, set_backend
+
+__all__ = ['get_backend', 'set_backend']
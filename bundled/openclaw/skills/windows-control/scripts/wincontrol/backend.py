@@ -0,0 +1,463 @@
+"""
+Desktop backends - the one place that knows about pywinauto and pyautogui
+
+UIABackend wraps pywinauto's UIA Desktop and pyautogui. FakeBackend (see
+fake.py) implements the same surface over an in-memory tree so scripts,
+the daemon protocol and batch mode can be exercised on Linux.
+
+Threads: every thread that makes UIA calls joins the process's
+multithreaded COM apartment first (init_com_thread(); UIABackend does it
+for the thread that creates it, before pywinauto's own COM setup, which
+also asks for the MTA). UIA elements can then be used from any of these
+threads without marshalling, which the deadline threads (deadline.py),
+parallel window scans (scan.py) and batch steps rely on.
+
+Select the backend with WINCONTROL_BACKEND:
+    uia (default)           real Windows desktop
+    fake                    built-in demo desktop
+    fake:C:\\path\\tree.json  fake desktop loaded from a JSON tree
+"""
+import os
+import sys
+import ctypes
+
+_backend = None
+
+# UI Automation constants (UIAutomationClient.h)
+TREE_SCOPE_ELEMENT = 1
+TREE_SCOPE_CHILDREN = 2
+TREE_SCOPE_DESCENDANTS = 4
+TREE_SCOPE_SUBTREE = 7
+AUTOMATION_ELEMENT_MODE_FULL = 1
+UIA_PROPERTY_IDS = {
+    'runtime_id': 30000,
+    'rect': 30001,
+    'control_type': 30003,
+    'name': 30005,
+    'enabled': 30010,
+    'automation_id': 30011,
+    'class_name': 30012,
+    'value': 30045,
+    'toggle_state': 30086,
+}
+UIA_IS_TEXT_PATTERN_AVAILABLE = 30040
+PROPERTY_CONDITION_IGNORE_CASE = 1
+UIA_TEXT_PATTERN_ID = 10014
+UIA_TEXT_CHANGED_EVENT_ID = 20015
+UIA_WINDOW_OPENED_EVENT_ID = 20016
+# Controls whose window_text() is the document text rather than the Name
+TEXT_CONTROL_TYPES = ('Edit', 'Document')
+
+
+def control_type_name(type_id):
+    from pywinauto.uia_defines import IUIA
+    return IUIA().known_control_type_ids.get(type_id, str(type_id))
+
+
+def combine(conditions, join):
+    """Fold conditions pairwise with CreateOrCondition/CreateAndCondition."""
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = join(result, condition)
+    return result
+
+
+def cached_children(element):
+    children = element.GetCachedChildren()
+    if not children:
+        return []
+    return [children.GetElement(i) for i in range(children.Length)]
+
+
+def read_cached(element, props):
+    """Read snapshot properties from an element's UIA cache (no round trips)."""
+    values = {}
+    for prop in props:
+        try:
+            if prop == 'name':
+                values['name'] = element.CachedName or ''
+            elif prop == 'control_type':
+                values['control_type'] = control_type_name(element.CachedControlType)
+            elif prop == 'rect':
+                r = element.CachedBoundingRectangle
+                values['rect'] = (r.left, r.top, r.right, r.bottom)
+            elif prop == 'enabled':
+                values['enabled'] = bool(element.CachedIsEnabled)
+            elif prop == 'automation_id':
+                values['automation_id'] = element.CachedAutomationId or ''
+            elif prop == 'class_name':
+                values['class_name'] = element.CachedClassName or ''
+            else:
+                value = element.GetCachedPropertyValue(UIA_PROPERTY_IDS[prop])
+                if prop == 'runtime_id':
+                    value = tuple(value) if value else ()
+                elif prop == 'value':
+                    value = value if isinstance(value, str) else None
+                elif prop == 'toggle_state':
+                    value = value if isinstance(value, int) else None
+                values[prop] = value
+        except Exception:
+            values[prop] = None
+    if 'name' in props and values.get('control_type') in TEXT_CONTROL_TYPES:
+        # window_text() returns the full document for TextPattern controls;
+        # only these few nodes pay an extra call.
+        try:
+            if element.GetCachedPropertyValue(UIA_IS_TEXT_PATTERN_AVAILABLE):
+                values['name'] = document_text(element) or values['name']
+        except Exception:
+            pass
+    return values
+
+
+def document_text(element):
+    import comtypes.gen.UIAutomationClient as uia_client
+    pattern = element.GetCurrentPattern(UIA_TEXT_PATTERN_ID)
+    text_pattern = pattern.QueryInterface(uia_client.IUIAutomationTextPattern)
+    return text_pattern.DocumentRange.GetText(-1)
+
+
+def event_handler(callback):
+    """COM object implementing the UIA event handler interfaces; every event calls callback()."""
+    import comtypes
+    import comtypes.gen.UIAutomationClient as uia_client
+
+    class Handler(comtypes.COMObject):
+        _com_interfaces_ = [uia_client.IUIAutomationEventHandler,
+                            uia_client.IUIAutomationPropertyChangedEventHandler,
+                            uia_client.IUIAutomationStructureChangedEventHandler]
+
+        def IUIAutomationEventHandler_HandleAutomationEvent(self, sender, event_id):
+            callback()
+
+        def IUIAutomationPropertyChangedEventHandler_HandlePropertyChangedEvent(self, sender, property_id, value):
+            callback()
+
+        def IUIAutomationStructureChangedEventHandler_HandleStructureChangedEvent(self, sender, change, runtime_id):
+            callback()
+
+    return Handler()
+
+
+class UIAEventSubscription:
+    """UIA event handlers that call callback() on a relevant change.
+
+    Desktop-wide: window opened and top-level structure changes. watch(window)
+    adds the window subtree's structure, Name/Value and text changes; pass
+    watch() its own callback to learn which window changed. Handlers are
+    invoked on UIA's own threads, so callbacks must be cheap and thread-safe
+    (e.g. threading.Event.set). close() removes only this subscription's
+    handlers, other subscriptions in the process keep theirs.
+    """
+
+    def __init__(self, callback):
+        from pywinauto.uia_defines import IUIA
+        self.iuia = IUIA().iuia
+        self.callback = callback
+        self.handler = event_handler(callback)
+        self.watched = set()
+        # (element, handler) per watched window, for the three handlers watch() adds
+        self.registrations = []
+        self.root = self.iuia.GetRootElement()
+        self.iuia.AddAutomationEventHandler(UIA_WINDOW_OPENED_EVENT_ID, self.root,
+                                            TREE_SCOPE_SUBTREE, None, self.handler)
+        self.iuia.AddStructureChangedEventHandler(self.root, TREE_SCOPE_CHILDREN, None,
+                                                  self.handler)
+
+    def watch(self, window, callback=None):
+        handle = window.handle
+        if handle in self.watched:
+            return
+        element = window.element_info.element
+        handler = event_handler(callback) if callback else self.handler
+        self.iuia.AddStructureChangedEventHandler(element, TREE_SCOPE_SUBTREE, None, handler)
+        self.iuia.AddPropertyChangedEventHandler(
+            element, TREE_SCOPE_SUBTREE, None, handler,
+            [UIA_PROPERTY_IDS['name'], UIA_PROPERTY_IDS['value']])
+        self.iuia.AddAutomationEventHandler(UIA_TEXT_CHANGED_EVENT_ID, element, TREE_SCOPE_SUBTREE,
+                                            None, handler)
+        self.registrations.append((element, handler))
+        self.watched.add(handle)
+
+    def close(self):
+        for element, handler in self.registrations:
+            try:
+                self.iuia.RemoveStructureChangedEventHandler(element, handler)
+                self.iuia.RemovePropertyChangedEventHandler(element, handler)
+                self.iuia.RemoveAutomationEventHandler(UIA_TEXT_CHANGED_EVENT_ID, element, handler)
+            except Exception:
+                pass  # Window already gone
+        self.registrations = []
+        self.iuia.RemoveAutomationEventHandler(UIA_WINDOW_OPENED_EVENT_ID, self.root, self.handler)
+        self.iuia.RemoveStructureChangedEventHandler(self.root, self.handler)
+
+
+class UIABackend:
+    """Real Windows desktop via pywinauto (UIA) and pyautogui."""
+
+    name = 'uia'
+
+    def __init__(self):
+        init_com_thread()
+        from pywinauto import Desktop
+        self.desktop = Desktop(backend="uia")
+        self._input = None
+        self._process_names = {}
+
+    def windows(self):
+        """Top-level windows in z-order."""
+        return self.desktop.windows()
+
+    def active_window(self):
+        """Wrapper for the foreground window, or None."""
+        try:
+            return self.desktop.window(active_only=True).wrapper_object()
+        except Exception:
+            return None
+
+    def active_title(self):
+        import pygetwindow as gw
+        active = gw.getActiveWindow()
+        return active.title if active else None
+
+    def input(self):
+        """Mouse/keyboard driver (the pyautogui module)."""
+        if self._input is None:
+            import pyautogui
+            self._input = pyautogui
+        return self._input
+
+    # --- cheap in-process Win32 queries (no UIA round trip) -------------
+
+    def top_level_handles(self):
+        """Visible top-level hwnds in z-order (EnumWindows)."""
+        user32 = ctypes.windll.user32
+        handles = []
+
+        @ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
+        def callback(hwnd, lparam):
+            if user32.IsWindowVisible(hwnd):
+                handles.append(hwnd)
+            return True
+
+        user32.EnumWindows(callback, 0)
+        return handles
+
+    def window_title(self, hwnd):
+        user32 = ctypes.windll.user32
+        length = user32.GetWindowTextLengthW(hwnd)
+        buf = ctypes.create_unicode_buffer(length + 1)
+        user32.GetWindowTextW(hwnd, buf, length + 1)
+        return buf.value
+
+    def window_class(self, hwnd):
+        buf = ctypes.create_unicode_buffer(256)
+        ctypes.windll.user32.GetClassNameW(hwnd, buf, 256)
+        return buf.value
+
+    def window_pid(self, hwnd):
+        pid = ctypes.c_ulong()
+        ctypes.windll.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return pid.value
+
+    def window_rect(self, hwnd):
+        """(left, top, right, bottom) of a top-level window (GetWindowRect), or None."""
+        from ctypes import wintypes
+        rect = wintypes.RECT()
+        if not ctypes.windll.user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        return (rect.left, rect.top, rect.right, rect.bottom)
+
+    def is_alive(self, hwnd):
+        return bool(ctypes.windll.user32.IsWindow(hwnd))
+
+    def process_name(self, pid):
+        """Executable name for a pid, e.g. 'chrome.exe' (cached)."""
+        if pid in self._process_names:
+            return self._process_names[pid]
+        name = ''
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if handle:
+            try:
+                size = ctypes.c_ulong(1024)
+                buf = ctypes.create_unicode_buffer(size.value)
+                if kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+                    name = os.path.basename(buf.value)
+            finally:
+                kernel32.CloseHandle(handle)
+        self._process_names[pid] = name
+        return name
+
+    def wrap(self, hwnd):
+        """UIA wrapper for a top-level hwnd (one ElementFromHandle call)."""
+        from pywinauto.controls.uiawrapper import UIAWrapper
+        from pywinauto.uia_element_info import UIAElementInfo
+        return UIAWrapper(UIAElementInfo(hwnd))
+
+    def wrap_element(self, element):
+        """UIA wrapper for a raw IUIAutomationElement (e.g. from a snapshot)."""
+        from pywinauto.controls.uiawrapper import UIAWrapper
+        from pywinauto.uia_element_info import UIAElementInfo
+        return UIAWrapper(UIAElementInfo(element))
+
+    def subscribe(self, callback):
+        """Start a UIAEventSubscription for callback."""
+        return UIAEventSubscription(callback)
+
+    # --- batched property fetch (UIA CacheRequest) ----------------------
+
+    def cache_request(self, props, scope=TREE_SCOPE_SUBTREE):
+        """Build an IUIAutomationCacheRequest for snapshot property names."""
+        from pywinauto.uia_defines import IUIA
+        iuia = IUIA()
+        request = iuia.iuia.CreateCacheRequest()
+        for prop in props:
+            request.AddProperty(UIA_PROPERTY_IDS[prop])
+        if 'name' in props:
+            request.AddProperty(UIA_IS_TEXT_PATTERN_AVAILABLE)
+        request.TreeScope = scope
+        # Raw view, same as pywinauto's descendants()
+        request.TreeFilter = iuia.true_condition
+        # Keep live element references so nodes can be clicked afterwards
+        request.AutomationElementMode = AUTOMATION_ELEMENT_MODE_FULL
+        return request
+
+    def snapshot(self, window, props, builder=None):
+        """Capture props for window's whole subtree in one BuildUpdatedCache call.
+
+        Nodes are handed to builder.add() (default: snapshot.NodeBuilder).
+        """
+        from .snapshot import NodeBuilder
+        builder = NodeBuilder() if builder is None else builder
+        root = window.element_info.element
+        cached_root = root.BuildUpdatedCache(self.cache_request(props))
+        stack = [(child, 1, -1) for child in reversed(cached_children(cached_root))]
+        while stack:
+            element, depth, parent = stack.pop()
+            index = builder.add(depth, parent, element, read_cached(element, props))
+            stack.extend((child, depth + 1, index) for child in reversed(cached_children(element)))
+        return builder.result()
+
+    def children(self, window, props, element=None):
+        """Direct children of element (default: window) with props, in one call.
+
+        Returns [(element, values)]; the building block of lazy walks
+        (snapshot.walk) that can stop before the whole subtree is fetched.
+        """
+        from pywinauto.uia_defines import IUIA
+        parent = window.element_info.element if element is None else element
+        found = parent.FindAllBuildCache(TREE_SCOPE_CHILDREN, IUIA().true_condition,
+                                         self.cache_request(props, scope=TREE_SCOPE_ELEMENT))
+        if not found:
+            return []
+        return [(child, read_cached(child, props))
+                for child in (found.GetElement(i) for i in range(found.Length))]
+
+    def refresh(self, element, props):
+        """Current props of a known element in one call, or None if it is gone."""
+        try:
+            cached = element.BuildUpdatedCache(self.cache_request(props, scope=TREE_SCOPE_ELEMENT))
+        except Exception:
+            # UIA_E_ELEMENTNOTAVAILABLE and friends: the element no longer exists
+            return None
+        return read_cached(cached, props)
+
+    def focused(self, props, ancestors=True):
+        """[(element, values)] for the keyboard focus and its ancestors, innermost first.
+
+        The focused element comes with its props in one
+        GetFocusedElementBuildCache call; each ancestor up to the top-level
+        window (the root's child) is one GetParentElementBuildCache on the
+        raw view walker. [] if nothing has focus.
+        """
+        from pywinauto.uia_defines import IUIA
+        iuia = IUIA().iuia
+        request = self.cache_request(props, scope=TREE_SCOPE_ELEMENT)
+        root = iuia.GetRootElement()
+        try:
+            element = iuia.GetFocusedElementBuildCache(request)
+        except Exception:
+            return []
+        if not element or iuia.CompareElements(element, root):
+            return []
+        chain = [(element, read_cached(element, props))]
+        if ancestors:
+            walker = iuia.RawViewWalker
+            while True:
+                parent = walker.GetParentElementBuildCache(element, request)
+                if not parent or iuia.CompareElements(parent, root):
+                    break
+                chain.append((parent, read_cached(parent, props)))
+                element = parent
+        return chain
+
+    def locate(self, window, runtime_id, props):
+        """(element, values) for the descendant of window with runtime_id, or None.
+
+        One provider-side FindFirstBuildCache on the RuntimeId property.
+        """
+        from pywinauto.uia_defines import IUIA
+        iuia = IUIA()
+        condition = iuia.iuia.CreatePropertyCondition(UIA_PROPERTY_IDS['runtime_id'], list(runtime_id))
+        found = window.element_info.element.FindFirstBuildCache(
+            TREE_SCOPE_DESCENDANTS, condition, self.cache_request(props, scope=TREE_SCOPE_ELEMENT))
+        if not found:
+            return None
+        return found, read_cached(found, props)
+
+    def find_all(self, window, props, control_types=None, name=None, ignore_case=False):
+        """Provider-side search: one FindAllBuildCache with a type/name condition."""
+        from pywinauto.uia_defines import IUIA
+        from .snapshot import Node
+        iuia = IUIA()
+        conditions = []
+        if control_types:
+            type_conditions = [
+                iuia.iuia.CreatePropertyCondition(UIA_PROPERTY_IDS['control_type'],
+                                                  iuia.known_control_types[t])
+                for t in control_types if t in iuia.known_control_types
+            ]
+            if not type_conditions:
+                return []
+            conditions.append(combine(type_conditions, iuia.iuia.CreateOrCondition))
+        if name is not None:
+            flags = PROPERTY_CONDITION_IGNORE_CASE if ignore_case else 0
+            conditions.append(iuia.iuia.CreatePropertyConditionEx(UIA_PROPERTY_IDS['name'], name, flags))
+        condition = combine(conditions, iuia.iuia.CreateAndCondition) if conditions else iuia.true_condition
+
+        request = self.cache_request(props, scope=TREE_SCOPE_ELEMENT)
+        found = window.element_info.element.FindAllBuildCache(TREE_SCOPE_DESCENDANTS, condition, request)
+        if not found:
+            return []
+        return [Node(element=element, **read_cached(element, props))
+                for element in (found.GetElement(i) for i in range(found.Length))]
+
+
+def init_com_thread():
+    """Join the multithreaded COM apartment before this thread touches UIA (no-op off Windows)."""
+    if sys.platform != 'win32':
+        return
+    try:
+        import comtypes
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+    except Exception:
+        pass
+
+
+def get_backend():
+    """Return the process-wide backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        spec = os.environ.get('WINCONTROL_BACKEND', 'uia')
+        if spec.startswith('fake'):
+            from .fake import FakeBackend
+            _backend = FakeBackend.from_spec(spec)
+        else:
+            _backend = UIABackend()
+    return _backend
+
+
+def set_backend(backend):
+    """Install a backend explicitly (daemon warm-up, fake desktops)."""
+    global _backend
+    _backend = backend
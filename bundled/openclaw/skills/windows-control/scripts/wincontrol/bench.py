@@ -0,0 +1,283 @@
+"""
+Benchmarks - compare tree access strategies on a synthetic fake desktop
+
+Usage: py -m wincontrol.bench search [--depth 5] [--fanout 6] [--latency-ms 0.05]
+       py -m wincontrol.bench tree [--fanout 10] [--depths 3 4 5]
+       py -m wincontrol.bench names [--depth 5] [--fanout 8] [--queries 20]
+       py -m wincontrol.bench capture [--sources gdi mss pil synthetic] [--repeat 20]
+       py -m wincontrol.bench encode [--source synthetic] [--max-edges 0 1568 1024]
+
+Each strategy runs against the same synthetic window. The fake backend
+counts provider calls, so the call column is what a real UIA session would
+pay in cross-process round trips; --latency-ms adds a simulated cost per
+call to turn that into wall time.
+
+capture times screen grabs per capture source (whole screen, first
+monitor, an 800x600 region); sources that cannot run here are skipped,
+synthetic always runs. encode times screenshot encoding per format,
+quality, optimize and max edge on one captured frame (file size, ms and
+the scale reported for coordinates).
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from .backend import set_backend
+from .capture import SOURCES, open_source, target_region
+from .encode import FORMATS, HAS_PIL, encode, prepare
+from .fake import FakeBackend, synthetic_tree
+from .names import NameIndex, scan
+from .search import find_elements
+from .snapshot import BASIC, capture, rect_dict
+from .tree import capture_tree
+
+
+def search_walk(window, control_type, name):
+    """Per-node filtering over descendants(), as the scripts used to do."""
+    name_lower = name.lower() if name else None
+    matches = []
+    for ctrl in window.descendants():
+        if ctrl.element_info.control_type != control_type:
+            continue
+        text = ctrl.window_text()
+        if name_lower and name_lower not in text.lower():
+            continue
+        if ctrl.is_enabled():
+            matches.append((text, ctrl.rectangle()))
+    return matches
+
+
+def search_snapshot(window, control_type, name):
+    """One batched capture, filtered in Python."""
+    name_lower = name.lower() if name else None
+    return [node for node in capture(window, BASIC)
+            if node.control_type == control_type
+            and (not name_lower or name_lower in node.name.lower()) and node.enabled]
+
+
+def search_provider(window, control_type, name):
+    """Type condition evaluated by the provider (FindAllBuildCache)."""
+    return [node for node in find_elements(window, name, control_types=[control_type])
+            if node.enabled]
+
+
+SEARCH_STRATEGIES = [
+    ('descendants walk', search_walk),
+    ('snapshot + filter', search_snapshot),
+    ('provider FindAll', search_provider),
+]
+
+
+def bench_search(args):
+    backend = FakeBackend(latency=args.latency_ms / 1000.0)
+    backend.load(synthetic_tree(windows=1, depth=args.depth, fanout=args.fanout))
+    set_backend(backend)
+    window = backend.windows()[0]
+    size = sum(1 for _ in window.iter_subtree())
+    print(f"Synthetic window: {size} nodes, query --type {args.type}"
+          + (f" name~'{args.name}'" if args.name else ""))
+    print(f"{'strategy':<20} {'matches':>8} {'calls':>8} {'ms':>10}")
+    for label, strategy in SEARCH_STRATEGIES:
+        backend.reset_counters()
+        start = time.perf_counter()
+        matches = strategy(window, args.type, args.name)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<20} {len(matches):>8} {backend.total_calls:>8} {elapsed:>10.1f}")
+
+
+def dicts_per_node(window):
+    """Today's read_ui_elements shape: one dict (plus a rect dict) per element."""
+    elements = []
+    for node in capture(window, BASIC):
+        elem = {'name': node.name.strip() if node.name else "", 'type': node.control_type,
+                'enabled': node.enabled}
+        if node.rect:
+            elem['rect'] = rect_dict(node.rect)
+            elem['rect']['center_x'], elem['rect']['center_y'] = node.center
+        elements.append(elem)
+    return elements
+
+
+def query_dicts(elements, control_type, text):
+    return [e for e in elements if e['type'] == control_type and text in e['name'].lower()]
+
+
+def query_tree(tree, control_type, text):
+    return tree.select(types=[control_type], text=text)
+
+
+def measure(fn, *args):
+    """(result, ms, bytes still allocated by the result)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    del result
+    tracemalloc.start()
+    result = fn(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def bench_tree(args):
+    print(f"{'nodes':>8} {'layout':<12} {'build ms':>9} {'memory KB':>10} {'query ms':>9} {'json ms':>8}")
+    for depth in args.depths:
+        backend = FakeBackend()
+        backend.load(synthetic_tree(windows=1, depth=depth, fanout=args.fanout))
+        set_backend(backend)
+        window = backend.windows()[0]
+        size = sum(1 for _ in window.iter_subtree())
+        layouts = [
+            ('dict/node', dicts_per_node, query_dicts, lambda elements, hits: hits),
+            ('columnar', lambda w: capture_tree(w, BASIC), query_tree,
+             lambda tree, hits: tree.to_dicts(hits)),
+        ]
+        for label, build, query, output in layouts:
+            data, build_ms, memory = measure(build, window)
+            start = time.perf_counter()
+            hits = query(data, args.type, args.text)
+            query_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            json.dumps(output(data, hits))
+            json_ms = (time.perf_counter() - start) * 1000
+            print(f"{size:>8} {label:<12} {build_ms:>9.1f} {memory / 1024:>10.0f} {query_ms:>9.2f} {json_ms:>8.2f}")
+
+
+def bench_names(args):
+    backend = FakeBackend()
+    backend.load(synthetic_tree(windows=1, depth=args.depth, fanout=args.fanout))
+    set_backend(backend)
+    nodes = capture(backend.windows()[0], BASIC)
+    names = sorted({node.name for node in nodes})
+    queries = [names[i * len(names) // args.queries].lower() for i in range(args.queries)]
+    typos = [q[:2] + q[3] + q[2] + q[4:] for q in queries]
+    print(f"{len(nodes)} nodes, {len(names)} distinct names, {args.queries} queries")
+    print(f"{'strategy':<24} {'build ms':>9} {'query ms':>9} {'hits':>6}")
+
+    start = time.perf_counter()
+    hits = sum(len([n for n in nodes if n.name and q in n.name.lower()]) for q in queries)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'lower() per node':<24} {0:>9.1f} {elapsed / args.queries:>9.2f} {hits:>6}")
+
+    # A NameIndex searched once only scans
+    start = time.perf_counter()
+    hits = sum(len(scan(nodes, q)) for q in queries)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'scan (first search)':<24} {0:>9.1f} {elapsed / args.queries:>9.2f} {hits:>6}")
+
+    # Build covers what the first indexed query of each kind pays (n-grams on the first fuzzy one)
+    index = NameIndex(nodes)
+    for label, batch, fuzzy in (('index substring', queries, False),
+                                ('index fuzzy top-5 typo', typos, True)):
+        start = time.perf_counter()
+        if index.raw is None:
+            index.build()
+        else:
+            index.postings()
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        hits = sum(len(index.search(q, fuzzy=fuzzy, limit=5 if fuzzy else None)) for q in batch)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<24} {build_ms:>9.1f} {elapsed / args.queries:>9.2f} {hits:>6}")
+
+
+def bench_capture(args):
+    print(f"{'source':<10} {'target':<8} {'size':>10} {'ms/grab':>8} {'MB/s':>8}")
+    for name in args.sources:
+        try:
+            source = open_source(name)
+        except Exception as e:
+            print(f"{name:<10} skipped ({e.__class__.__name__}: {e})")
+            continue
+        try:
+            screen = target_region(source=source)
+            targets = [('screen', screen), ('monitor', target_region(monitor=1, source=source)),
+                       ('region', target_region((screen[0], screen[1], screen[0] + 800,
+                                                 screen[1] + 600), source=source))]
+            for label, region in targets:
+                source.grab(region)  # Warm-up: buffers are allocated once
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    frame = source.grab(region)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                megabytes = frame.width * frame.height * 4 / 1e6
+                print(f"{name:<10} {label:<8} {frame.width:>5}x{frame.height:<4} "
+                      f"{elapsed * 1000:>8.2f} {megabytes / elapsed:>8.0f}")
+        finally:
+            source.close()
+
+
+def bench_encode(args):
+    source = open_source(args.source)
+    try:
+        frame = source.grab(target_region(source=source)).copy()
+    finally:
+        source.close()
+    prepared = prepare(frame)
+    formats = args.formats or (FORMATS if HAS_PIL else ('png',))
+    print(f"Frame {frame.width}x{frame.height} from {args.source}"
+          + ("" if HAS_PIL else " (no Pillow: built-in PNG encoder only)"))
+    print(f"{'format':<6} {'quality':>7} {'optimize':>8} {'max edge':>8} {'size':>10} "
+          f"{'scale':>6} {'KB':>8} {'ms':>8}")
+    for format in formats:
+        qualities = args.qualities if format != 'png' else [None]
+        for quality in qualities:
+            for optimize in (False, True):
+                for max_edge in args.max_edges:
+                    timings = []
+                    for _ in range(args.repeat):
+                        image = encode(frame, format, quality or 85, optimize, max_edge or None,
+                                       prepared=prepared)
+                        timings.append(image.ms)
+                    print(f"{format:<6} {quality or '-':>7} {'on' if optimize else 'off':>8} "
+                          f"{max_edge or 'full':>8} {image.width:>5}x{image.height:<4} "
+                          f"{image.scale:>6.3f} {len(image.data) / 1024:>8.0f} {min(timings):>8.1f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='py -m wincontrol.bench',
+                                     description='Benchmark tree access strategies')
+    sub = parser.add_subparsers(dest='bench', required=True)
+    search = sub.add_parser('search', help='Element search: walk vs snapshot vs provider')
+    search.add_argument('--depth', type=int, default=5)
+    search.add_argument('--fanout', type=int, default=6)
+    search.add_argument('--type', default='Button', help='Control type to search for')
+    search.add_argument('--name', help='Optional name substring')
+    search.add_argument('--latency-ms', type=float, default=0.0,
+                        help='Simulated cost of one provider call')
+    search.set_defaults(func=bench_search)
+    tree = sub.add_parser('tree', help='Captured tree layout: dict per node vs columnar')
+    tree.add_argument('--fanout', type=int, default=10)
+    tree.add_argument('--depths', type=int, nargs='+', default=[3, 4, 5],
+                      help='Tree depths (fanout 10: ~1k, 10k, 100k nodes)')
+    tree.add_argument('--type', default='Button', help='Control type to query')
+    tree.add_argument('--text', default='save', help='Name substring to query')
+    tree.set_defaults(func=bench_tree)
+    names = sub.add_parser('names', help='Name lookup: lower() per node vs name index')
+    names.add_argument('--depth', type=int, default=5)
+    names.add_argument('--fanout', type=int, default=8)
+    names.add_argument('--queries', type=int, default=20)
+    names.set_defaults(func=bench_names)
+    capture = sub.add_parser('capture', help='Screen grabs per capture source')
+    capture.add_argument('--sources', nargs='+', default=list(SOURCES), choices=SOURCES)
+    capture.add_argument('--repeat', type=int, default=20)
+    capture.set_defaults(func=bench_capture)
+    encoding = sub.add_parser('encode', help='Screenshot encoding: format, quality, optimize, size')
+    encoding.add_argument('--source', default='synthetic', choices=SOURCES)
+    encoding.add_argument('--formats', nargs='+', choices=FORMATS)
+    encoding.add_argument('--qualities', type=int, nargs='+', default=[60, 85])
+    encoding.add_argument('--max-edges', type=int, nargs='+', default=[0, 1568, 1024],
+                          help='Longer-side limits to try (0 = full size)')
+    encoding.add_argument('--repeat', type=int, default=3)
+    encoding.set_defaults(func=bench_encode)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,221 @@
+"""
+Snapshot cache - reuse a window's captured tree across commands
+
+A typical agent loop reads a window, lists its elements and clicks one of
+them within a second; each step used to capture the same tree again.
+The cache keeps recent captures per window:
+
+- one TreeSnapshot per window (snapshot()), shared by read_window,
+  read_ui_elements, read_webpage and element searches. A lookup is
+  answered by any fresh capture that has at least the requested
+  properties; in the daemon a capture always takes SHARED_PROPS as well,
+  so the next command can use it
+- data built from other per-window fetches, such as the name index of a
+  window's elements (lookup()/store(), see search.name_index)
+
+An entry is fresh for WINCONTROL_CACHE_TTL seconds (default 2; 0 turns
+the cache off) unless its window moved or resized (one GetWindowRect, no
+UI Automation call) or UI Automation reported a structure, Name or Value
+change inside the window. Events are subscribed only in the daemon
+(set_shared()), where entries outlive a command. Entries are evicted
+least recently used once their estimated size passes WINCONTROL_CACHE_MB
+(default 64).
+
+Read commands say on stderr when they answered from the cache (age and
+hit count). Actions never trust a cached element: revalidate() re-reads
+it with one call before it is clicked.
+"""
+import threading
+import time
+from collections import OrderedDict
+from .backend import get_backend
+from .deadline import call_timeout, call_with_timeout, env_number, env_seconds
+from .snapshot import BASIC, PROPERTIES, Node
+from .tree import capture_tree
+
+DEFAULT_TTL = 2.0
+DEFAULT_MAX_MB = 64
+# Properties a shared capture always includes (reads, lists, searches, ids)
+SHARED_PROPS = BASIC + ('runtime_id',)
+TREE = 'tree'
+
+
+class CacheEntry:
+    """One cached value for a window, with the facts that decide its freshness."""
+
+    __slots__ = ('hwnd', 'key', 'value', 'props', 'rect', 'created', 'hits', 'size')
+
+    def __init__(self, hwnd, key, value, props, rect, created, size):
+        self.hwnd = hwnd
+        self.key = key
+        self.value = value
+        self.props = frozenset(props)
+        self.rect = rect
+        self.created = created
+        self.hits = 0
+        self.size = size
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created
+
+    def describe(self):
+        """One line for stderr."""
+        return f"Cache: snapshot {self.age:.2f}s old, hit {self.hits}"
+
+
+def estimate_size(value):
+    """Rough bytes held by a cached value."""
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        # TreeSnapshot arrays plus one element reference per node
+        return nbytes() + 64 * len(value)
+    return 256 * len(value) if hasattr(value, '__len__') else 1024
+
+
+def window_rect(window, backend):
+    try:
+        return backend.window_rect(window.handle)
+    except Exception:
+        return None
+
+
+class SnapshotCache:
+    """Per-window cache entries keyed by (hwnd, key), LRU ordered."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.shared = False
+        self.subscription = None
+        self.watched = set()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+    def ttl(self):
+        return env_seconds('WINCONTROL_CACHE_TTL', DEFAULT_TTL)
+
+    def max_bytes(self):
+        return env_number('WINCONTROL_CACHE_MB', DEFAULT_MAX_MB) * 1024 * 1024
+
+    def lookup(self, window, key, props=(), backend=None):
+        """Fresh entry for (window, key) holding at least props, or None."""
+        ttl = self.ttl()
+        if not ttl:
+            return None
+        rect = window_rect(window, backend or get_backend())
+        with self.lock:
+            entry = self.entries.get((window.handle, key))
+            if entry is not None and (entry.rect != rect or time.monotonic() - entry.created > ttl):
+                del self.entries[(window.handle, key)]
+                entry = None
+            if entry is None or not set(props) <= entry.props:
+                self.stats['misses'] += 1
+                return None
+            entry.hits += 1
+            self.stats['hits'] += 1
+            self.entries.move_to_end((window.handle, key))
+            return entry
+
+    def store(self, window, key, value, props=(), backend=None, created=None):
+        """Cache value for (window, key); returns the entry (None if caching is off)."""
+        if not self.ttl():
+            return None
+        backend = backend or get_backend()
+        entry = CacheEntry(window.handle, key, value, props, window_rect(window, backend),
+                           created or time.monotonic(), estimate_size(value))
+        with self.lock:
+            self.entries[(window.handle, key)] = entry
+            self.entries.move_to_end((window.handle, key))
+            total = sum(e.size for e in self.entries.values())
+            limit = self.max_bytes()
+            while total > limit and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                total -= evicted.size
+                self.stats['evictions'] += 1
+        self._watch(window, backend)
+        return entry
+
+    def snapshot(self, window, props=BASIC, backend=None):
+        """(TreeSnapshot with at least props, entry if it came from the cache else None)."""
+        backend = backend or get_backend()
+        entry = self.lookup(window, TREE, props, backend)
+        if entry is not None:
+            return entry.value, entry
+        if self.shared:
+            props = tuple(SHARED_PROPS) + tuple(p for p in props if p not in SHARED_PROPS)
+        tree = capture_tree(window, props, backend)
+        self.store(window, TREE, tree, props, backend)
+        return tree, None
+
+    def invalidate(self, hwnd=None, event=False):
+        """Drop the entries of one window (all windows if hwnd is None)."""
+        with self.lock:
+            keys = [k for k in self.entries if hwnd is None or k[0] == hwnd]
+            for k in keys:
+                del self.entries[k]
+            if event and keys:
+                self.stats['invalidations'] += 1
+
+    def _watch(self, window, backend):
+        """Invalidate the window's entries on its UIA change events (daemon only)."""
+        if not self.shared or window.handle in self.watched:
+            return
+        try:
+            if self.subscription is None:
+                self.subscription = backend.subscribe(lambda: None)
+            hwnd = window.handle
+            self.subscription.watch(window, lambda: self.invalidate(hwnd, event=True))
+            self.watched.add(hwnd)
+        except Exception:
+            pass
+
+    def summary(self):
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries),
+                        bytes=sum(e.size for e in self.entries.values()))
+
+
+_cache = SnapshotCache()
+
+
+def set_shared(shared=True):
+    """Mark this process as long-lived (the daemon): subscribe to events, capture SHARED_PROPS."""
+    _cache.shared = shared
+
+
+def snapshot(window, props=BASIC, backend=None):
+    return _cache.snapshot(window, props, backend)
+
+
+def lookup(window, key, props=(), backend=None):
+    return _cache.lookup(window, key, props, backend)
+
+
+def store(window, key, value, props=(), backend=None, created=None):
+    return _cache.store(window, key, value, props, backend, created)
+
+
+def invalidate(hwnd=None):
+    _cache.invalidate(hwnd)
+
+
+def summary():
+    return _cache.summary()
+
+
+def revalidate(node, props=BASIC, backend=None):
+    """Re-read a node's properties from its live element before acting on it.
+
+    Returns a fresh Node (props re-read, the rest copied), or None if the
+    element is gone. Nodes without an element reference are returned
+    unchanged.
+    """
+    if node.element is None:
+        return node
+    backend = backend or get_backend()
+    values = call_with_timeout(backend.refresh, call_timeout(), node.element, tuple(props))
+    if values is None:
+        return None
+    known = {prop: getattr(node, prop) for prop in PROPERTIES}
+    known.update(values)
+    return Node(depth=node.depth, parent=node.parent, element=node.element, **known)
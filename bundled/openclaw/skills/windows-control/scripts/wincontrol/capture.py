@@ -0,0 +1,443 @@
+"""
+Screen capture - grab the screen, a monitor, a window or a region into a reused buffer
+
+pyautogui.screenshot() goes through PIL's ImageGrab, which copies the
+whole desktop into a new image on every call. Capture sources here grab
+only the requested rectangle, into a buffer the source keeps and reuses:
+
+    gdi        BitBlt from the screen DC into a DIB section (Windows, ctypes only)
+    mss        the mss package, if installed
+    pil        PIL.ImageGrab (what pyautogui uses)
+    synthetic  generated frames, for development and benchmarks off Windows
+
+get_source() picks one per process (the daemon keeps its buffers warm):
+WINCONTROL_CAPTURE names one, otherwise gdi on Windows, synthetic with
+the fake backend, else mss or pil, whichever imports.
+
+A Frame is BGRX pixels (4 bytes each, rows top-down, `stride` bytes
+apart) plus its position on screen. Frames from gdi and synthetic are
+views of the reused buffer: they are valid until the source grabs again,
+copy() one to keep it. to_image() makes a PIL image for encoding and OCR.
+
+Targets (target_region()): a region (left, top, right, bottom) in screen
+pixels, a monitor (0 = all monitors, 1... each monitor, as mss numbers
+them) or a top-level window (its rect from one GetWindowRect, no UI
+Automation; whatever covers the window is captured too, as on screen).
+Regions are clipped to the screen.
+"""
+import os
+import sys
+import time
+import ctypes
+import threading
+from .backend import get_backend
+
+SOURCES = ('gdi', 'mss', 'pil', 'synthetic')
+# Virtual screen of the synthetic source: one monitor, or several side by side
+SYNTHETIC_SCREEN = '2560x1440'
+
+_source = None
+
+
+class Frame:
+    """BGRX pixels of a screen rectangle."""
+
+    __slots__ = ('data', 'width', 'height', 'left', 'top', 'stride')
+
+    def __init__(self, data, width, height, left=0, top=0, stride=None):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.left = left
+        self.top = top
+        self.stride = stride or width * 4
+
+    def __repr__(self):
+        return f"<Frame {self.width}x{self.height} at ({self.left}, {self.top})>"
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    @property
+    def rect(self):
+        return (self.left, self.top, self.left + self.width, self.top + self.height)
+
+    def row(self, y):
+        """Pixels of row y (a memoryview, width * 4 bytes)."""
+        start = y * self.stride
+        return memoryview(self.data)[start:start + self.width * 4]
+
+    def packed(self):
+        """The pixels with rows back to back (no padding), as bytes-like."""
+        if self.stride == self.width * 4:
+            return memoryview(self.data)[:self.stride * self.height]
+        return b''.join(self.row(y) for y in range(self.height))
+
+    def copy(self):
+        """Frame with its own packed copy of the pixels."""
+        return Frame(bytearray(self.packed()), self.width, self.height, self.left, self.top)
+
+    def crop(self, region):
+        """Copy of the part inside region (screen coordinates), clipped to the frame."""
+        left, top, right, bottom = clip(region, self.rect)
+        x0, x1 = (left - self.left) * 4, (right - self.left) * 4
+        data = bytearray()
+        for y in range(top - self.top, bottom - self.top):
+            data += self.row(y)[x0:x1]
+        return Frame(data, right - left, bottom - top, left, top)
+
+    def to_image(self):
+        """PIL RGB image of the frame (needs Pillow)."""
+        from PIL import Image
+        return Image.frombuffer('RGB', self.size, self.data, 'raw', 'BGRX', self.stride, 1)
+
+
+def clip(region, bounds):
+    """region cut to bounds; ValueError if nothing is left."""
+    left, top = max(region[0], bounds[0]), max(region[1], bounds[1])
+    right, bottom = min(region[2], bounds[2]), min(region[3], bounds[3])
+    if right <= left or bottom <= top:
+        raise ValueError(f"Region {tuple(region)} is outside the screen {tuple(bounds)}")
+    return (left, top, right, bottom)
+
+
+class CaptureSource:
+    """Common surface: monitors() and grab(region)."""
+
+    name = None
+
+    def monitors(self):
+        """[(left, top, right, bottom)]: the whole virtual screen, then each monitor."""
+        raise NotImplementedError
+
+    def grab(self, region):
+        """Frame of region (already clipped to the screen)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# --- GDI (Windows) ------------------------------------------------------
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [('biSize', ctypes.c_uint32), ('biWidth', ctypes.c_int32),
+                ('biHeight', ctypes.c_int32), ('biPlanes', ctypes.c_uint16),
+                ('biBitCount', ctypes.c_uint16), ('biCompression', ctypes.c_uint32),
+                ('biSizeImage', ctypes.c_uint32), ('biXPelsPerMeter', ctypes.c_int32),
+                ('biYPelsPerMeter', ctypes.c_int32), ('biClrUsed', ctypes.c_uint32),
+                ('biClrImportant', ctypes.c_uint32)]
+
+
+SRCCOPY = 0x00CC0020
+CAPTUREBLT = 0x40000000
+SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN = 76, 77, 78, 79
+
+
+class GdiCapture(CaptureSource):
+    """BitBlt from the screen into one DIB section, grown as needed and reused.
+
+    The frame is a view of the DIB's pixels, so a grab costs one BitBlt
+    and no allocation once the buffer is large enough.
+    """
+
+    name = 'gdi'
+
+    def __init__(self):
+        from ctypes import wintypes
+        self.user32 = ctypes.windll.user32
+        self.gdi32 = ctypes.windll.gdi32
+        handle = ctypes.c_void_p
+        self.user32.GetDC.restype = handle
+        self.user32.ReleaseDC.argtypes = [handle, handle]
+        self.gdi32.CreateCompatibleDC.restype = handle
+        self.gdi32.CreateCompatibleDC.argtypes = [handle]
+        self.gdi32.CreateDIBSection.restype = handle
+        self.gdi32.CreateDIBSection.argtypes = [handle, ctypes.c_void_p, wintypes.UINT,
+                                                ctypes.POINTER(ctypes.c_void_p), handle,
+                                                wintypes.DWORD]
+        self.gdi32.SelectObject.restype = handle
+        self.gdi32.SelectObject.argtypes = [handle, handle]
+        self.gdi32.DeleteObject.argtypes = [handle]
+        self.gdi32.DeleteDC.argtypes = [handle]
+        self.gdi32.BitBlt.argtypes = [handle, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                      ctypes.c_int, handle, ctypes.c_int, ctypes.c_int,
+                                      wintypes.DWORD]
+        try:
+            # Physical pixels on scaled monitors, matching GetWindowRect
+            ctypes.windll.shcore.SetProcessDpiAwareness(2)
+        except Exception:
+            try:
+                self.user32.SetProcessDPIAware()
+            except Exception:
+                pass
+        self.lock = threading.Lock()
+        self.screen_dc = self.user32.GetDC(None)
+        self.memory_dc = self.gdi32.CreateCompatibleDC(self.screen_dc)
+        self.bitmap = None
+        self.bits = ctypes.c_void_p()
+        self.capacity = (0, 0)
+
+    def monitors(self):
+        from ctypes import wintypes
+        metric = self.user32.GetSystemMetrics
+        left, top = metric(SM_XVIRTUALSCREEN), metric(SM_YVIRTUALSCREEN)
+        found = [(left, top, left + metric(SM_CXVIRTUALSCREEN), top + metric(SM_CYVIRTUALSCREEN))]
+
+        @ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p,
+                            ctypes.POINTER(wintypes.RECT), ctypes.c_void_p)
+        def callback(monitor, dc, rect, data):
+            r = rect.contents
+            found.append((r.left, r.top, r.right, r.bottom))
+            return 1
+
+        self.user32.EnumDisplayMonitors(None, None, callback, None)
+        return found
+
+    def _reserve(self, width, height):
+        """Make the DIB section at least width x height."""
+        if width <= self.capacity[0] and height <= self.capacity[1]:
+            return
+        width, height = max(width, self.capacity[0]), max(height, self.capacity[1])
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # Top-down rows
+        header.biPlanes = 1
+        header.biBitCount = 32
+        bits = ctypes.c_void_p()
+        bitmap = self.gdi32.CreateDIBSection(self.memory_dc, ctypes.byref(header), 0,
+                                             ctypes.byref(bits), None, 0)
+        if not bitmap:
+            raise OSError("CreateDIBSection failed")
+        self.gdi32.SelectObject(self.memory_dc, bitmap)
+        if self.bitmap:
+            self.gdi32.DeleteObject(self.bitmap)
+        self.bitmap, self.bits, self.capacity = bitmap, bits, (width, height)
+
+    def grab(self, region):
+        left, top, right, bottom = region
+        width, height = right - left, bottom - top
+        with self.lock:
+            self._reserve(width, height)
+            if not self.gdi32.BitBlt(self.memory_dc, 0, 0, width, height, self.screen_dc,
+                                     left, top, SRCCOPY | CAPTUREBLT):
+                raise OSError("BitBlt failed")
+            stride = self.capacity[0] * 4
+            pixels = (ctypes.c_char * (stride * height)).from_address(self.bits.value)
+            return Frame(memoryview(pixels).cast('B'), width, height, left, top, stride)
+
+    def close(self):
+        if self.bitmap:
+            self.gdi32.DeleteObject(self.bitmap)
+            self.bitmap = None
+        self.gdi32.DeleteDC(self.memory_dc)
+        self.user32.ReleaseDC(None, self.screen_dc)
+
+
+# --- mss / PIL ------------------------------------------------------------
+
+class MssCapture(CaptureSource):
+    """The mss package (its own BitBlt/XGetImage/CoreGraphics per platform)."""
+
+    name = 'mss'
+
+    def __init__(self):
+        import mss
+        self.sct = mss.mss()
+
+    def monitors(self):
+        return [(m['left'], m['top'], m['left'] + m['width'], m['top'] + m['height'])
+                for m in self.sct.monitors]
+
+    def grab(self, region):
+        left, top, right, bottom = region
+        shot = self.sct.grab({'left': left, 'top': top, 'width': right - left,
+                              'height': bottom - top})
+        return Frame(shot.raw, shot.width, shot.height, left, top)
+
+    def close(self):
+        self.sct.close()
+
+
+class PilCapture(CaptureSource):
+    """PIL.ImageGrab: a new image per grab, converted to BGRX."""
+
+    name = 'pil'
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self.image_grab = ImageGrab
+        self.screen = None
+
+    def monitors(self):
+        if self.screen is None:
+            width, height = self.image_grab.grab(all_screens=True).size
+            self.screen = (0, 0, width, height)
+        return [self.screen]
+
+    def grab(self, region):
+        image = self.image_grab.grab(bbox=region, all_screens=True).convert('RGB')
+        return Frame(image.tobytes('raw', 'BGRX'), image.width, image.height, region[0], region[1])
+
+
+# --- synthetic ----------------------------------------------------------------
+
+class SyntheticCapture(CaptureSource):
+    """A generated desktop: gradient background, a few window-like boxes, a clock.
+
+    screen is "WxH", or several "WxH" joined by "+" for monitors side by
+    side. The clock box (bottom right of the first monitor) changes every
+    second, like a taskbar clock; paint() changes any rectangle, so
+    benchmarks and change detection can be exercised without a display.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, screen=None, clock=True):
+        spec = screen or os.environ.get('WINCONTROL_SYNTHETIC_SCREEN', SYNTHETIC_SCREEN)
+        self.screens = []
+        left = 0
+        for part in spec.split('+'):
+            width, height = (int(n) for n in part.lower().split('x'))
+            self.screens.append((left, 0, left + width, height))
+            left += width
+        self.width = left
+        self.height = max(s[3] for s in self.screens)
+        self.stride = self.width * 4
+        self.pixels = bytearray(self.stride * self.height)
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+        self.clock = clock
+        self.shown_second = None
+        self._draw_scene()
+
+    def monitors(self):
+        return [(0, 0, self.width, self.height)] + list(self.screens)
+
+    def paint(self, region, color):
+        """Fill region with an (r, g, b) color."""
+        left, top, right, bottom = clip(region, (0, 0, self.width, self.height))
+        r, g, b = color
+        row = bytes((b, g, r, 255)) * (right - left)
+        with self.lock:
+            for y in range(top, bottom):
+                start = y * self.stride + left * 4
+                self.pixels[start:start + len(row)] = row
+
+    def _draw_scene(self):
+        for y in range(self.height):
+            shade = 40 + 80 * y // max(1, self.height)
+            row = bytes((shade + 60, shade + 20, shade, 255)) * self.width
+            self.pixels[y * self.stride:(y + 1) * self.stride] = row
+        for i, (left, top, right, bottom) in enumerate(self.screens):
+            w, h = (right - left) // 10, (bottom - top) // 10
+            # Two overlapping windows (one with a title bar) and a taskbar per monitor
+            self.paint((left + w, h, left + 6 * w, 7 * h), (240, 240, 240))
+            self.paint((left + w, h, left + 6 * w, h + 30), (30, 90, 200 - 40 * i))
+            self.paint((left + 4 * w, 3 * h, left + 9 * w, 8 * h), (250, 250, 245))
+            self.paint((left, bottom - 40, right, bottom), (20, 20, 30))
+
+    def _tick_clock(self):
+        second = int(time.time())
+        if not self.clock or second == self.shown_second:
+            return
+        self.shown_second = second
+        left, top, right, bottom = self.screens[0]
+        shade = 100 + (second % 10) * 15
+        self.paint((right - 90, bottom - 32, right - 10, bottom - 8), (shade, shade, shade))
+
+    def grab(self, region):
+        self._tick_clock()
+        left, top, right, bottom = region
+        width, height = right - left, bottom - top
+        size = width * 4 * height
+        with self.lock:
+            if len(self.buffer) < size:
+                self.buffer = bytearray(size)
+            view = memoryview(self.buffer)
+            pixels = memoryview(self.pixels)
+            if width == self.width:
+                view[:size] = pixels[top * self.stride:bottom * self.stride]
+            else:
+                row = width * 4
+                for y in range(height):
+                    start = (top + y) * self.stride + left * 4
+                    view[y * row:(y + 1) * row] = pixels[start:start + row]
+            return Frame(view[:size], width, height, left, top)
+
+
+# --- selection ------------------------------------------------------------
+
+def open_source(name):
+    """New capture source by name (ImportError/OSError if unavailable here)."""
+    if name == 'gdi':
+        if sys.platform != 'win32':
+            raise OSError("gdi capture needs Windows")
+        return GdiCapture()
+    if name == 'mss':
+        return MssCapture()
+    if name == 'pil':
+        return PilCapture()
+    if name == 'synthetic':
+        return SyntheticCapture()
+    raise ValueError(f"Unknown capture source '{name}' (choose from {', '.join(SOURCES)})")
+
+
+def get_source():
+    """Return the process-wide capture source, opening it on first use."""
+    global _source
+    if _source is None:
+        name = os.environ.get('WINCONTROL_CAPTURE')
+        if name:
+            _source = open_source(name)
+        elif sys.platform == 'win32':
+            _source = GdiCapture()
+        elif get_backend().name == 'fake':
+            _source = SyntheticCapture()
+        else:
+            for name in ('mss', 'pil'):
+                try:
+                    _source = open_source(name)
+                    break
+                except ImportError:
+                    continue
+            else:
+                raise ImportError("No screen capture available: pip install mss or Pillow")
+    return _source
+
+
+def set_source(source):
+    """Install a capture source explicitly (tests, benchmarks)."""
+    global _source
+    _source = source
+
+
+def target_region(region=None, monitor=None, window=None, source=None, backend=None):
+    """Screen rectangle for a capture target, clipped to the screen (see module docstring)."""
+    source = source or get_source()
+    monitors = source.monitors()
+    screen = monitors[0]
+    if region is not None:
+        return clip(region, screen)
+    if monitor is not None:
+        if not 0 <= monitor < len(monitors):
+            raise ValueError(f"No monitor {monitor} (have 1-{len(monitors) - 1}, 0 for all)")
+        return monitors[monitor]
+    if window is not None:
+        backend = backend or get_backend()
+        rect = backend.window_rect(window.handle)
+        if rect is None:
+            raise ValueError(f"Window '{window.window_text()}' has no rectangle")
+        try:
+            return clip(rect, screen)
+        except ValueError:
+            raise ValueError(f"Window '{window.window_text()}' is minimized or off screen")
+    return screen
+
+
+def grab(region=None, monitor=None, window=None, source=None):
+    """Frame of the target (the whole virtual screen by default)."""
+    source = source or get_source()
+    return source.grab(target_region(region, monitor, window, source))
@@ -0,0 +1,96 @@
+"""
+Script entry point - hand the command to the resident daemon when one is up,
+otherwise run it in this process.
+
+Every script ends with:
+    if __name__ == "__main__":
+        run(__file__, main)
+
+The daemon executes the same main() with the same argv and sends back the
+captured stdout/stderr and exit code, so output is identical either way.
+Whatever a script flushes is forwarded while it runs (streaming output).
+Set WINCONTROL_NO_DAEMON=1 to always run in-process.
+"""
+import io
+import os
+import sys
+
+from . import state
+
+STATE_FILE = 'daemon.json'
+PROTOCOL_VERSION = 1
+
+
+def fix_console():
+    """Fix Windows console encoding."""
+    if hasattr(sys.stdout, 'buffer') and (sys.stdout.encoding or '').lower() != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+
+def connect(timeout=None):
+    """Open a connection to the daemon, or return None if it is not running."""
+    from multiprocessing.connection import Client, AuthenticationError
+
+    info = state.load_json(STATE_FILE)
+    if not info or info.get('version') != PROTOCOL_VERSION:
+        return None
+    try:
+        return Client(info['address'], family=info['family'], authkey=bytes.fromhex(info['authkey']))
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+
+def request(message, on_partial=None):
+    """Send one request to the daemon. Returns the reply, or None if no daemon answered.
+
+    Partial replies (streamed output) are passed to on_partial as they arrive.
+    """
+    conn = connect()
+    if conn is None:
+        return None
+    with conn:
+        try:
+            conn.send(message)
+        except (OSError, EOFError):
+            return None
+        reply = conn.recv()
+        while reply.get('partial'):
+            if on_partial:
+                on_partial(reply)
+            reply = conn.recv()
+        return reply
+
+
+def write_partial(reply):
+    sys.stdout.write(reply.get('stdout', ''))
+    sys.stdout.flush()
+
+
+def run(script_file, main, stdin=False):
+    """Run a script's main() through the daemon if available, else in-process."""
+    fix_console()
+    if not os.environ.get('WINCONTROL_NO_DAEMON'):
+        name = os.path.splitext(os.path.basename(script_file))[0]
+        message = {'op': 'run', 'script': name, 'argv': sys.argv[1:], 'cwd': os.getcwd(),
+                   'stream': True}
+        if stdin:
+            message['stdin'] = sys.stdin.read()
+        try:
+            reply = request(message, write_partial)
+        except (OSError, EOFError) as e:
+            # The request reached the daemon but no reply came back; re-running
+            # here could repeat an action, so report instead.
+            print(f"Error: daemon connection lost: {e}", file=sys.stderr)
+            sys.exit(1)
+        if reply is not None:
+            sys.stdout.write(reply.get('stdout', ''))
+            sys.stderr.write(reply.get('stderr', ''))
+            sys.stdout.flush()
+            sys.exit(reply.get('code', 0))
+        if stdin:
+            sys.stdin = io.StringIO(message['stdin'])
+    from . import handles
+    try:
+        main()
+    finally:
+        handles.flush()
@@ -0,0 +1,158 @@
+"""
+Deadlines and the hung-window circuit breaker
+
+A hung application blocks UIA calls into it indefinitely; there is no
+way to cancel a COM call from the outside. call_with_timeout() therefore
+runs the call on a daemon thread and stops waiting once the deadline
+passes. The thread is abandoned (it finishes or dies with the process),
+the caller gets DeadlineExceeded and carries on with partial results.
+
+The call thread joins the multithreaded COM apartment like every thread
+that touches UIA (see backend.py), so wrappers and cached elements from
+the caller's thread can be used on it. Calls made from inside a guarded
+call run inline, so wrapping a whole per-window job does not spawn a
+thread per nested provider call; run_guarded() gives the same inline
+behaviour to a thread whose deadline is enforced by its owner (the scan
+pool in scan.py).
+
+The Breaker remembers windows that recently timed out (by hwnd, in a
+state file so plain script runs share it with the daemon). Once a window
+has timed out WINCONTROL_BREAKER_FAILURES times within a cooldown of each
+other, the breaker is open and unfiltered scans skip it until the
+cooldown expires; after that it is tried again with a clean count.
+
+Environment:
+    WINCONTROL_CALL_TIMEOUT      seconds per provider call (default 10, 0 = no limit)
+    WINCONTROL_BREAKER_COOLDOWN  seconds a timed-out window is skipped (default 60)
+    WINCONTROL_BREAKER_FAILURES  timeouts that open the breaker for a window (default 1)
+"""
+import os
+import time
+import threading
+from .backend import init_com_thread
+from . import state
+
+DEFAULT_CALL_TIMEOUT = 10.0
+DEFAULT_COOLDOWN = 60.0
+DEFAULT_FAILURES = 1
+BREAKER_FILE = 'breaker.json'
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """A provider call did not return in time; its thread was abandoned."""
+
+
+def env_number(name, default, minimum=0.0):
+    """Numeric setting from the environment (at least minimum), or default if unset/invalid."""
+    try:
+        return max(minimum, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def env_seconds(name, default):
+    return env_number(name, default)
+
+
+def env_int(name, default, minimum=0):
+    """Integer setting from the environment (at least minimum), or default if unset/invalid."""
+    return int(env_number(name, default, minimum))
+
+
+def call_timeout():
+    """Configured per-call timeout in seconds, or None for no limit."""
+    return env_seconds('WINCONTROL_CALL_TIMEOUT', DEFAULT_CALL_TIMEOUT) or None
+
+
+def call_with_timeout(fn, timeout, *args, **kwargs):
+    """fn(*args, **kwargs), giving up after timeout seconds (None = wait forever)."""
+    if timeout is None or getattr(_local, 'guarded', False):
+        return fn(*args, **kwargs)
+
+    done = threading.Event()
+    outcome = {}
+
+    def target():
+        _local.guarded = True
+        init_com_thread()
+        try:
+            outcome['result'] = fn(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=target, name='wincontrol-call', daemon=True).start()
+    if not done.wait(timeout):
+        raise DeadlineExceeded(f"no response within {timeout:g}s")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def run_guarded(fn, *args, **kwargs):
+    """fn(*args, **kwargs) on this thread, with nested call_with_timeout() calls inline."""
+    previous = getattr(_local, 'guarded', False)
+    _local.guarded = True
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _local.guarded = previous
+
+
+class Breaker:
+    """hwnd -> recent timeouts of the window and until when they are remembered."""
+
+    def __init__(self, cooldown=None, failures=None):
+        self.cooldown = env_seconds('WINCONTROL_BREAKER_COOLDOWN', DEFAULT_COOLDOWN) \
+            if cooldown is None else cooldown
+        self.failures = env_int('WINCONTROL_BREAKER_FAILURES', DEFAULT_FAILURES, 1) \
+            if failures is None else failures
+        self._lock = threading.Lock()
+
+    def _load(self):
+        now = time.time()
+        data = state.load_json(BREAKER_FILE, {}) or {}
+        return {hwnd: info for hwnd, info in data.items() if info.get('until', 0) > now}
+
+    def _open(self, info):
+        return info.get('failures', 1) >= self.failures
+
+    def is_open(self, hwnd):
+        """True while hwnd is cooling down after enough timeouts."""
+        info = self._load().get(str(hwnd))
+        return info is not None and self._open(info)
+
+    def open_windows(self):
+        """{hwnd: title} of every window currently being skipped."""
+        return {int(hwnd): info.get('title', '') for hwnd, info in self._load().items()
+                if self._open(info)}
+
+    def trip(self, hwnd, title=''):
+        """Record a timeout of hwnd; returns True if the breaker is now open for it."""
+        with self._lock:
+            data = self._load()
+            info = data.get(str(hwnd)) or {}
+            info = {'title': title, 'failures': info.get('failures', 0) + 1,
+                    'until': time.time() + self.cooldown}
+            data[str(hwnd)] = info
+            state.save_json(BREAKER_FILE, data)
+            return self._open(info)
+
+    def reset(self, hwnd):
+        with self._lock:
+            data = self._load()
+            if data.pop(str(hwnd), None) is not None:
+                state.save_json(BREAKER_FILE, data)
+
+
+_breaker = None
+
+
+def get_breaker():
+    global _breaker
+    if _breaker is None:
+        _breaker = Breaker()
+    return _breaker
@@ -0,0 +1,208 @@
+"""
+Delta screenshots - which parts of the screen changed since the last capture
+
+After a click usually only a dialog, a menu or a button state changes,
+yet a full screenshot re-encodes and re-sends every pixel. compute()
+splits the frame into TILE x TILE tiles, compares a signature per tile
+with the one kept from the previous delta capture of the same target,
+and merges changed tiles into a few bounding boxes. The caller saves
+only those crops, or the full frame when there is no previous capture,
+more than full_above of the tiles changed, or the change is scattered
+over more than MAX_REGIONS boxes.
+
+Tile signatures are computed with NumPy when it is installed: the frame
+is viewed as a uint32 array, cut into tiles with one reshape and each
+tile reduced to a weighted sum (each pixel times an odd 32-bit weight,
+all wrapping at 32 bits, so changing any one pixel always changes the
+sum). Without NumPy each tile's rows are run through zlib.crc32.
+
+Only the signatures of the previous frame are kept, not its pixels, so
+deltas work across separate script runs as well as in the daemon. They
+are stored packed, 4 bytes per tile in base64: about 11 KB for a
+1920x1080 target, and at most KEEP_TARGETS targets in DELTA_FILE.
+compute() reads that file once and keeps it on the result. A caller
+that still has to save the result computes with update=False and calls
+commit(..., stored=change.stored) once every file is written, so a
+failed save never leaves signatures for images nobody received.
+"""
+import zlib
+import base64
+from array import array
+from collections import deque
+from . import state
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+TILE = 32
+# Above this fraction of changed tiles a full frame is sent instead
+FULL_ABOVE = 0.3
+MAX_REGIONS = 8
+DELTA_FILE = 'delta.json'
+# Capture rectangles whose signatures are kept (window, monitor, region...)
+KEEP_TARGETS = 8
+
+_weights = {}
+
+
+def method():
+    return 'numpy' if HAS_NUMPY else 'crc32'
+
+
+def _tile_weights(tile):
+    if tile not in _weights:
+        rng = np.random.default_rng(tile)
+        _weights[tile] = rng.integers(1, 2 ** 32, size=(tile, tile), dtype=np.uint32) | np.uint32(1)
+    return _weights[tile]
+
+
+def signatures(frame, tile=TILE):
+    """One signature per tile, row-major: a list of ints (see module docstring)."""
+    rows, cols = -(-frame.height // tile), -(-frame.width // tile)
+    if HAS_NUMPY:
+        pixels = np.frombuffer(frame.data, dtype=np.uint32, count=frame.stride // 4 * frame.height)
+        pixels = pixels.reshape(frame.height, frame.stride // 4)[:, :frame.width]
+        padded = np.zeros((rows * tile, cols * tile), dtype=np.uint32)
+        # The X byte is undefined
+        np.bitwise_and(pixels, 0x00FFFFFF, out=padded[:frame.height, :frame.width])
+        tiles = padded.reshape(rows, tile, cols, tile)
+        tiles *= _tile_weights(tile)[None, :, None, :]
+        return tiles.sum(axis=(1, 3), dtype=np.uint32).ravel().tolist()
+    sums = [0] * (rows * cols)
+    span = tile * 4
+    for y in range(frame.height):
+        row = frame.row(y)
+        base = y // tile * cols
+        for col in range(cols):
+            sums[base + col] = zlib.crc32(row[col * span:(col + 1) * span], sums[base + col])
+    return sums
+
+
+class Delta:
+    """Result of compute(): full frame or changed boxes (screen coordinates)."""
+
+    def __init__(self, full, boxes, changed, reason=None, signatures=None, stored=None):
+        self.full = full
+        self.boxes = boxes
+        self.changed = changed
+        self.reason = reason
+        self.signatures = signatures
+        self.stored = stored
+
+    def __repr__(self):
+        if self.full:
+            return f"<Delta full ({self.reason})>"
+        return f"<Delta {len(self.boxes)} boxes, {self.changed:.1%} changed>"
+
+    @property
+    def unchanged(self):
+        return not self.full and not self.boxes
+
+
+def tile_boxes(changed, cols, frame, tile=TILE):
+    """Bounding boxes (screen coordinates) of connected groups of changed tile indices."""
+    pending = set(changed)
+    boxes = []
+    while pending:
+        start = pending.pop()
+        queue = deque([start])
+        top = bottom = start // cols
+        left = right = start % cols
+        while queue:
+            index = queue.popleft()
+            row, col = divmod(index, cols)
+            top, bottom = min(top, row), max(bottom, row)
+            left, right = min(left, col), max(right, col)
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    r, c = row + dr, col + dc
+                    if 0 <= c < cols and r >= 0 and r * cols + c in pending:
+                        pending.discard(r * cols + c)
+                        queue.append(r * cols + c)
+        boxes.append([left * tile, top * tile, min((right + 1) * tile, frame.width),
+                      min((bottom + 1) * tile, frame.height)])
+    # Groups whose boxes overlap become one box
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    boxes[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    boxes.sort(key=lambda box: (box[1], box[0]))
+    return [(frame.left + l, frame.top + t, frame.left + r, frame.top + b) for l, t, r, b in boxes]
+
+
+def compute(frame, tile=TILE, full_above=FULL_ABOVE, update=True):
+    """Delta of frame against the previous delta capture of the same rectangle.
+
+    The new signatures replace the stored ones; with update=False they
+    are only kept in the result (with the loaded DELTA_FILE as .stored),
+    for commit() after the files are saved.
+    """
+    current = signatures(frame, tile)
+    stored = state.load_json(DELTA_FILE, {}) or {}
+    previous = stored.get(target_key(frame))
+    delta = _compare(previous, current, frame, tile, full_above)
+    if update:
+        commit(frame, current, tile, stored)
+    delta.signatures = current
+    delta.stored = stored
+    return delta
+
+
+def target_key(frame):
+    return ','.join(str(n) for n in frame.rect)
+
+
+def pack(values):
+    return base64.b64encode(array('I', values).tobytes()).decode('ascii')
+
+
+def unpack(text):
+    values = array('I')
+    values.frombytes(base64.b64decode(text))
+    return values
+
+
+def commit(frame, current, tile=TILE, stored=None):
+    """Store current (signatures of frame) as the previous capture of its rectangle.
+
+    stored is DELTA_FILE as compute() loaded it (read again if None).
+    """
+    if stored is None:
+        stored = state.load_json(DELTA_FILE, {}) or {}
+    key = target_key(frame)
+    stored.pop(key, None)
+    stored[key] = {'method': method(), 'tile': tile, 'packed': pack(current)}
+    for old in list(stored)[:-KEEP_TARGETS]:
+        del stored[old]
+    state.save_json(DELTA_FILE, stored)
+
+
+def _compare(previous, current, frame, tile, full_above):
+    old = None
+    if previous and previous.get('method') == method() and previous.get('tile') == tile:
+        try:
+            old = unpack(previous.get('packed', ''))
+        except (TypeError, ValueError):
+            old = None
+    if old is None or len(old) != len(current):
+        return Delta(True, [], 1.0, 'no previous capture of this area')
+    changed = [i for i, (a, b) in enumerate(zip(old, current)) if a != b]
+    fraction = len(changed) / len(current)
+    if fraction > full_above:
+        return Delta(True, [], fraction, f"{fraction:.0%} of the area changed")
+    boxes = tile_boxes(changed, -(-frame.width // tile), frame, tile)
+    if len(boxes) > MAX_REGIONS:
+        return Delta(True, [], fraction, f"{len(boxes)} separate changes")
+    return Delta(False, boxes, fraction)
@@ -0,0 +1,167 @@
+"""
+Screenshot encoding - format, quality and a resolution chosen for the reader
+
+A model looking at a screenshot downsamples large images anyway, so
+sending it a full 2560x1440 frame costs encode time, disk and upload for
+pixels it never sees. encode() takes a captured Frame and
+
+- scales it down first, to max_edge pixels on the longer side, or to
+  whatever resolution fits target_bytes (sized from one trial encode,
+  at most a few retries)
+- encodes JPEG, PNG or WebP with the given quality; optimize (an extra
+  Huffman/zlib pass that saves a few percent for a lot of CPU) is off
+  unless asked for
+
+and reports the scale it used: image coordinates divided by `scale`
+(plus the frame origin) are screen coordinates.
+
+Encoding needs Pillow, except PNG: without Pillow a plain zlib PNG
+encoder is used, scaling down by whole steps only.
+
+Encoder runs encode() on its own thread, so the caller can capture or
+clean up meanwhile (Pillow releases the GIL while resizing and encoding).
+The frame's pixels are copied before the hand-off, since capture buffers
+are reused.
+"""
+import math
+import time
+import zlib
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+FORMATS = ('jpeg', 'png', 'webp')
+EXTENSIONS = {'jpeg': 'jpg', 'png': 'png', 'webp': 'webp'}
+DEFAULT_QUALITY = 85
+# Retries when a target_bytes encode comes out too large
+TARGET_ATTEMPTS = 4
+
+
+class Encoded:
+    """An encoded image: bytes, format, pixel size and the scale from the frame."""
+
+    __slots__ = ('data', 'format', 'width', 'height', 'scale', 'ms')
+
+    def __init__(self, data, format, width, height, scale, ms=0.0):
+        self.data = data
+        self.format = format
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.ms = ms
+
+    def __repr__(self):
+        return f"<Encoded {self.format} {self.width}x{self.height} {len(self.data)} bytes>"
+
+    @property
+    def extension(self):
+        return EXTENSIONS[self.format]
+
+
+def scale_for(width, height, max_edge=None):
+    """Scale (<= 1) that fits the longer edge into max_edge."""
+    if not max_edge or max(width, height) <= max_edge:
+        return 1.0
+    return max_edge / max(width, height)
+
+
+def png_bytes(frame, step=1, level=6):
+    """PNG (RGB, 8 bit) of a frame, keeping every step-th pixel and row; no Pillow needed."""
+    width, height = -(-frame.width // step), -(-frame.height // step)
+    bgrx = bytearray()
+    for y in range(0, frame.height, step):
+        row = frame.row(y)
+        bgrx += row if step == 1 else row.cast('I')[::step].tobytes()
+    rgb = bytearray(width * height * 3)
+    rgb[0::3], rgb[1::3], rgb[2::3] = bgrx[2::4], bgrx[1::4], bgrx[0::4]
+    line = width * 3
+    raw = b''.join(b'\x00' + rgb[y * line:(y + 1) * line] for y in range(height))
+
+    def chunk(kind, body):
+        return (struct.pack('>I', len(body)) + kind + body
+                + struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw, level)) + chunk(b'IEND', b'')), width, height
+
+
+def _encode_once(source, format, quality, optimize, scale):
+    """(bytes, width, height) of source (PIL image or Frame) at scale."""
+    if not HAS_PIL:
+        if format != 'png':
+            raise ImportError(f"{format.upper()} encoding needs Pillow (pip install Pillow); "
+                              "PNG works without it")
+        step = max(1, math.ceil(1 / scale - 1e-9))
+        return png_bytes(source, step, 9 if optimize else 6)
+    import io
+    image = source
+    if scale < 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+    out = io.BytesIO()
+    if format == 'jpeg':
+        image.save(out, format='JPEG', quality=quality, optimize=optimize)
+    elif format == 'webp':
+        image.save(out, format='WEBP', quality=quality, method=6 if optimize else 2)
+    else:
+        image.save(out, format='PNG', optimize=optimize, compress_level=9 if optimize else 6)
+    return out.getvalue(), image.width, image.height
+
+
+def prepare(frame):
+    """What encode() works from: a PIL image (pixels converted), or a copied Frame."""
+    return frame.to_image() if HAS_PIL else frame.copy()
+
+
+def encode(frame, format='jpeg', quality=DEFAULT_QUALITY, optimize=False, max_edge=None,
+           target_bytes=None, prepared=None):
+    """Encoded image of a Frame (see module docstring); prepared skips prepare()."""
+    format = format.lower().replace('jpg', 'jpeg')
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format '{format}' (choose from {', '.join(FORMATS)})")
+    start = time.perf_counter()
+    source = prepared if prepared is not None else prepare(frame)
+    scale = scale_for(frame.width, frame.height, max_edge)
+    for _ in range(TARGET_ATTEMPTS):
+        data, width, height = _encode_once(source, format, quality, optimize, scale)
+        if not target_bytes or len(data) <= target_bytes or width <= 16:
+            break
+        # Size grows roughly with the pixel count
+        scale *= max(0.3, min(0.9, 0.95 * math.sqrt(target_bytes / len(data))))
+    return Encoded(data, format, width, height, width / frame.width,
+                   (time.perf_counter() - start) * 1000)
+
+
+class Encoder:
+    """Runs encode() on one background thread; submit() returns a Future of Encoded."""
+
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='encode')
+
+    def submit(self, frame, **options):
+        # Copy/convert now: the frame's buffer is reused by the next grab
+        prepared = prepare(frame)
+        return self.pool.submit(encode, frame, prepared=prepared, **options)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder():
+    """Process-wide Encoder (its thread lives as long as the process, e.g. the daemon)."""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = Encoder()
+        return _encoder
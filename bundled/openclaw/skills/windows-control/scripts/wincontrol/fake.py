@@ -0,0 +1,623 @@
+"""
+Fake desktop backend - an in-memory UI tree with the pywinauto wrapper surface
+
+Every method that would be a cross-process UIA call on Windows is counted in
+FakeBackend.calls, so callers can check how many round trips an operation
+costs. Actions (clicks, typing, window state changes) are recorded in
+FakeBackend.actions instead of touching a real screen. Tree changes made
+through the fake (windows added/removed, text typed) are delivered to
+subscribe() callbacks, like UIA events.
+
+Tree JSON format:
+    {"windows": [
+        {"name": "Untitled - Notepad", "type": "Window", "class": "Notepad",
+         "process": "notepad.exe", "rect": [0, 0, 800, 600],
+         "children": [{"name": "Save", "type": "Button", "rect": [...]}]}
+    ]}
+An element with "focused": true starts with keyboard focus.
+"""
+import json
+import time
+import itertools
+from collections import Counter
+
+
+class Rect:
+    """Same shape as pywinauto's RECT."""
+
+    def __init__(self, left, top, right, bottom):
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+
+    def width(self):
+        return self.right - self.left
+
+    def height(self):
+        return self.bottom - self.top
+
+    def mid_point(self):
+        return ((self.left + self.right) // 2, (self.top + self.bottom) // 2)
+
+    def __repr__(self):
+        return f"(L{self.left}, T{self.top}, R{self.right}, B{self.bottom})"
+
+
+class FakeElementInfo:
+    """Mirror of pywinauto's UIAElementInfo; every property read is a call."""
+
+    def __init__(self, element):
+        self._element = element
+
+    def _count(self, name):
+        self._element.backend._call(f"element_info.{name}", self._element)
+
+    @property
+    def control_type(self):
+        self._count('control_type')
+        return self._element.control_type
+
+    @property
+    def class_name(self):
+        self._count('class_name')
+        return self._element.class_name
+
+    @property
+    def automation_id(self):
+        self._count('automation_id')
+        return self._element.automation_id
+
+    @property
+    def process_id(self):
+        self._count('process_id')
+        return self._element.process_id
+
+    @property
+    def runtime_id(self):
+        self._count('runtime_id')
+        return self._element.runtime_id
+
+    @property
+    def handle(self):
+        self._count('handle')
+        return self._element.handle
+
+    @property
+    def name(self):
+        self._count('name')
+        return self._element.name
+
+
+class FakeElement:
+    """One node of the fake UI tree, exposing the UIAWrapper methods the scripts use."""
+
+    def __init__(self, backend, name='', control_type='Pane', rect=(0, 0, 0, 0),
+                 class_name='', automation_id='', enabled=True, value=None,
+                 toggle_state=None, process_id=0, handle=0, delay=0.0):
+        self.backend = backend
+        self.name = name
+        self.control_type = control_type
+        self.rect = tuple(rect)
+        self.class_name = class_name
+        self.automation_id = automation_id
+        self.enabled = enabled
+        self.value = value
+        self.toggle_state = toggle_state
+        self.process_id = process_id
+        self.handle = handle
+        self.delay = delay
+        self.runtime_id = ()
+        self.parent_element = None
+        self.child_elements = []
+        self.visible = True
+        self.minimized = False
+        self.maximized = False
+        self.focused = False
+        self.element_info = FakeElementInfo(self)
+
+    def __repr__(self):
+        return f"<FakeElement {self.control_type} {self.name!r}>"
+
+    # --- tree structure -------------------------------------------------
+
+    def add(self, child):
+        child.parent_element = self
+        child.process_id = self.process_id
+        self.child_elements.append(child)
+        self.backend._assign_runtime_id(child, self)
+        return child
+
+    def iter_subtree(self):
+        """Depth-first walk of descendants without counting calls (backend-internal)."""
+        stack = list(reversed(self.child_elements))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.child_elements))
+
+    def top_level(self):
+        node = self
+        while node.parent_element is not None:
+            node = node.parent_element
+        return node
+
+    def attached(self):
+        """Still part of a live window (not removed from its parent or closed)."""
+        node = self
+        while node.parent_element is not None:
+            if node not in node.parent_element.child_elements:
+                return False
+            node = node.parent_element
+        return node in self.backend.top_windows
+
+    def remove(self, child):
+        """Detach child (and its subtree) from the tree."""
+        self.child_elements.remove(child)
+        self.backend.notify(self)
+
+    def prop(self, name):
+        """Uncounted property read used by the batched snapshot path."""
+        return getattr(self, name)
+
+    # --- pywinauto wrapper surface (each is one "cross-process" call) ---
+
+    def window_text(self):
+        self.backend._call('window_text', self)
+        return self.name
+
+    def rectangle(self):
+        self.backend._call('rectangle', self)
+        return Rect(*self.rect)
+
+    def is_enabled(self):
+        self.backend._call('is_enabled', self)
+        return self.enabled
+
+    def is_visible(self):
+        self.backend._call('is_visible', self)
+        return self.visible
+
+    def is_minimized(self):
+        self.backend._call('is_minimized', self)
+        return self.minimized
+
+    def is_maximized(self):
+        self.backend._call('is_maximized', self)
+        return self.maximized
+
+    def children(self):
+        self.backend._call('children', self)
+        return list(self.child_elements)
+
+    def descendants(self):
+        self.backend._call('descendants', self)
+        return list(self.iter_subtree())
+
+    def parent(self):
+        self.backend._call('parent', self)
+        return self.parent_element
+
+    def get_value(self):
+        self.backend._call('get_value', self)
+        return self.value if self.value is not None else self.name
+
+    def get_toggle_state(self):
+        self.backend._call('get_toggle_state', self)
+        return self.toggle_state or 0
+
+    def click(self):
+        self.backend._call('click', self)
+        self.backend._record('click', self.name)
+
+    def click_input(self, **kwargs):
+        self.backend._call('click_input', self)
+        self.backend._record('click', self.name)
+
+    def set_focus(self):
+        self.backend._call('set_focus', self)
+        self.backend.focus(self)
+        return self
+
+    def type_keys(self, keys, **kwargs):
+        self.backend._call('type_keys', self)
+        self.backend._record('type_keys', self.name, keys)
+        if self.control_type in ('Edit', 'ComboBox', 'Document'):
+            self.value = (self.value or '') + keys
+            self.backend.notify(self)
+
+    def close(self):
+        self.backend._call('close', self)
+        self.backend._record('close', self.name)
+        self.backend.remove_window(self)
+
+    def maximize(self):
+        self.backend._call('maximize', self)
+        self.backend._record('maximize', self.name)
+        self.maximized, self.minimized = True, False
+
+    def minimize(self):
+        self.backend._call('minimize', self)
+        self.backend._record('minimize', self.name)
+        self.minimized = True
+
+    def restore(self):
+        self.backend._call('restore', self)
+        self.backend._record('restore', self.name)
+        self.minimized = self.maximized = False
+
+
+class FakeInput:
+    """pyautogui stand-in that records actions on the backend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.position = (0, 0)
+
+    def click(self, x=None, y=None, clicks=1, button='left', **kwargs):
+        if x is not None:
+            self.position = (x, y)
+        self.backend._record('mouse_click', self.position, button, clicks)
+
+    def moveTo(self, x, y, duration=0.0, **kwargs):
+        self.position = (x, y)
+        self.backend._record('mouse_move', self.position)
+
+    def drag(self, dx, dy, duration=0.0, button='left', **kwargs):
+        start = self.position
+        self.position = (start[0] + dx, start[1] + dy)
+        self.backend._record('mouse_drag', start, self.position, button)
+
+    def scroll(self, clicks, **kwargs):
+        self.backend._record('scroll', clicks)
+
+    def write(self, text, interval=0.0):
+        self.backend._record('write', text)
+        focused = self.backend.focused_element
+        if focused is not None and focused.control_type in ('Edit', 'ComboBox', 'Document'):
+            focused.value = (focused.value or '') + text
+            self.backend.notify(focused)
+
+    def press(self, key):
+        self.backend._record('press', key)
+
+    def hotkey(self, *keys):
+        self.backend._record('hotkey', '+'.join(keys))
+
+
+class FakeSubscription:
+    """Mirror of UIAEventSubscription: callback on any change, plus per-window callbacks."""
+
+    def __init__(self, backend, callback):
+        self.backend = backend
+        self.callback = callback
+        self.watched = set()
+        self.window_callbacks = {}
+
+    def watch(self, window, callback=None):
+        if window.handle not in self.watched:
+            self.backend._call('AddStructureChangedEventHandler', window)
+            self.watched.add(window.handle)
+            if callback is not None:
+                self.window_callbacks[window.handle] = callback
+
+    def close(self):
+        if self in self.backend._subscriptions:
+            self.backend._subscriptions.remove(self)
+
+
+class FakeBackend:
+    """In-memory desktop implementing the UIABackend surface."""
+
+    name = 'fake'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.top_windows = []
+        self.calls = Counter()
+        self.actions = []
+        self.focused_element = None
+        self._input = FakeInput(self)
+        self._hwnds = itertools.count(0x10010, 0x10)
+        self._pids = {}
+        self._runtime_ids = itertools.count(1)
+        self._subscriptions = []
+
+    # --- construction ---------------------------------------------------
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build from a WINCONTROL_BACKEND value: 'fake' or 'fake:<tree.json>'."""
+        _, _, path = spec.partition(':')
+        backend = cls()
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                backend.load(json.load(f))
+        else:
+            backend.load(DEMO_TREE)
+        return backend
+
+    def load(self, tree):
+        for spec in tree.get('windows', []):
+            self.add_window(spec)
+        return self
+
+    def add_window(self, spec, index=None):
+        """Add a top-level window from a dict spec (see module docstring)."""
+        process = spec.get('process', 'app.exe')
+        pid = self._pids.setdefault(process, 1000 + 4 * len(self._pids))
+        window = FakeElement(
+            self, name=spec.get('name', ''), control_type=spec.get('type', 'Window'),
+            rect=spec.get('rect', (0, 0, 800, 600)), class_name=spec.get('class', ''),
+            automation_id=spec.get('automation_id', ''), process_id=pid,
+            handle=spec.get('handle') or next(self._hwnds), delay=spec.get('delay', 0.0))
+        window.process_name = process
+        window.runtime_id = (42, window.handle)
+        for child in spec.get('children', []):
+            self._build(window, child)
+        if index is None:
+            self.top_windows.append(window)
+        else:
+            self.top_windows.insert(index, window)
+        self.notify()
+        return window
+
+    def _build(self, parent, spec):
+        element = FakeElement(
+            self, name=spec.get('name', ''), control_type=spec.get('type', 'Pane'),
+            rect=spec.get('rect', parent.rect), class_name=spec.get('class', ''),
+            automation_id=spec.get('automation_id', ''), enabled=spec.get('enabled', True),
+            value=spec.get('value'), toggle_state=spec.get('toggle_state'),
+            delay=spec.get('delay', 0.0))
+        parent.add(element)
+        if spec.get('focused'):
+            self.focus(element)
+        for child in spec.get('children', []):
+            self._build(element, child)
+        return element
+
+    def _assign_runtime_id(self, element, parent):
+        top = parent.top_level()
+        element.runtime_id = (42, top.handle, 4, next(self._runtime_ids))
+
+    def remove_window(self, window):
+        if window in self.top_windows:
+            self.top_windows.remove(window)
+            self.notify()
+
+    def focus(self, element):
+        if self.focused_element is not None:
+            self.focused_element.focused = False
+        self.focused_element = element
+        element.focused = True
+        top = element.top_level()
+        if top in self.top_windows:
+            self.top_windows.remove(top)
+            self.top_windows.insert(0, top)
+
+    # --- bookkeeping ----------------------------------------------------
+
+    def _call(self, name, element=None):
+        self.calls[name] += 1
+        delay = self.latency + (element.delay if element is not None else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def _record(self, *action):
+        self.actions.append(action)
+
+    def notify(self, element=None):
+        """Deliver a change event to every subscriber (call after editing the tree).
+
+        Per-window callbacks run for the window containing element, or for
+        every window if element is None.
+        """
+        hwnd = element.top_level().handle if element is not None else None
+        for subscription in list(self._subscriptions):
+            subscription.callback()
+            for handle, callback in list(subscription.window_callbacks.items()):
+                if hwnd is None or handle == hwnd:
+                    callback()
+
+    def reset_counters(self):
+        self.calls.clear()
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    # --- backend surface ------------------------------------------------
+
+    def windows(self):
+        self._call('windows')
+        return list(self.top_windows)
+
+    def active_window(self):
+        self._call('active_window')
+        return self.top_windows[0] if self.top_windows else None
+
+    def active_title(self):
+        window = self.active_window()
+        return window.name if window else None
+
+    def input(self):
+        return self._input
+
+    # Win32-level queries, counted separately from UIA calls
+    def _by_handle(self, hwnd):
+        for window in self.top_windows:
+            if window.handle == hwnd:
+                return window
+        return None
+
+    def top_level_handles(self):
+        self._call('win32.EnumWindows')
+        return [w.handle for w in self.top_windows if w.visible]
+
+    def window_title(self, hwnd):
+        self._call('win32.GetWindowText')
+        window = self._by_handle(hwnd)
+        return window.name if window else ''
+
+    def window_class(self, hwnd):
+        self._call('win32.GetClassName')
+        window = self._by_handle(hwnd)
+        return window.class_name if window else ''
+
+    def window_pid(self, hwnd):
+        self._call('win32.GetWindowThreadProcessId')
+        window = self._by_handle(hwnd)
+        return window.process_id if window else 0
+
+    def window_rect(self, hwnd):
+        self._call('win32.GetWindowRect')
+        window = self._by_handle(hwnd)
+        return tuple(window.rect) if window else None
+
+    def is_alive(self, hwnd):
+        self._call('win32.IsWindow')
+        return self._by_handle(hwnd) is not None
+
+    def process_name(self, pid):
+        self._call('win32.QueryFullProcessImageName')
+        for name, known in self._pids.items():
+            if known == pid:
+                return name
+        return ''
+
+    def wrap_element(self, element):
+        return element
+
+    def snapshot(self, window, props, builder=None):
+        """One batched call for the whole subtree, like a UIA CacheRequest."""
+        from .snapshot import NodeBuilder
+        builder = NodeBuilder() if builder is None else builder
+        self._call('BuildUpdatedCache', window)
+        stack = [(child, 1, -1) for child in reversed(window.child_elements)]
+        while stack:
+            element, depth, parent = stack.pop()
+            if element.delay:
+                time.sleep(element.delay)
+            index = builder.add(depth, parent, element, {prop: element.prop(prop) for prop in props})
+            stack.extend((child, depth + 1, index) for child in reversed(element.child_elements))
+        return builder.result()
+
+    def children(self, window, props, element=None):
+        """Direct children with props in one call, like FindAllBuildCache(TreeScope_Children)."""
+        parent = window if element is None else element
+        self._call('FindAllBuildCache', parent)
+        return [(child, {prop: child.prop(prop) for prop in props})
+                for child in parent.child_elements]
+
+    def refresh(self, element, props):
+        """Current props of a known element in one call, or None if it is gone."""
+        self._call('BuildUpdatedCache', element)
+        if not element.attached():
+            return None
+        return {prop: element.prop(prop) for prop in props}
+
+    def focused(self, props, ancestors=True):
+        """Focused element and its ancestors, like GetFocusedElementBuildCache + parent walk."""
+        self._call('GetFocusedElementBuildCache')
+        element = self.focused_element
+        if element is None or not element.attached():
+            return []
+        chain = [(element, {prop: element.prop(prop) for prop in props})]
+        while ancestors and element.parent_element is not None:
+            element = element.parent_element
+            self._call('GetParentElementBuildCache', element)
+            chain.append((element, {prop: element.prop(prop) for prop in props}))
+        return chain
+
+    def locate(self, window, runtime_id, props):
+        """Descendant with runtime_id in one call, like FindFirstBuildCache."""
+        self._call('FindFirstBuildCache', window)
+        for element in window.iter_subtree():
+            if element.runtime_id == tuple(runtime_id):
+                return element, {prop: element.prop(prop) for prop in props}
+        return None
+
+    def find_all(self, window, props, control_types=None, name=None, ignore_case=False):
+        """Provider-side filter in one call, like FindAllBuildCache."""
+        from .snapshot import Node
+        self._call('FindAllBuildCache', window)
+        name_key = name.lower() if name is not None and ignore_case else name
+        nodes = []
+        for element in window.iter_subtree():
+            if control_types and element.control_type not in control_types:
+                continue
+            if name is not None:
+                candidate = element.name.lower() if ignore_case else element.name
+                if candidate != name_key:
+                    continue
+            nodes.append(Node(element=element, **{prop: element.prop(prop) for prop in props}))
+        return nodes
+
+    def subscribe(self, callback):
+        """Event subscription; callback() runs on every tree change."""
+        self._call('AddAutomationEventHandler')
+        subscription = FakeSubscription(self, callback)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def wrap(self, hwnd):
+        self._call('ElementFromHandle')
+        window = self._by_handle(hwnd)
+        if window is None:
+            raise LookupError(f"No window with handle {hwnd:#x}")
+        return window
+
+
+def synthetic_tree(windows=3, depth=4, fanout=5, seed_names=None):
+    """Generate a large regular tree spec for benchmarks (fanout ** depth nodes per window)."""
+    types = ['Pane', 'Group', 'Button', 'Text', 'Hyperlink', 'ListItem', 'Edit', 'MenuItem']
+    seed_names = seed_names or ['Open', 'Save', 'Cancel', 'Help', 'Settings', 'Search']
+    counter = itertools.count()
+
+    def node(level, left, top):
+        n = next(counter)
+        ctrl_type = types[n % len(types)] if level < depth else types[2 + n % (len(types) - 2)]
+        spec = {'name': f"{seed_names[n % len(seed_names)]} {n}", 'type': ctrl_type,
+                'rect': [left, top, left + 40, top + 20]}
+        if level < depth:
+            spec['children'] = [node(level + 1, left + 10 * i, top + 20 * level) for i in range(fanout)]
+        return spec
+
+    return {'windows': [
+        {'name': f"Synthetic Window {w}", 'process': f"app{w}.exe", 'rect': [0, 0, 1920, 1080],
+         'children': [node(1, 10 * i, 0) for i in range(fanout)]}
+        for w in range(windows)
+    ]}
+
+
+DEMO_TREE = {'windows': [
+    {'name': 'Untitled - Notepad', 'class': 'Notepad', 'process': 'notepad.exe',
+     'rect': [100, 100, 900, 700], 'children': [
+        {'name': 'Application', 'type': 'MenuBar', 'rect': [108, 131, 892, 150], 'children': [
+            {'name': 'File', 'type': 'MenuItem', 'rect': [108, 131, 140, 150]},
+            {'name': 'Edit', 'type': 'MenuItem', 'rect': [140, 131, 172, 150]},
+            {'name': 'Help', 'type': 'MenuItem', 'rect': [172, 131, 210, 150]},
+        ]},
+        {'name': 'Text Editor', 'type': 'Edit', 'rect': [108, 150, 892, 670], 'value': '',
+         'focused': True},
+        {'name': 'Ln 1, Col 1', 'type': 'Text', 'rect': [700, 672, 800, 692]},
+    ]},
+    {'name': 'Save As', 'type': 'Window', 'class': '#32770', 'process': 'notepad.exe',
+     'rect': [300, 200, 800, 550], 'children': [
+        {'name': 'Where do you want to save?', 'type': 'Text', 'rect': [320, 220, 780, 240]},
+        {'name': 'File name:', 'type': 'Edit', 'rect': [400, 460, 780, 480], 'value': '*.txt'},
+        {'name': 'Save', 'type': 'Button', 'rect': [600, 510, 680, 535]},
+        {'name': 'Cancel', 'type': 'Button', 'rect': [690, 510, 770, 535]},
+    ]},
+    {'name': 'Example Domain - Google Chrome', 'class': 'Chrome_WidgetWin_1', 'process': 'chrome.exe',
+     'rect': [0, 0, 1280, 800], 'children': [
+        {'name': 'Example Domain', 'type': 'Document', 'rect': [0, 80, 1280, 800], 'children': [
+            {'name': 'Example Domain', 'type': 'Text', 'rect': [100, 120, 400, 160]},
+            {'name': 'This domain is for use in illustrative examples.', 'type': 'Text',
+             'rect': [100, 180, 900, 200]},
+            {'name': 'More information...', 'type': 'Hyperlink', 'automation_id': 'https://www.iana.org/',
+             'rect': [100, 220, 260, 240]},
+            {'name': 'Sign in', 'type': 'Button', 'rect': [1100, 90, 1180, 115]},
+        ]},
+    ]},
+]}
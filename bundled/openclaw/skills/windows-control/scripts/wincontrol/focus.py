@@ -0,0 +1,74 @@
+"""
+Focused element - what has keyboard focus, read straight from UI Automation
+
+Finding the focused control by walking a window's descendants reads the
+whole tree. focused() asks UI Automation for the focus itself (one
+GetFocusedElementBuildCache call, properties included) and climbs its
+parents up to the top-level window, one call per level: O(depth) instead
+of O(tree).
+
+Typing uses it to confirm where keys will land before sending them
+(type_text.py --expect, handle_dialog.py type).
+"""
+from .backend import get_backend
+from .deadline import call_timeout, call_with_timeout
+from .snapshot import BASIC, Node
+
+# Read for the focus and each ancestor (name, type, value, rect; runtime id for ids)
+FOCUS_PROPS = BASIC + ('value', 'runtime_id')
+# Controls that take typed text
+TEXT_INPUT_TYPES = ('Edit', 'ComboBox', 'Document')
+
+
+def label(node):
+    """Short text for a node, e.g. Edit 'File name:' (just the type if unnamed)."""
+    name = (node.name or '').strip()
+    if len(name) > 40:
+        # Text controls report their content as name
+        name = name[:37] + '...'
+    return f"{node.control_type} '{name}'" if name else node.control_type
+
+
+class Focus:
+    """The focused node, its ancestors (innermost first, top-level window last) and window."""
+
+    def __init__(self, node, ancestors, window):
+        self.node = node
+        self.ancestors = ancestors
+        self.window = window
+
+    def __repr__(self):
+        return f"<Focus {label(self.node)}>"
+
+    @property
+    def name(self):
+        return (self.node.name or '').strip()
+
+    @property
+    def accepts_text(self):
+        return self.node.control_type in TEXT_INPUT_TYPES and self.node.enabled is not False
+
+    def in_window(self, window):
+        """Whether the focus is inside window (or is window)."""
+        return self.window is not None and self.window.handle == window.handle
+
+    def path(self):
+        """Breadcrumb from the top-level window down to the focus."""
+        return ' > '.join(label(node) for node in reversed([self.node] + self.ancestors))
+
+
+def focused(props=FOCUS_PROPS, ancestors=True, backend=None):
+    """Focus for the current keyboard focus, or None if nothing has it.
+
+    With ancestors=False only the focused element is read (one call) and
+    window is None.
+    """
+    backend = backend or get_backend()
+    chain = call_with_timeout(backend.focused, call_timeout(), tuple(props), ancestors)
+    if not chain:
+        return None
+    top = len(chain) - 1
+    nodes = [Node(depth=top - i, element=element, **values)
+             for i, (element, values) in enumerate(chain)]
+    window = backend.wrap_element(chain[-1][0]) if ancestors else None
+    return Focus(nodes[0], nodes[1:], window)
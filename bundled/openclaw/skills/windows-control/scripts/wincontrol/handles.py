@@ -0,0 +1,158 @@
+"""
+Element handles - stable ids so a follow-up call can act without re-searching
+
+Read and list output tags every element with an id made of the window
+handle and the element's UIA runtime id ("197634:42.197634.4.17"). Passing
+that id back (click_element.py --id, find_text.py --id, handle_dialog.py
+click/type --id) resolves it directly:
+
+    1. cached   the element reference kept from the read (daemon process),
+                validated with one call that re-reads its runtime id
+    2. located  one provider-side FindFirst on the runtime id
+    3. re-searched
+                the element is gone (runtime ids change when a control is
+                re-created): search the window once for the name and type
+                recorded with the id
+
+If the window itself is gone the id is dead and resolve() says so.
+
+The name/type records behind step 3 are kept in handles.json (the newest
+MAX_STORED). remember() only queues records the file does not have yet;
+flush() writes them once per command (client.run and the daemon call it
+after main()), and skips the write when nothing new was handed out.
+"""
+from collections import OrderedDict
+from .backend import get_backend
+from .deadline import call_timeout, call_with_timeout
+from .snapshot import BASIC, Node
+from . import state
+
+HANDLES_FILE = 'handles.json'
+# Element references kept in-process (useful inside the daemon)
+MAX_KNOWN = 5000
+# Name/type records kept on disk for the re-search fallback
+MAX_STORED = 2000
+
+_known = OrderedDict()
+# Records remember() queued for handles.json, and the ones already there
+_pending = OrderedDict()
+_stored = {}
+
+
+def element_id(window, node):
+    """Handle for a captured node (needs 'runtime_id'), or None."""
+    if not node.runtime_id:
+        return None
+    return f"{window.handle}:{'.'.join(str(part) for part in node.runtime_id)}"
+
+
+def parse_id(handle):
+    """(hwnd, runtime_id) from a handle; ValueError if malformed."""
+    hwnd, sep, runtime = handle.strip().partition(':')
+    try:
+        if not sep or not runtime:
+            raise ValueError
+        return int(hwnd), tuple(int(part) for part in runtime.split('.'))
+    except ValueError:
+        raise ValueError(f"Invalid element id '{handle}' (expected HWND:RUNTIME.ID)")
+
+
+def remember(window, nodes):
+    """Record the nodes handed out in output so their ids can be resolved later.
+
+    Returns {id: node} for the nodes that have one.
+    """
+    ids = {}
+    for node in nodes:
+        handle = element_id(window, node)
+        if handle is None:
+            continue
+        ids[handle] = node
+        if node.element is not None:
+            _known[handle] = node.element
+            _known.move_to_end(handle)
+    while len(_known) > MAX_KNOWN:
+        _known.popitem(last=False)
+    for handle, node in ids.items():
+        record = [(node.name or '').strip(), node.control_type]
+        if _stored.get(handle) != record:
+            _pending[handle] = record
+    return ids
+
+
+def flush():
+    """Write the records queued by remember() to handles.json, if any are new."""
+    if not _pending:
+        return
+    stored = state.load_json(HANDLES_FILE, {}) or {}
+    new = {h: r for h, r in _pending.items() if stored.get(h) != r}
+    _pending.clear()
+    if new:
+        for handle, record in new.items():
+            stored.pop(handle, None)
+            stored[handle] = record
+        stored = dict(list(stored.items())[-MAX_STORED:])
+        try:
+            state.save_json(HANDLES_FILE, stored)
+        except OSError:
+            return
+    _stored.clear()
+    _stored.update(stored)
+
+
+def record(handle):
+    """[name, control type] remembered for a handle, or None."""
+    if handle in _pending:
+        return _pending[handle]
+    return (state.load_json(HANDLES_FILE, {}) or {}).get(handle)
+
+
+class Resolved:
+    """A resolved handle: node, window, how it was found and its current id."""
+
+    def __init__(self, node, window, how, handle):
+        self.node = node
+        self.window = window
+        self.how = how
+        self.id = handle
+
+    @property
+    def name(self):
+        return (self.node.name or '').strip()
+
+
+def resolve(handle, props=BASIC, backend=None):
+    """Resolve a handle to a live element. Raises ValueError or LookupError."""
+    from .search import find_elements
+
+    backend = backend or get_backend()
+    hwnd, runtime_id = parse_id(handle)
+    props = tuple(props) + (() if 'runtime_id' in props else ('runtime_id',))
+    timeout = call_timeout()
+    if not backend.is_alive(hwnd):
+        raise LookupError(f"Element {handle} is gone: its window was closed")
+    window = backend.wrap(hwnd)
+
+    element = _known.get(handle)
+    if element is not None:
+        values = call_with_timeout(backend.refresh, timeout, element, props)
+        if values is not None and tuple(values.get('runtime_id') or ()) == runtime_id:
+            return Resolved(Node(element=element, **values), window, 'cached', handle)
+        _known.pop(handle, None)
+
+    found = call_with_timeout(backend.locate, timeout, window, runtime_id, props)
+    if found is not None:
+        element, values = found
+        _known[handle] = element
+        return Resolved(Node(element=element, **values), window, 'located', handle)
+
+    recorded = record(handle)
+    if recorded and recorded[0]:
+        name, control_type = recorded
+        nodes = find_elements(window, name, control_types=[control_type] if control_type else None,
+                              mode='exact', props=props, backend=backend)
+        if nodes:
+            node = nodes[0]
+            remember(window, [node])
+            return Resolved(node, window, 're-searched', element_id(window, node))
+    raise LookupError(f"Element {handle} is gone and no replacement was found")
@@ -0,0 +1,279 @@
+"""
+Name index - normalized, n-gram scored lookup of element names
+
+Names are compared after NFKC normalization and case folding, with runs
+of whitespace collapsed and spaces next to CJK characters dropped, so
+full-width and half-width forms ("ＯＫ" and "OK", "（O）" and "(O)"),
+case and spacing ("另存为 PDF" and "另存为pdf") all compare equal. That
+matters for Chinese UIs, where labels mix CJK text with Latin words and
+full-width punctuation.
+
+NameIndex wraps a fetched set of nodes. Building the index normalizes
+each distinct name once (however many nodes share it, and however many
+searches follow), which costs more than one linear pass: on a 37k-node
+window about 60 ms against 10 ms for a scan (bench names). So the first
+search() is a scan() (ASCII names that cannot contain the query are
+rejected with a plain lower(), without normalizing them), and the index
+is only built when the same nodes are searched again: a cached index in
+the daemon or a batch, or search_many() with several queries. Either
+way search() ranks names into tiers
+
+    exact, iexact (equal after normalization), prefix, substring
+
+and with fuzzy=True adds a last fuzzy tier scored by n-gram overlap (Dice
+coefficient), so a typo ("Cancle") or a partly matching CJK label still
+yields candidates. The n-grams are bigrams of the padded text plus every
+CJK character on its own (one Chinese character already carries meaning);
+their postings are built on the first fuzzy search only, so plain
+substring lookups never pay for them. limit returns only the top k.
+
+search_many() answers several queries in one pass over the names: the
+normalized queries are compiled into an Aho-Corasick automaton
+(Automaton), and each name is scanned once for all of them.
+
+Indexes are kept with the window's other cached data (cache.py), so the
+daemon reuses them across commands while the window is unchanged.
+"""
+import heapq
+import re
+import unicodedata
+from collections import defaultdict, deque
+
+# Match quality, best first
+TIERS = ('exact', 'iexact', 'prefix', 'substring', 'fuzzy')
+EXACT, IEXACT, PREFIX, SUBSTRING, FUZZY = range(len(TIERS))
+
+# Minimum n-gram similarity for a fuzzy candidate
+FUZZY_THRESHOLD = 0.5
+
+# Han, kana, hangul (one character is a word-like unit)
+CJK_RANGES = ((0x3040, 0x30ff), (0x3400, 0x4dbf), (0x4e00, 0x9fff), (0xac00, 0xd7af),
+              (0xf900, 0xfaff), (0x20000, 0x2ffff))
+
+_CJK = ''.join(f"\\U{low:08x}-\\U{high:08x}" for low, high in CJK_RANGES)
+_CJK_CHAR = re.compile(f"[{_CJK}]")
+_CJK_SPACE = re.compile(f"(?<=[{_CJK}]) | (?=[{_CJK}])")
+
+
+def normalize(text):
+    """NFKC, case-folded text, whitespace collapsed and dropped around CJK ('' for None)."""
+    if not text:
+        return ''
+    if text.isascii():
+        return ' '.join(text.lower().split())
+    return _CJK_SPACE.sub('', ' '.join(unicodedata.normalize('NFKC', text).casefold().split()))
+
+
+def ngrams(text):
+    """N-grams of normalized text: padded bigrams plus single CJK characters."""
+    padded = f" {text} "
+    grams = {padded[i:i + 2] for i in range(len(padded) - 1)}
+    grams.update(_CJK_CHAR.findall(text))
+    return grams
+
+
+def name_tier(raw, normal, query_raw, query_normal):
+    """Tier of a name against a query, both given raw (stripped) and normalized."""
+    if raw == query_raw:
+        return EXACT
+    if normal == query_normal:
+        return IEXACT
+    if normal.startswith(query_normal):
+        return PREFIX
+    if query_normal in normal:
+        return SUBSTRING
+    return None
+
+
+class Automaton:
+    """Aho-Corasick automaton: which of several patterns occur in a text, in one scan."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for i, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                target = self.goto[state].get(char)
+                if target is None:
+                    target = self.goto[state][char] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = target
+            self.out[state] += (i,)
+        # Failure links, breadth first: the longest proper suffix that is also a prefix
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self.goto[state].items():
+                queue.append(target)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[target] = self.goto[fallback].get(char, 0)
+                self.out[target] += self.out[self.fail[target]]
+
+    def find(self, text):
+        """Indices of the patterns that occur in text."""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+def scan(nodes, query, fuzzy=False, limit=None, threshold=FUZZY_THRESHOLD):
+    """NameIndex.search() without an index: one pass over nodes, for a single query."""
+    query_normal = normalize(query)
+    if not query_normal:
+        return []
+    query_raw = query.strip()
+    # An ASCII name lower()ed misses the query only if normalize() would too,
+    # unless the query has spaces and the name odd whitespace (runs, tabs)
+    quick = not fuzzy and query_normal.isascii()
+    spaced = ' ' in query_normal
+    grams = ngrams(query_normal) if fuzzy else None
+    found = {}
+    for position, node in enumerate(nodes):
+        raw = node.name
+        if not raw or quick and raw.isascii() and query_normal not in raw.lower() \
+                and (not spaced or raw.isprintable() and '  ' not in raw):
+            continue
+        raw = raw.strip()
+        if not raw:
+            continue
+        entry = found.get(raw)
+        if entry is not None:
+            entry[3].append(position)
+            continue
+        normal = normalize(raw)
+        tier, score = name_tier(raw, normal, query_raw, query_normal), 1.0
+        if tier is None and fuzzy:
+            name_grams = ngrams(normal)
+            score = round(2.0 * len(grams & name_grams) / (len(grams) + len(name_grams)), 3)
+            if score >= threshold:
+                tier = FUZZY
+        if tier is not None:
+            found[raw] = (tier, -score, position, [position])
+    ranked = heapq.nsmallest(limit, found.values()) if limit else sorted(found.values())
+    hits = []
+    for tier, score, _, positions in ranked:
+        hits.extend((tier, -score, nodes[position]) for position in positions)
+    return hits[:limit] if limit else hits
+
+
+class NameIndex:
+    """Distinct names of a node list, normalized on the second search, n-gram postings on demand."""
+
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        self.raw = None
+        self.normal = None
+        self.members = None
+        self._postings = None
+        self._sizes = None
+        self.searches = 0
+
+    def build(self):
+        """Normalize the distinct names (once); returns self."""
+        if self.raw is not None:
+            return self
+        raw_names, normal, members = [], [], []
+        ids = {}
+        for position, node in enumerate(self.nodes):
+            raw = (node.name or '').strip()
+            if not raw:
+                continue
+            name_id = ids.get(raw)
+            if name_id is None:
+                name_id = ids[raw] = len(raw_names)
+                raw_names.append(raw)
+                normal.append(normalize(raw))
+                members.append([])
+            members[name_id].append(position)
+        # raw last: it marks the index as built
+        self.normal, self.members, self.raw = normal, members, raw_names
+        return self
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def postings(self):
+        """{n-gram: [name ids]} and the n-gram count of each name, built once."""
+        if self._postings is None:
+            self.build()
+            postings, sizes = defaultdict(list), []
+            for name_id, normal in enumerate(self.normal):
+                grams = ngrams(normal)
+                sizes.append(len(grams))
+                for gram in grams:
+                    postings[gram].append(name_id)
+            self._postings, self._sizes = postings, sizes
+        return self._postings, self._sizes
+
+    def search(self, query, fuzzy=False, limit=None, threshold=FUZZY_THRESHOLD):
+        """[(tier, score, node)] for nodes whose name matches query, best first.
+
+        Non-fuzzy tiers score 1.0 and keep tree order; fuzzy hits are
+        ordered by score. limit keeps only the top k nodes. The first
+        search of an unbuilt index is a scan(); later ones build and use it.
+        """
+        self.searches += 1
+        if self.raw is None and self.searches == 1:
+            return scan(self.nodes, query, fuzzy, limit, threshold)
+        self.build()
+        query_normal = normalize(query)
+        if not query_normal:
+            return []
+        found = [name_id for name_id, normal in enumerate(self.normal) if query_normal in normal]
+        return self._finish(query, query_normal, found, fuzzy, limit, threshold)
+
+    def search_many(self, queries, fuzzy=False, limit=None, threshold=FUZZY_THRESHOLD):
+        """search() for several queries, scanning the names once: [hits per query]."""
+        if len(queries) == 1:
+            return [self.search(queries[0], fuzzy, limit, threshold)]
+        self.searches += len(queries)
+        self.build()
+        normals = [normalize(query) for query in queries]
+        automaton = Automaton(normals)
+        found = [[] for _ in queries]
+        for name_id, normal in enumerate(self.normal):
+            for i in automaton.find(normal):
+                found[i].append(name_id)
+        return [self._finish(query, normal, ids, fuzzy, limit, threshold) if normal else []
+                for query, normal, ids in zip(queries, normals, found)]
+
+    def _finish(self, query, query_normal, found, fuzzy, limit, threshold):
+        """Rank the names (ids in found) that contain the query, add fuzzy ones, expand to nodes."""
+        query_raw = query.strip()
+        ranked = []
+        for name_id in found:
+            tier = name_tier(self.raw[name_id], self.normal[name_id], query_raw, query_normal)
+            ranked.append((tier, -1.0, self.members[name_id][0], name_id))
+        if fuzzy:
+            postings, sizes = self.postings()
+            grams = ngrams(query_normal)
+            shared = defaultdict(int)
+            for gram in grams:
+                for name_id in postings.get(gram, ()):
+                    shared[name_id] += 1
+            matched = set(found)
+            for name_id, count in shared.items():
+                score = 2.0 * count / (len(grams) + sizes[name_id])
+                if score >= threshold and name_id not in matched:
+                    ranked.append((FUZZY, -round(score, 3), self.members[name_id][0], name_id))
+        ranked = heapq.nsmallest(limit, ranked) if limit else sorted(ranked)
+        hits = []
+        for tier, score, _, name_id in ranked:
+            hits.extend((tier, -score, self.nodes[position]) for position in self.members[name_id])
+        return hits[:limit] if limit else hits
@@ -0,0 +1,313 @@
+"""
+Selector queries - CSS-like element selectors compiled into query plans
+
+Scripts accept a selector wherever they take an element name or a window
+filter, written with the "sel:" prefix:
+
+    sel:Button[name="Save"]:enabled
+    sel:Window[name~=Notepad] > Pane Button[name=Save]
+    sel:Window[process=chrome.exe] Hyperlink[name^=Sign]
+
+Syntax:
+    Type            control type (Button, Edit, ...) or * for any
+    [attr op value] name, id (automation id), class, value; on the Window
+                    step also process. op: = (exact), != (not), ~= or *=
+                    (contains), ^= (starts with), $= (ends with); all but =
+                    and != ignore case. Values may be quoted. Process names
+                    always ignore case, and = and != add a missing .exe.
+    :enabled :disabled :checked :unchecked
+    A > B           B is a child of A;  A B  B is anywhere below A
+
+A leading Window step is matched against top-level windows (title, class,
+process), so it prunes whole windows before any of their elements are
+read; its type is not checked. The rest is matched inside each window.
+
+compile_query() turns the text into a Query once and caches it (the
+daemon keeps the cache across commands). The plan picks the cheapest
+strategy:
+    provider  one step below the window: type and exact name go into a
+              single FindAllBuildCache, the rest is checked in Python
+    walk      only child (>) steps: a lazy walk that never expands a node
+              no step can continue from, so the depth is bounded
+    capture   otherwise one batched capture, matched top-down; subtrees
+              no step can continue in are skipped
+"""
+import re
+from functools import lru_cache
+from .backend import get_backend
+from .deadline import call_timeout, call_with_timeout
+from .snapshot import BASIC, capture, walk
+
+PREFIX = 'sel:'
+
+ATTRIBUTES = {'name': 'name', 'id': 'automation_id', 'automation_id': 'automation_id',
+              'class': 'class_name', 'class_name': 'class_name', 'value': 'value',
+              'process': 'process'}
+PSEUDOS = {'enabled': 'enabled', 'disabled': 'enabled', 'checked': 'toggle_state',
+           'unchecked': 'toggle_state'}
+# Window step attributes that are known without touching UIA
+WINDOW_ATTRIBUTES = ('name', 'class_name', 'process')
+
+CHILD, DESCENDANT = '>', ' '
+
+_TOKEN = re.compile(r'''
+    (?P<space>\s+) | (?P<child>>) | (?P<type>[A-Za-z_][A-Za-z0-9_]*|\*)
+  | (?P<attr>\[) | (?P<pseudo>:[a-z]+)
+''', re.VERBOSE)
+_ATTR = re.compile(r'''\s*([a-z_]+)\s*(!=|~=|\*=|\^=|\$=|=)\s*(?:"((?:[^"\\]|\\.)*)"|'((?:[^'\\]|\\.)*)'|([^\]]*?))\s*\]''')
+
+
+class QueryError(ValueError):
+    """The selector text could not be parsed."""
+
+
+def is_query(text):
+    return isinstance(text, str) and text.startswith(PREFIX)
+
+
+class Compound:
+    """One step: a control type plus attribute tests and pseudo-classes."""
+
+    def __init__(self):
+        self.type = None
+        self.tests = []
+        self.pseudos = []
+
+    def __repr__(self):
+        tests = ''.join(f"[{attr}{op}{value!r}]" for attr, op, value in self.tests)
+        return f"{self.type or '*'}{tests}{''.join(':' + p for p in self.pseudos)}"
+
+    @property
+    def exact_name(self):
+        for attr, op, value in self.tests:
+            if attr == 'name' and op == '=':
+                return value
+        return None
+
+    def props(self):
+        needed = {'name', 'control_type'}
+        needed.update(attr for attr, _, _ in self.tests if attr != 'process')
+        needed.update(PSEUDOS[p] for p in self.pseudos)
+        return needed
+
+    def matches(self, node):
+        if self.type is not None and node.control_type != self.type:
+            return False
+        for attr, op, value in self.tests:
+            if not compare(getattr(node, attr), op, value):
+                return False
+        for pseudo in self.pseudos:
+            if pseudo == 'enabled' and node.enabled is False:
+                return False
+            if pseudo == 'disabled' and node.enabled is not False:
+                return False
+            if pseudo == 'checked' and node.toggle_state != 1:
+                return False
+            if pseudo == 'unchecked' and node.toggle_state == 1:
+                return False
+        return True
+
+    def matches_entry(self, entry, desktop=None):
+        """Check a windows.WindowEntry (top-level window) against this step."""
+        for attr, op, value in self.tests:
+            if attr == 'name':
+                actual = entry.title
+            elif attr == 'class_name':
+                actual = entry.class_name
+            else:
+                actual, value = (entry.process_name(desktop) or '').lower(), value.lower()
+                if op in ('=', '!=') and not value.endswith('.exe'):
+                    value += '.exe'
+            if not compare(actual, op, value):
+                return False
+        return True
+
+
+def compare(actual, op, value):
+    actual = (actual or '').strip() if isinstance(actual, str) or actual is None else str(actual)
+    if op == '=':
+        return actual == value
+    if op == '!=':
+        return actual != value
+    actual, value = actual.lower(), value.lower()
+    if op in ('~=', '*='):
+        return value in actual
+    if op == '^=':
+        return actual.startswith(value)
+    return actual.endswith(value)
+
+
+def parse(text):
+    """[(combinator, Compound)]; the first combinator is None."""
+    steps = []
+    compound = None
+    combinator = None
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m:
+            raise QueryError(f"Unexpected '{text[pos]}' at position {pos} in selector '{text}'")
+        kind = m.lastgroup
+        if kind == 'space':
+            if compound is not None:
+                steps.append((combinator, compound))
+                compound, combinator = None, DESCENDANT
+            pos = m.end()
+            continue
+        if kind == 'child':
+            if compound is not None:
+                steps.append((combinator, compound))
+                compound = None
+            elif not steps:
+                raise QueryError(f"Selector '{text}' cannot start with '>'")
+            combinator = CHILD
+            pos = m.end()
+            continue
+        if compound is None:
+            compound = Compound()
+        if kind == 'type':
+            if compound.type is not None or compound.tests or compound.pseudos:
+                raise QueryError(f"Unexpected type '{m.group()}' at position {pos} in selector '{text}'")
+            compound.type = None if m.group() == '*' else m.group()
+            pos = m.end()
+        elif kind == 'attr':
+            a = _ATTR.match(text, m.end())
+            if not a:
+                raise QueryError(f"Bad attribute test at position {pos} in selector '{text}'")
+            attr = ATTRIBUTES.get(a.group(1))
+            if attr is None:
+                raise QueryError(f"Unknown attribute '{a.group(1)}' in selector '{text}'"
+                                 f" (use {', '.join(sorted(set(ATTRIBUTES)))})")
+            quoted = a.group(3) if a.group(3) is not None else a.group(4)
+            value = re.sub(r'\\(.)', r'\1', quoted) if quoted is not None else a.group(5)
+            compound.tests.append((attr, a.group(2), value))
+            pos = a.end()
+        else:
+            pseudo = m.group()[1:]
+            if pseudo not in PSEUDOS:
+                raise QueryError(f"Unknown pseudo-class ':{pseudo}' in selector '{text}'"
+                                 f" (use {', '.join(':' + p for p in PSEUDOS)})")
+            compound.pseudos.append(pseudo)
+            pos = m.end()
+    if compound is None:
+        raise QueryError(f"Selector '{text}' is empty or ends with a combinator")
+    steps.append((combinator, compound))
+    return steps
+
+
+class Query:
+    """A compiled selector: optional window step, element steps and a plan."""
+
+    def __init__(self, text):
+        self.text = text
+        steps = parse(text)
+        self.window = None
+        if steps[0][1].type == 'Window':
+            self.window = steps[0][1]
+            steps = steps[1:]
+            bad = [attr for attr, _, _ in self.window.tests if attr not in WINDOW_ATTRIBUTES]
+            if bad or self.window.pseudos:
+                raise QueryError(f"The Window step only supports name, class and process"
+                                 f" (selector '{text}')")
+        elif any(attr == 'process' for _, c in steps for attr, _, _ in c.tests):
+            raise QueryError(f"[process=...] only applies to a leading Window step (selector '{text}')")
+        self.steps = steps
+        self.props = set()
+        for _, compound in steps:
+            self.props |= compound.props()
+        self.strategy = self._plan()
+
+    def __repr__(self):
+        return f"<Query {self.text!r} plan={self.strategy}>"
+
+    def _plan(self):
+        if not self.steps:
+            return 'window'
+        combinators = [c for c, _ in self.steps]
+        if len(self.steps) == 1 and combinators[0] != CHILD:
+            last = self.steps[0][1]
+            if last.type is not None or last.exact_name is not None:
+                return 'provider'
+        if self.window is not None and all(c == CHILD for c in combinators):
+            return 'walk'
+        return 'capture'
+
+    @property
+    def target(self):
+        """The step that results must match."""
+        return self.steps[-1][1] if self.steps else None
+
+    def explain(self):
+        window = f"windows matching {self.window!r}, then " if self.window else ''
+        steps = ' '.join((f"{c} " if c == CHILD else '') + repr(s) for c, s in self.steps)
+        return f"{window}{self.strategy}: {steps or '(the windows themselves)'}"
+
+    # --- evaluation -------------------------------------------------------
+
+    def find(self, window, props=BASIC, control_types=None, backend=None):
+        """Nodes under window matching the element steps, in tree order.
+
+        control_types restricts results further when the selector itself
+        names no type (scripts pass their clickable types).
+        """
+        backend = backend or get_backend()
+        if not self.steps:
+            return []
+        props = tuple(set(props) | self.props)
+        target = self.target
+        types = [target.type] if target.type else control_types
+
+        if self.strategy == 'provider':
+            nodes = call_with_timeout(backend.find_all, call_timeout(), window, props,
+                                      control_types=types, name=target.exact_name)
+            return [n for n in nodes if target.matches(n)]
+
+        start = frozenset([(0, self.window is None or self.steps[0][0] != CHILD)])
+        states = []
+        if self.strategy == 'walk':
+            # A node whose children can match no step is never expanded
+            nodes = walk(window, props, backend, expand=lambda node: bool(states[-1]))
+        else:
+            nodes = capture(window, props, backend)
+        return [n for n in self._match(nodes, start, states)
+                if not types or n.control_type in types]
+
+    def _match(self, nodes, start, states):
+        """Top-down matching over pre-order nodes.
+
+        states[i] is the set of (step, sticky) the children of node i may
+        try: sticky steps (after a descendant combinator) stay open for the
+        whole subtree, child steps only for the next level. An empty set
+        means the subtree cannot hold a match.
+        """
+        last = len(self.steps) - 1
+        results = []
+        for node in nodes:
+            available = start if node.parent < 0 else states[node.parent]
+            out = set()
+            for k, sticky in available:
+                if sticky:
+                    out.add((k, True))
+                if self.steps[k][1].matches(node):
+                    if k == last:
+                        if not results or results[-1] is not node:
+                            results.append(node)
+                    else:
+                        out.add((k + 1, self.steps[k + 1][0] != CHILD))
+            states.append(frozenset(out))
+        return results
+
+    def windows(self, desktop, title=None):
+        """Top-level windows matching the window step (and title), in z-order."""
+        from .windows import iter_window_entries
+        return [entry.wrapper(desktop) for entry in iter_window_entries(desktop, title)
+                if self.window is None or self.window.matches_entry(entry, desktop)]
+
+
+@lru_cache(maxsize=256)
+def compile_query(text):
+    """Compile selector text (with or without the sel: prefix), cached."""
+    if text.startswith(PREFIX):
+        text = text[len(PREFIX):]
+    return Query(text)
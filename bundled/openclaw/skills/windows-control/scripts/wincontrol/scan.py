@@ -0,0 +1,173 @@
+"""
+Parallel window scan - run a per-window job on a thread pool, results in z-order
+
+Searching every top-level window one after the other lets a single huge
+or slow app (a browser with 20 tabs) hold up the whole command.
+scan_windows() hands each window to a small thread pool instead. Each
+worker joins the multithreaded COM apartment (see backend.py) and creates
+the window's UIA wrapper itself; the wrapper and the job's result are
+then used on the consumer's thread. Results are still yielded strictly
+in z-order, so the outcome is the same as a sequential scan; only the
+waiting overlaps.
+
+The consumer decides when it is done: closing the generator (e.g.
+breaking out of the loop once a match is certain) cancels every job that
+has not started yet.
+
+Every job runs under the per-call deadline (see deadline.py), enforced
+by the consumer: a pool worker runs its job directly (run_guarded, no
+extra thread per window) and the consumer stops waiting once the job has
+run for the deadline. A window that misses it is abandoned, recorded in
+the ScanReport and tripped in the circuit breaker; unfiltered scans then
+skip it during the cooldown. Since the abandoned worker may stay blocked
+in the hung window, the remaining jobs move to a fresh pool. A
+sequential scan (one worker) runs each job through call_with_timeout().
+
+WINCONTROL_SCAN_WORKERS sets the default pool size (1 = sequential).
+"""
+import os
+import time
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from .backend import init_com_thread
+from .deadline import DeadlineExceeded, call_timeout, call_with_timeout, get_breaker, run_guarded
+from .windows import iter_window_entries
+
+DEFAULT_WORKERS = 4
+
+
+def default_workers():
+    try:
+        return max(1, int(os.environ.get('WINCONTROL_SCAN_WORKERS', DEFAULT_WORKERS)))
+    except ValueError:
+        return DEFAULT_WORKERS
+
+
+class Job:
+    """One window's job in the pool: when it started and its future."""
+
+    __slots__ = ('entry', 'started', 'future')
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.started = None
+        self.future = None
+
+    def result(self, timeout):
+        """(window, result), or DeadlineExceeded once the job has run for timeout seconds."""
+        if timeout is None:
+            return self.future.result()
+        while True:
+            started = self.started
+            # Not started yet: it is next in line for a free worker
+            wait = timeout if started is None else started + timeout - time.monotonic()
+            try:
+                return self.future.result(timeout=max(0.0, wait))
+            except TimeoutError:
+                if self.started is not None and time.monotonic() >= self.started + timeout:
+                    raise DeadlineExceeded(f"no response within {timeout:g}s") from None
+
+
+class ScanReport:
+    """Windows a scan did not cover, by title."""
+
+    def __init__(self):
+        self.timed_out = []
+        self.skipped = []
+
+    @property
+    def partial(self):
+        return bool(self.timed_out or self.skipped)
+
+    def summary(self):
+        """One line for stderr, or '' if the scan was complete."""
+        parts = []
+        if self.timed_out:
+            parts.append("no response from " + ", ".join(repr(t) for t in self.timed_out))
+        if self.skipped:
+            parts.append("skipped recently hung " + ", ".join(repr(t) for t in self.skipped))
+        return "Partial results: " + "; ".join(parts) if parts else ''
+
+
+def scan_windows(desktop, job, title=None, skip_untitled=False, workers=None, report=None,
+                 timeout=None):
+    """Yield (window, job(window)) for each matching top-level window, in z-order.
+
+    Windows whose job raises (closed, access denied) are skipped. Windows
+    that exceed timeout (default: WINCONTROL_CALL_TIMEOUT) or that the
+    breaker has open (unfiltered scans only) are skipped and listed in
+    report. At most 2 * workers jobs are queued ahead of the consumer.
+    """
+    workers = workers or default_workers()
+    timeout = timeout or call_timeout()
+    report = report if report is not None else ScanReport()
+    breaker = get_breaker()
+    hung = breaker.open_windows()
+
+    def candidates():
+        for entry in iter_window_entries(desktop, title, skip_untitled):
+            if entry.hwnd in hung and not title:
+                report.skipped.append(entry.title)
+                continue
+            yield entry
+
+    def window_job(entry):
+        window = entry.wrapper(desktop)
+        return window, job(window)
+
+    def run(task):
+        task.started = time.monotonic()
+        return run_guarded(window_job, task.entry)
+
+    def collect(entry, outcome):
+        """outcome() -> (window, result); None if the window is to be skipped."""
+        try:
+            result = outcome()
+        except DeadlineExceeded:
+            report.timed_out.append(entry.title)
+            breaker.trip(entry.hwnd, entry.title)
+            return None
+        except Exception:
+            return None
+        if entry.hwnd in hung:
+            breaker.reset(entry.hwnd)
+        return result
+
+    entries = candidates()
+    if workers <= 1:
+        for entry in entries:
+            result = collect(entry, lambda: call_with_timeout(window_job, timeout, entry))
+            if result is not None:
+                yield result
+        return
+
+    def new_pool():
+        return ThreadPoolExecutor(max_workers=workers, initializer=init_com_thread,
+                                  thread_name_prefix='wincontrol-scan')
+
+    def submit(task):
+        task.future = pool.submit(run, task)
+        return task
+
+    pool = new_pool()
+    try:
+        pending = deque(submit(Job(entry)) for entry in itertools.islice(entries, 2 * workers))
+        while pending:
+            task = pending.popleft()
+            for next_entry in itertools.islice(entries, 1):
+                pending.append(submit(Job(next_entry)))
+            timed_out = len(report.timed_out)
+            result = collect(task.entry, lambda: task.result(timeout))
+            if len(report.timed_out) > timed_out:
+                # Its worker may never come back; queued jobs get a fresh pool
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = new_pool()
+                for queued in pending:
+                    if queued.future.cancelled():
+                        submit(queued)
+            if result is not None:
+                yield result
+    finally:
+        # Jobs already running finish in the background; their results are dropped
+        pool.shutdown(wait=False, cancel_futures=True)
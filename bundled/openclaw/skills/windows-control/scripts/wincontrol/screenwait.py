@@ -0,0 +1,114 @@
+"""
+Screen waits - wait for an area of the screen to change or to settle
+
+After a click an agent needs to know when the application has reacted
+and finished drawing. UI Automation events cover the accessibility tree
+but not what is painted (a canvas, a video, a progress animation), so
+wait_screen() watches pixels instead: it grabs the area every `interval`
+seconds and compares a cheap low-resolution signature with the previous
+one.
+
+- until='change': returns as soon as the area differs from how it looked
+  when the wait started
+- until='stable': returns once the area has not changed for `stable`
+  seconds (an area that is already still returns after `stable`)
+
+Either way it gives up after `timeout` seconds. A signature keeps every
+STEP-th pixel of every STEP-th row (one vectorized slice with NumPy,
+memoryview slicing without it) and reduces that thumbnail to delta tile
+signatures, one per square of TILE*step screen pixels (32x32 with the
+default STEP). Changes in at most `ignore` tiles do not count, e.g.
+ignore=1 for a blinking caret.
+A change thinner than STEP pixels can fall between the samples; step=1
+compares every pixel.
+"""
+import time
+from . import delta
+from .capture import Frame, get_source, target_region
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+STEP = 4
+# Thumbnail pixels per signature tile (each way)
+TILE = 8
+DEFAULT_INTERVAL = 0.1
+DEFAULT_STABLE = 0.5
+DEFAULT_TIMEOUT = 10.0
+UNTIL = ('change', 'stable')
+
+
+def thumbnail(frame, step=STEP):
+    """Frame of every step-th pixel of every step-th row."""
+    if step == 1:
+        return frame
+    if HAS_NUMPY:
+        pixels = np.frombuffer(frame.data, dtype=np.uint32, count=frame.stride // 4 * frame.height)
+        pixels = pixels.reshape(frame.height, frame.stride // 4)[::step, :frame.width:step]
+        height, width = pixels.shape
+        return Frame(pixels.tobytes(), width, height, frame.left, frame.top)
+    data = bytearray()
+    for y in range(0, frame.height, step):
+        data += frame.row(y).cast('I')[::step].tobytes()
+    return Frame(data, -(-frame.width // step), -(-frame.height // step), frame.left, frame.top)
+
+
+def signature(frame, step=STEP):
+    return delta.signatures(thumbnail(frame, step), TILE)
+
+
+def changed_tiles(before, after):
+    return sum(1 for a, b in zip(before, after) if a != b)
+
+
+class ScreenWait:
+    """Outcome of wait_screen(): ok, seconds waited, frames compared, tiles last changed."""
+
+    def __init__(self, ok, until, elapsed, frames, changed, rect):
+        self.ok = ok
+        self.until = until
+        self.elapsed = elapsed
+        self.frames = frames
+        self.changed = changed
+        self.rect = rect
+
+    def __repr__(self):
+        state = 'ok' if self.ok else 'timeout'
+        return f"<ScreenWait {self.until} {state} after {self.elapsed:.2f}s, {self.frames} frames>"
+
+
+def wait_screen(region=None, window=None, until='change', stable=DEFAULT_STABLE,
+                interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT, step=STEP, ignore=0,
+                source=None):
+    """Wait until the target area changes or settles (see module docstring)."""
+    if until not in UNTIL:
+        raise ValueError(f"Unknown wait '{until}' (choose from {', '.join(UNTIL)})")
+    source = source or get_source()
+    # Resolved once: a window that moves keeps being compared at its old place
+    rect = target_region(region, window=window, source=source)
+    start = time.monotonic()
+    deadline = start + timeout
+    baseline = signature(source.grab(rect), step)
+    frames, changed = 1, 0
+    last_change = start
+    while True:
+        now = time.monotonic()
+        if until == 'stable' and now - last_change >= stable:
+            return ScreenWait(True, until, now - start, frames, changed, rect)
+        if now >= deadline:
+            return ScreenWait(False, until, now - start, frames, changed, rect)
+        wake = start + frames * interval
+        if until == 'stable':
+            wake = min(wake, last_change + stable)
+        time.sleep(max(0.0, min(wake, deadline) - now))
+        current = signature(source.grab(rect), step)
+        frames += 1
+        changed = changed_tiles(baseline, current)
+        if changed > ignore:
+            if until == 'change':
+                return ScreenWait(True, until, time.monotonic() - start, frames, changed, rect)
+            last_change = time.monotonic()
+            baseline = current
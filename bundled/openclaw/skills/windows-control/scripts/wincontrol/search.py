@@ -0,0 +1,350 @@
+"""
+Element search - push control-type and name conditions down to the provider
+
+find_elements() turns a control-type list and/or an exact name into a UIA
+condition and asks the provider for matching elements in one
+FindAllBuildCache call, with the requested properties already cached.
+Only the parts UIA cannot express (substring and fuzzy name matching) are
+done in Python, and a full snapshot walk is used only when there is
+nothing to push down at all.
+
+Substring and fuzzy matching go through a name index (names.py): names
+are NFKC-normalized and case-folded, so full-width/half-width and case
+differences do not matter (the first search of a fetch is one scan, the
+index is built once the same fetch is searched again), and
+mode='fuzzy' adds candidates for typos, scored by n-gram similarity. The
+index of a window is cached (cache.py): it is built from the window's
+cached snapshot when there is a fresh one, else from one provider query,
+and reused while the window is unchanged; a search that finds nothing in
+a reused index fetches again before giving up.
+
+On top of that, iter_matches() is a lazy pipeline over windows that ranks
+every hit into a tier (exact, case-insensitive exact, prefix, substring,
+fuzzy), and best_match() consumes it only until the answer is certain:
+the first exact hit ends the search unless ambiguity has to be reported.
+iter_desktop_matches() does the same over top-level windows scanned in
+parallel (see scan.py), still yielding matches in z-order. top_matches()
+reads the whole stream and keeps the k best. best_matches() looks up
+several names in one scan: each window is fetched once and its names are
+scanned once for all of them (an Aho-Corasick automaton, see names.py).
+
+Matches may come from a cached snapshot, so actions pass their choice
+through confirm_match() first: one call re-reads the element, and a
+match that is gone or renamed drops the window's cache entries.
+
+A name starting with "sel:" is a selector (query.py): it is compiled
+into its own plan, its matches all rank as exact, and a leading Window
+step filters the windows scanned.
+"""
+import heapq
+from .backend import get_backend
+from .deadline import call_timeout, call_with_timeout
+from . import cache
+from .names import EXACT, FUZZY, IEXACT, PREFIX, SUBSTRING, TIERS, NameIndex, name_tier, normalize
+from .query import compile_query, is_query
+from .scan import scan_windows
+from .snapshot import BASIC, capture
+
+# How a name is compared: pushed to the provider for 'exact'/'iexact',
+# looked up in the name index for 'substring'/'fuzzy'
+NAME_MODES = ('substring', 'fuzzy', 'exact', 'iexact')
+
+# A reused index that finds nothing is fetched again, unless it is this fresh
+REFETCH_AFTER = 0.5
+
+
+def find_elements(window, name=None, control_types=None, mode='substring', props=BASIC,
+                  backend=None):
+    """Nodes under window matching the given name and control types.
+
+    Returned nodes come from a flat provider query, so their depth and
+    parent fields are not meaningful. Substring and fuzzy matches come
+    best first (see find_ranked()).
+    """
+    if name and mode in ('substring', 'fuzzy') and not is_query(name):
+        return [node for _, _, node in find_ranked(window, name, control_types, mode, props,
+                                                   backend)]
+    return fetch_elements(window, name, control_types, mode, props, backend)
+
+
+def fetch_elements(window, name=None, control_types=None, mode='substring', props=BASIC,
+                   backend=None):
+    """One provider query (or capture) for find_elements(), without the name index."""
+    if mode not in NAME_MODES:
+        raise ValueError(f"Unknown name match mode '{mode}'")
+    backend = backend or get_backend()
+    if is_query(name):
+        return compile_query(name).find(window, props, control_types, backend)
+    if 'name' not in props and name:
+        props = tuple(props) + ('name',)
+    if 'control_type' not in props and control_types:
+        props = tuple(props) + ('control_type',)
+
+    push_name = name if name and mode in ('exact', 'iexact') else None
+    if control_types or push_name:
+        nodes = call_with_timeout(backend.find_all, call_timeout(), window, props,
+                                  control_types=control_types, name=push_name,
+                                  ignore_case=mode == 'iexact')
+    else:
+        nodes = capture(window, props, backend)
+
+    if name and mode == 'exact':
+        # The provider matches the UIA Name; window_text() may differ for text controls
+        nodes = [n for n in nodes if (n.name or '').strip() == name]
+    return nodes
+
+
+def find_ranked(window, name, control_types=None, mode='substring', props=BASIC, backend=None,
+                limit=None):
+    """[(tier, score, node)] for elements matching name, best first.
+
+    'substring' and 'fuzzy' search the window's name index, fetched once
+    (types pushed to the provider) and reused while valid; other modes
+    and selectors query the provider and score every hit 1.0.
+    """
+    if is_query(name) or mode not in ('substring', 'fuzzy'):
+        nodes = fetch_elements(window, name, control_types, mode, props, backend)
+        ranked = []
+        for node in nodes:
+            tier = EXACT if is_query(name) else match_tier(node.name, name)
+            if tier is not None:
+                ranked.append((tier, 1.0, node))
+        return ranked[:limit] if limit else ranked
+    if 'name' not in props:
+        props = tuple(props) + ('name',)
+    index, entry = name_index(window, control_types, mode, props, backend)
+    hits = index.search(name, fuzzy=mode == 'fuzzy', limit=limit)
+    if not hits and entry is not None and entry.age > REFETCH_AFTER:
+        # The element may have appeared since the index was built
+        index, _ = name_index(window, control_types, mode, props, backend, refresh=True)
+        hits = index.search(name, fuzzy=mode == 'fuzzy', limit=limit)
+    return hits
+
+
+def find_ranked_many(window, names, control_types=None, mode='substring', props=BASIC,
+                     backend=None):
+    """find_ranked() for several names over one fetch: [hits per name]."""
+    results = [None] * len(names)
+    plain = [i for i, name in enumerate(names) if not is_query(name)]
+    if plain and mode in ('substring', 'fuzzy'):
+        if 'name' not in props:
+            props = tuple(props) + ('name',)
+        queries = [names[i] for i in plain]
+        index, entry = name_index(window, control_types, mode, props, backend)
+        hits = index.search_many(queries, fuzzy=mode == 'fuzzy')
+        if not all(hits) and entry is not None and entry.age > REFETCH_AFTER:
+            index, _ = name_index(window, control_types, mode, props, backend, refresh=True)
+            hits = index.search_many(queries, fuzzy=mode == 'fuzzy')
+        for i, found in zip(plain, hits):
+            results[i] = found
+    for i, name in enumerate(names):
+        if results[i] is None:
+            results[i] = find_ranked(window, name, control_types, mode, props, backend)
+    return results
+
+
+def name_index(window, control_types, mode, props, backend=None, refresh=False):
+    """(NameIndex, cache entry it came from or None if just fetched) for a window.
+
+    A cached index is used if fresh; otherwise it is built from the
+    window's cached snapshot (types filtered here) or, failing that, from
+    one provider query, and cached.
+    """
+    key = ('names', tuple(control_types or ()), tuple(props))
+    if not refresh:
+        entry = cache.lookup(window, key, props, backend)
+        if entry is not None:
+            return entry.value, entry
+        entry = cache.lookup(window, cache.TREE, tuple(props) + ('control_type',), backend)
+        if entry is not None:
+            tree = entry.value
+            index = NameIndex(tree.node(i) for i in tree.select(types=control_types))
+            cache.store(window, key, index, props, backend, created=entry.created)
+            return index, entry
+    index = NameIndex(fetch_elements(window, None, control_types, mode, props, backend))
+    cache.store(window, key, index, props, backend)
+    return index, None
+
+
+def match_tier(name, query):
+    """Tier of name against query (index into TIERS), or None for no match."""
+    name = (name or '').strip()
+    return name_tier(name, normalize(name), query.strip(), normalize(query))
+
+
+class Match:
+    """A ranked search hit: the node, the window it was found in, its tier and score.
+
+    score is the fuzzy similarity (1.0 for every other tier).
+    """
+
+    __slots__ = ('node', 'window', 'tier', 'score')
+
+    def __init__(self, node, window, tier, score=1.0):
+        self.node = node
+        self.window = window
+        self.tier = tier
+        self.score = score
+
+    def __repr__(self):
+        return f"<Match {TIERS[self.tier]} {self.node!r}>"
+
+    @property
+    def name(self):
+        return (self.node.name or '').strip()
+
+    @property
+    def tier_name(self):
+        return TIERS[self.tier]
+
+    @property
+    def rank(self):
+        """Sort key: lower is better."""
+        return (self.tier, -self.score)
+
+
+def rank_hits(window, hits, predicate=None):
+    """Yield a Match for each (tier, score, node) from find_ranked()."""
+    for tier, score, node in hits:
+        if predicate is None or predicate(node):
+            yield Match(node, window, tier, score)
+
+
+def iter_matches(windows, query, control_types=None, mode='substring', props=BASIC, predicate=None,
+                 backend=None):
+    """Lazily yield a Match for every element whose name contains query.
+
+    windows may be any iterable; each window is searched only when the
+    consumer gets that far. Windows that fail (closed, hung) are skipped.
+    A bad selector raises query.QueryError before any window is searched.
+    predicate(node) can reject nodes, e.g. disabled ones. mode is passed to
+    find_elements(), so 'exact' only yields EXACT matches, found by the
+    provider, and 'fuzzy' also yields near misses.
+    """
+    if is_query(query):
+        compile_query(query)
+    for window in windows:
+        try:
+            hits = find_ranked(window, query, control_types=control_types, mode=mode,
+                               props=props, backend=backend)
+        except Exception:
+            continue
+        yield from rank_hits(window, hits, predicate)
+
+
+def iter_desktop_matches(desktop, query, window_title=None, skip_untitled=False, workers=None,
+                         control_types=None, mode='substring', props=BASIC, predicate=None,
+                         report=None):
+    """iter_matches() over top-level windows (optionally filtered), scanned in parallel.
+
+    Matches come out in z-order regardless of which window finished first;
+    closing the generator cancels the windows not yet scanned. Pass a
+    scan.ScanReport to learn which windows timed out or were skipped.
+    """
+    if is_query(query) and compile_query(query).window is not None and not window_title:
+        # The selector's Window step picks the windows to scan
+        window_title = query
+
+    def job(window):
+        return find_ranked(window, query, control_types=control_types, mode=mode, props=props,
+                           backend=desktop)
+
+    for window, hits in scan_windows(desktop, job, window_title, skip_untitled, workers, report):
+        yield from rank_hits(window, hits, predicate)
+
+
+def best_match(matches, ambiguity=False):
+    """Consume ranked matches; return (best, ties).
+
+    Stops at the first exact match. With ambiguity=True the whole stream is
+    read so that ties holds every match sharing the best rank (tier, and
+    score for fuzzy matches; best included); otherwise ties is just [best]. best is None if nothing matched.
+    """
+    best = None
+    ties = []
+    try:
+        for match in matches:
+            if best is None or match.rank < best.rank:
+                best = match
+                ties = [match]
+            elif ambiguity and match.rank == best.rank:
+                ties.append(match)
+            if best.tier == EXACT and not ambiguity:
+                break
+    finally:
+        # Stop the producer now (cancels pending window scans)
+        close = getattr(matches, 'close', None)
+        if close is not None:
+            close()
+    return best, ties
+
+
+def best_matches(desktop, names, window_title=None, skip_untitled=False, workers=None,
+                 control_types=None, mode='substring', props=BASIC, predicate=None,
+                 ambiguity=False, report=None):
+    """best_match() for several names in one scan: [(best, ties)] per name.
+
+    Each window is fetched once for all names. Without ambiguity the scan
+    stops as soon as every name has an exact match. Selectors with a
+    Window step pick their own windows, so they are searched separately.
+    """
+    for name in names:
+        if is_query(name):
+            compile_query(name)
+    results = [(None, []) for _ in names]
+    shared = [i for i, name in enumerate(names)
+              if not (is_query(name) and compile_query(name).window is not None)]
+    for i in range(len(names)):
+        if i not in shared:
+            results[i] = best_match(iter_desktop_matches(
+                desktop, names[i], window_title, skip_untitled, workers, control_types, mode,
+                props, predicate, report), ambiguity)
+    if not shared:
+        return results
+
+    def job(window):
+        return find_ranked_many(window, [names[i] for i in shared], control_types=control_types,
+                                mode=mode, props=props, backend=desktop)
+
+    scan = scan_windows(desktop, job, window_title, skip_untitled, workers, report)
+    try:
+        for window, hits in scan:
+            for i, found in zip(shared, hits):
+                best, ties = results[i]
+                for match in rank_hits(window, found, predicate):
+                    if best is None or match.rank < best.rank:
+                        best, ties = match, [match]
+                    elif ambiguity and match.rank == best.rank:
+                        ties.append(match)
+                    if best.tier == EXACT and not ambiguity:
+                        break
+                results[i] = (best, ties)
+            if not ambiguity and all(results[i][0] is not None and results[i][0].tier == EXACT
+                                     for i in shared):
+                break
+    finally:
+        scan.close()
+    return results
+
+
+def confirm_match(match, props=('name', 'rect', 'enabled'), backend=None):
+    """match with its node re-read from the live element, or None if it went stale.
+
+    A stale match (element gone, or its name no longer the one matched)
+    invalidates the window's cached data, so searching again fetches fresh.
+    """
+    node = cache.revalidate(match.node, props, backend)
+    if node is None or (node.name or '').strip() != match.name:
+        cache.invalidate(match.window.handle)
+        return None
+    return Match(node, match.window, match.tier, match.score)
+
+
+def top_matches(matches, k=5):
+    """The k best matches of the whole stream, best first (z-order breaks ties)."""
+    try:
+        return heapq.nsmallest(k, matches, key=lambda match: match.rank)
+    finally:
+        close = getattr(matches, 'close', None)
+        if close is not None:
+            close()
@@ -0,0 +1,205 @@
+"""
+Resident daemon - keeps one warm UIA session and runs script commands on it
+
+Transport is multiprocessing.connection: a named pipe on Windows, a Unix
+socket elsewhere, authenticated with a random key stored in the per-user
+state file. Requests are dicts:
+    {'op': 'ping'}
+    {'op': 'run', 'script': 'focus_window', 'argv': [...], 'cwd': '...'}
+    {'op': 'shutdown'}
+and replies are dicts with 'stdout', 'stderr' and 'code' for 'run'.
+A 'run' request with 'stream': True may first receive any number of
+{'partial': True, 'stdout': ...} messages, one per stdout flush, so
+streaming scripts (read_webpage --stream) reach the caller as they go.
+
+Requests are handled one at a time on the main thread. UIA calls made
+for them may run on helper threads (per-call deadlines, parallel window
+scans, batch steps); like the main thread, each of those joins the
+multithreaded COM apartment first (backend.init_com_thread), so elements
+of the warm Desktop are valid on all of them.
+"""
+import io
+import os
+import re
+import sys
+import time
+import secrets
+import importlib
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+from . import cache, handles, state
+from .backend import get_backend
+from .client import STATE_FILE, PROTOCOL_VERSION
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOT_DISPATCHABLE = {'daemon'}
+_SCRIPT_NAME = re.compile(r'^[a-z_]+$')
+
+
+def new_address():
+    """Pick a transport address and family for this platform."""
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\openclaw-wincontrol-{secrets.token_hex(8)}', 'AF_PIPE'
+    return state.state_path(f"daemon-{os.getpid()}.sock"), 'AF_UNIX'
+
+
+class StreamingOutput(io.StringIO):
+    """Captured stdout that sends what has been written on every flush()."""
+
+    def __init__(self, send):
+        super().__init__()
+        self.send = send
+        self.sent = 0
+
+    def flush(self):
+        if self.send is None:
+            return
+        text = self.getvalue()[self.sent:]
+        if not text:
+            return
+        try:
+            self.send({'partial': True, 'stdout': text})
+            self.sent += len(text)
+        except (OSError, EOFError):
+            # Caller went away; keep capturing so the run finishes normally
+            self.send = None
+
+    def rest(self):
+        """Output not yet sent as a partial message."""
+        return self.getvalue()[self.sent:]
+
+
+def run_script(name, argv, cwd=None, stdin=None, send=None):
+    """Run scripts/<name>.py main(argv) in this process and capture its output.
+
+    With send, stdout flushes are forwarded as partial messages and the
+    reply only carries the remainder.
+    """
+    if not _SCRIPT_NAME.match(name or '') or name in NOT_DISPATCHABLE \
+            or not os.path.isfile(os.path.join(SCRIPTS_DIR, f"{name}.py")):
+        return {'stdout': '', 'stderr': f"Error: unknown script '{name}'\n", 'code': 1}
+
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+
+    out, err = StreamingOutput(send), io.StringIO()
+    code = 0
+    old_cwd = os.getcwd()
+    old_argv, old_stdin = sys.argv, sys.stdin
+    try:
+        if cwd and os.path.isdir(cwd):
+            os.chdir(cwd)
+        sys.argv = [os.path.join(SCRIPTS_DIR, f"{name}.py")] + list(argv)
+        sys.stdin = io.StringIO(stdin or '')
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                module = importlib.import_module(name)
+                module.main(list(argv))
+            except SystemExit as e:
+                if e.code is None:
+                    code = 0
+                elif isinstance(e.code, int):
+                    code = e.code
+                else:
+                    print(e.code, file=sys.stderr)
+                    code = 1
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                handles.flush()
+    finally:
+        sys.argv, sys.stdin = old_argv, old_stdin
+        os.chdir(old_cwd)
+    return {'stdout': out.rest(), 'stderr': err.getvalue(), 'code': code}
+
+
+class Server:
+    """Accept loop plus request dispatch. dispatch() is usable without a socket."""
+
+    def __init__(self, idle_timeout=1800):
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.last_activity = self.started
+        self.served = 0
+        self.running = False
+        self.listener = None
+        self.info = None
+
+    def dispatch(self, request, send=None):
+        op = request.get('op')
+        self.last_activity = time.time()
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'version': PROTOCOL_VERSION,
+                    'backend': get_backend().name, 'served': self.served,
+                    'uptime': round(time.time() - self.started, 1), 'cache': cache.summary()}
+        if op == 'run':
+            self.served += 1
+            return run_script(request.get('script'), request.get('argv', []),
+                              request.get('cwd'), request.get('stdin'),
+                              send if request.get('stream') else None)
+        if op == 'shutdown':
+            self.running = False
+            return {'ok': True}
+        return {'ok': False, 'error': f"unknown op '{op}'"}
+
+    def warm_up(self):
+        """Pay the pywinauto/comtypes import and first enumeration once, up front."""
+        # Snapshots outlive a command here: share them, invalidated by UIA events
+        cache.set_shared(True)
+        backend = get_backend()
+        try:
+            backend.windows()
+        except Exception:
+            pass
+
+    def serve(self):
+        from multiprocessing.connection import Listener
+
+        self.warm_up()
+        address, family = new_address()
+        authkey = secrets.token_bytes(32)
+        self.listener = Listener(address, family=family, authkey=authkey)
+        self.info = {'version': PROTOCOL_VERSION, 'address': address, 'family': family,
+                     'authkey': authkey.hex(), 'pid': os.getpid()}
+        state.save_json(STATE_FILE, self.info)
+        self.running = True
+        threading.Thread(target=self._idle_watchdog, daemon=True).start()
+        try:
+            while self.running:
+                try:
+                    conn = self.listener.accept()
+                except Exception:
+                    continue
+                with conn:
+                    try:
+                        request = conn.recv()
+                    except (OSError, EOFError):
+                        continue
+                    reply = self.dispatch(request, conn.send)
+                    try:
+                        conn.send(reply)
+                    except (OSError, EOFError):
+                        pass
+        finally:
+            self.listener.close()
+            if (state.load_json(STATE_FILE) or {}).get('pid') == os.getpid():
+                state.remove(STATE_FILE)
+
+    def _idle_watchdog(self):
+        from multiprocessing.connection import Client
+
+        while self.running:
+            time.sleep(min(30, max(1, self.idle_timeout / 10)))
+            if self.idle_timeout and time.time() - self.last_activity > self.idle_timeout:
+                # Wake the blocking accept() with a shutdown request to ourselves
+                try:
+                    with Client(self.info['address'], family=self.info['family'],
+                                authkey=bytes.fromhex(self.info['authkey'])) as conn:
+                        conn.send({'op': 'shutdown'})
+                        conn.recv()
+                except Exception:
+                    pass
+                return
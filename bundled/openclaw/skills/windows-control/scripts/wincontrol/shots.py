@@ -0,0 +1,239 @@
+"""
+Screenshot store - saved screenshots with an index, bounded retention and dedup
+
+screenshot.py used to list the screenshot directory and stat every file
+on each call to keep the newest 20. The store keeps an index file
+instead (index.json in the directory, oldest first) and evicts from the
+old end like a ring buffer: at most WINCONTROL_SHOTS_KEEP files (default
+20) and WINCONTROL_SHOTS_MB megabytes (default 100). Saving is one file
+write, one index write and a delete per evicted file; nothing is listed
+or stat'ed. Screenshots left from before the index existed are adopted
+(oldest first) the first time the store is opened. Index updates hold a
+lock file (index.lock) and re-read the index under it, so concurrent
+screenshots (the daemon and an in-process run, or parallel agents) do
+not drop each other's entries and leave their files untracked.
+
+Each full screenshot is indexed with a Fingerprint of its frame:
+
+- phash: a 256-bit difference hash of a 17x16 grayscale thumbnail
+  (NumPy block sums over every other pixel when installed, a sampled
+  grid otherwise), which does not care about the exact pixels
+- digest: CRC-32 of all pixels
+
+find() returns a stored screenshot of the same area, taken with the same
+options, whose frame is identical (same digest and phash), so the caller
+can answer with its path without encoding again. Near-identical frames
+(phash at most WINCONTROL_SHOTS_NEAR bits apart) match only when that is
+set: a typed character or a changed digit rarely moves a thumbnail hash,
+so the default is exact.
+"""
+import json
+import os
+import time
+import zlib
+from collections import deque
+from .deadline import env_int, env_number
+from .state import file_lock
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+DEFAULT_KEEP = 20
+DEFAULT_MAX_MB = 100
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+PREFIX = 'screenshot-'
+# Thumbnail for the difference hash: each row compares HASH_COLS+1 columns
+HASH_COLS, HASH_ROWS = 16, 16
+# Samples per thumbnail cell (each way) without NumPy; pixel step with it
+SAMPLES = 4
+STEP = 2
+
+
+def screenshot_dir():
+    temp_dir = os.environ.get('TEMP', os.environ.get('TMP', '/tmp'))
+    return os.path.join(temp_dir, 'openclaw-screenshots')
+
+
+def _thumbnail(frame):
+    """HASH_ROWS rows of HASH_COLS+1 gray levels (sums, any common scale)."""
+    cols, rows = HASH_COLS + 1, HASH_ROWS
+    if HAS_NUMPY and frame.width >= cols * STEP and frame.height >= rows * STEP:
+        pixels = np.frombuffer(frame.data, dtype=np.uint8, count=frame.stride * frame.height)
+        pixels = pixels.reshape(frame.height, frame.stride // 4, 4)
+        cell_h, cell_w = frame.height // rows, frame.width // cols
+        pixels = pixels[:cell_h * rows:STEP, :cell_w * cols:STEP, :3].astype(np.uint32)
+        # Green counts twice: a cheap stand-in for luma
+        gray = pixels[:, :, 0] + 2 * pixels[:, :, 1] + pixels[:, :, 2]
+        # First sampled row/column of each cell
+        starts_y = -(-np.arange(rows) * cell_h // STEP)
+        starts_x = -(-np.arange(cols) * cell_w // STEP)
+        return np.add.reduceat(np.add.reduceat(gray, starts_y, axis=0), starts_x, axis=1).tolist()
+    grid = []
+    for row in range(rows):
+        sums = [0] * cols
+        for sy in range(SAMPLES):
+            y = min(frame.height - 1, (row * SAMPLES + sy) * frame.height // (rows * SAMPLES))
+            line = frame.row(y)
+            for col in range(cols):
+                for sx in range(SAMPLES):
+                    x = min(frame.width - 1, (col * SAMPLES + sx) * frame.width // (cols * SAMPLES)) * 4
+                    sums[col] += line[x] + 2 * line[x + 1] + line[x + 2]
+        grid.append(sums)
+    return grid
+
+
+class Fingerprint:
+    """Perceptual hash and exact digest of a frame (see module docstring)."""
+
+    __slots__ = ('phash', 'digest', 'method')
+
+    def __init__(self, phash, digest, method):
+        self.phash = phash
+        self.digest = digest
+        self.method = method
+
+    def __repr__(self):
+        return f"<Fingerprint {self.phash:064x} {self.digest:08x} {self.method}>"
+
+    @classmethod
+    def of(cls, frame):
+        phash = 0
+        for row in _thumbnail(frame):
+            for left, right in zip(row, row[1:]):
+                phash = phash << 1 | (left > right)
+        digest = 0
+        for y in range(frame.height):
+            digest = zlib.crc32(frame.row(y), digest)
+        return cls(phash, digest, 'numpy' if HAS_NUMPY else 'sample')
+
+    def distance(self, other):
+        """Differing phash bits, or None if the hashes were computed differently."""
+        if other.method != self.method:
+            return None
+        return bin(self.phash ^ other.phash).count('1')
+
+
+class ScreenshotStore:
+    """The screenshot directory and its index (see module docstring)."""
+
+    def __init__(self, directory=None, keep=None, max_bytes=None):
+        self.directory = directory or screenshot_dir()
+        self.keep = keep if keep is not None else env_int('WINCONTROL_SHOTS_KEEP', DEFAULT_KEEP, 1)
+        self.max_bytes = (max_bytes if max_bytes is not None
+                          else env_number('WINCONTROL_SHOTS_MB', DEFAULT_MAX_MB) * 1024 * 1024)
+        os.makedirs(self.directory, exist_ok=True)
+        self.entries = deque()
+        self.total = 0
+        self._load()
+
+    def __repr__(self):
+        return f"<ScreenshotStore {len(self.entries)} files, {self.total} bytes>"
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _load(self, exclude=None):
+        """Read the index; exclude names a file being added (adopted too early if listed)."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)['entries']
+        except (OSError, ValueError, KeyError, TypeError):
+            entries = self._adopt()
+        if exclude is not None:
+            entries = [entry for entry in entries if entry['file'] != exclude]
+        self.entries = deque(entries)
+        self.total = sum(entry['bytes'] for entry in entries)
+
+    def _adopt(self):
+        """Index entries for screenshots saved before there was an index."""
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(PREFIX):
+                try:
+                    info = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                found.append((info.st_mtime, name, info.st_size))
+        return [{'file': name, 'bytes': size, 'time': mtime} for mtime, name, size in sorted(found)]
+
+    def _locked(self):
+        return file_lock(os.path.join(self.directory, LOCK_FILE))
+
+    def _save(self):
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'entries': list(self.entries)}, f)
+        os.replace(tmp, self.index_path)
+
+    def path(self, entry):
+        return os.path.join(self.directory, entry['file'])
+
+    def find(self, fingerprint, key, near=None):
+        """Newest entry with this key whose frame matches fingerprint, or None.
+
+        A match moves to the new end, so it is kept as if just saved.
+        """
+        if near is None:
+            near = env_int('WINCONTROL_SHOTS_NEAR', 0)
+        for entry in reversed(self.entries):
+            if entry.get('key') != key or 'phash' not in entry:
+                continue
+            stored = Fingerprint(int(entry['phash'], 16), entry['digest'], entry['method'])
+            distance = fingerprint.distance(stored)
+            if distance is None:
+                continue
+            same = distance == 0 and stored.digest == fingerprint.digest
+            if not (same or 0 < near and distance <= near):
+                continue
+            if os.path.exists(self.path(entry)) and self._touch(entry):
+                return entry
+        return None
+
+    def _touch(self, entry):
+        """Move entry to the new end of the index on disk; False if it was evicted meanwhile."""
+        with self._locked():
+            self._load()
+            for current in self.entries:
+                if current['file'] == entry['file']:
+                    self.entries.remove(current)
+                    self.entries.append(current)
+                    self._save()
+                    return True
+        return False
+
+    def new_name(self):
+        """File name (without extension) for a screenshot taken now."""
+        return f"{PREFIX}{int(time.time() * 1000)}"
+
+    def add(self, encoded, name=None, fingerprint=None, key=None):
+        """Write encoded to a new file, index it and evict the oldest; returns the entry."""
+        name = name or self.new_name()
+        entry = {'file': f"{name}.{encoded.extension}", 'bytes': len(encoded.data),
+                 'time': time.time(), 'width': encoded.width, 'height': encoded.height,
+                 'scale': encoded.scale}
+        if fingerprint is not None:
+            entry.update(phash=f"{fingerprint.phash:064x}", digest=fingerprint.digest,
+                         method=fingerprint.method, key=key)
+        with open(self.path(entry), 'wb') as f:
+            f.write(encoded.data)
+        with self._locked():
+            # Another process may have added or evicted since we loaded
+            self._load(exclude=entry['file'])
+            self.entries.append(entry)
+            self.total += entry['bytes']
+            # Never evict what was just written
+            while len(self.entries) > 1 and (len(self.entries) > self.keep
+                                             or self.total > self.max_bytes):
+                old = self.entries.popleft()
+                self.total -= old['bytes']
+                try:
+                    os.remove(self.path(old))
+                except OSError:
+                    pass
+            self._save()
+        return entry
@@ -0,0 +1,240 @@
+"""
+Snapshot engine - fetch a whole subtree's properties in one batched request
+
+Walking window.descendants() and calling window_text(), rectangle(),
+is_enabled()... on every node costs several cross-process COM calls per
+node. capture() instead asks the backend for all requested properties of
+the subtree at once (a UIA CacheRequest with BuildUpdatedCache on
+Windows) and returns plain in-memory Node records. Acting on a node
+(click, type) goes through node_wrapper(), which reuses the cached
+element without another search. tree.capture_tree() fills a compact
+columnar TreeSnapshot from the same fetch instead.
+
+walk() is the lazy alternative for callers that may stop early (output
+limits): it fetches one node's children per call and yields nodes in the
+same pre-order as capture(), so nothing below the stopping point is ever
+requested. It costs more calls than capture() for a full tree. A Budget
+bounds it by depth, node count and time and records which subtrees were
+cut short, by child-index path ("0.3.1"), so a follow-up walk can start
+at that path (root=).
+
+The batched fetch runs under the per-call deadline (deadline.py), so a
+hung window raises DeadlineExceeded instead of blocking forever.
+"""
+import time
+from .backend import get_backend
+from .deadline import DeadlineExceeded, call_timeout, call_with_timeout
+
+# Properties a capture can request. 'name' follows window_text() semantics:
+# the UIA Name, or the document text for controls exposing a TextPattern.
+PROPERTIES = ('name', 'control_type', 'rect', 'enabled', 'automation_id',
+              'class_name', 'runtime_id', 'value', 'toggle_state')
+
+BASIC = ('name', 'control_type', 'rect', 'enabled')
+
+
+class Node:
+    """One captured element. Unrequested properties are None."""
+
+    __slots__ = ('name', 'control_type', 'rect', 'enabled', 'automation_id', 'class_name',
+                 'runtime_id', 'value', 'toggle_state', 'depth', 'parent', 'element')
+
+    def __init__(self, depth=0, parent=-1, element=None, **props):
+        self.depth = depth
+        self.parent = parent
+        self.element = element
+        for prop in PROPERTIES:
+            setattr(self, prop, props.get(prop))
+
+    def __repr__(self):
+        return f"<Node {self.control_type} {self.name!r}>"
+
+    @property
+    def center(self):
+        if not self.rect:
+            return None
+        left, top, right, bottom = self.rect
+        return ((left + right) // 2, (top + bottom) // 2)
+
+
+class NodeBuilder:
+    """Default sink for backend.snapshot(): one Node per element."""
+
+    def __init__(self):
+        self.nodes = []
+
+    def add(self, depth, parent, element, values):
+        self.nodes.append(Node(depth=depth, parent=parent, element=element, **values))
+        return len(self.nodes) - 1
+
+    def result(self):
+        return self.nodes
+
+
+def capture(window, props=BASIC, backend=None):
+    """Snapshot every descendant of window (pre-order, root excluded).
+
+    Node.parent is the index of the parent node in the returned list, or
+    -1 for direct children of window.
+    """
+    backend = backend or get_backend()
+    unknown = set(props) - set(PROPERTIES)
+    if unknown:
+        raise ValueError(f"Unknown snapshot properties: {', '.join(sorted(unknown))}")
+    return call_with_timeout(backend.snapshot, call_timeout(), window, tuple(props))
+
+
+class Budget:
+    """Bounds for walk() and a record of what they cut off.
+
+    max_depth: nodes at this depth are returned but not expanded.
+    max_nodes: stop after this many nodes. time_budget: seconds for the
+    whole walk (also caps each provider call). truncated lists
+    {'path', 'name', 'type', 'reason', 'unread'} for every node whose
+    children were not (all) read; unread is the number of children left
+    out, or None if unknown.
+    """
+
+    def __init__(self, max_depth=None, max_nodes=None, time_budget=None):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.time_budget = time_budget
+        self.visited = 0
+        self.stopped = None
+        self.truncated = []
+
+    def any(self):
+        return self.max_depth is not None or self.max_nodes is not None \
+            or self.time_budget is not None
+
+    @property
+    def partial(self):
+        return bool(self.truncated)
+
+    def cut(self, path, node, reason, unread=None):
+        self.truncated.append({'path': path, 'name': node.name if node else None,
+                               'type': node.control_type if node else None,
+                               'reason': reason, 'unread': unread})
+
+    def summary(self):
+        """One line per truncated subtree, for text output."""
+        lines = []
+        for entry in self.truncated:
+            parts = ([f"[{entry['type']}]"] if entry['type'] else []) + ([entry['name']] if entry['name'] else [])
+            label = ' ' + ' '.join(parts) if parts else ''
+            unread = f"{entry['unread']} children" if entry['unread'] is not None else "children"
+            lines.append(f"  {entry['path'] or '(window)'}{label}: {unread} not read ({entry['reason']})")
+        return lines
+
+
+def path_key(path):
+    """Sort key putting child-index paths in tree order."""
+    return tuple(int(part) for part in path.split('.')) if path else ()
+
+
+def resolve_path(window, path, props, backend):
+    """Element at a child-index path ("0.3.1") below window, one call per step."""
+    element = None
+    for part in path.split('.'):
+        children = backend.children(window, props, element)
+        try:
+            element = children[int(part)][0]
+        except (ValueError, IndexError):
+            raise LookupError(f"No element at path '{path}'")
+    return element
+
+
+def walk(window, props=BASIC, backend=None, budget=None, root=None, expand=None):
+    """Yield the same Nodes as capture(), fetching children only as needed.
+
+    Closing the generator stops the walk; unvisited subtrees are never
+    fetched. Each children fetch runs under the per-call deadline. With a
+    Budget the walk also stops at its limits and records what it cut.
+    root is a child-index path to walk below instead of the window itself;
+    paths recorded in the budget are always relative to the window.
+    expand(node), called after node is yielded, can return False to skip
+    its subtree (query pruning); skipped subtrees are not budget cuts.
+    """
+    backend = backend or get_backend()
+    unknown = set(props) - set(PROPERTIES)
+    if unknown:
+        raise ValueError(f"Unknown snapshot properties: {', '.join(sorted(unknown))}")
+    props = tuple(props)
+    budget = budget or Budget()
+    timeout = call_timeout()
+    ends = time.monotonic() + budget.time_budget if budget.time_budget is not None else None
+
+    def children(element):
+        """Children of element, or None once the time budget is spent."""
+        limit = timeout
+        if ends is not None:
+            remaining = ends - time.monotonic()
+            if remaining <= 0:
+                return None
+            limit = remaining if limit is None else min(limit, remaining)
+        try:
+            return call_with_timeout(backend.children, limit, window, props, element)
+        except DeadlineExceeded:
+            if ends is not None and time.monotonic() >= ends:
+                return None
+            raise
+
+    def children_of(element, depth, index, node, path):
+        """Stack entries for element's children, recording any cut."""
+        kids = children(element)
+        if kids is None:
+            budget.stopped = 'time-budget'
+            budget.cut(path, node, 'time-budget')
+            return []
+        if budget.max_depth is not None and depth >= budget.max_depth:
+            if kids:
+                budget.cut(path, node, 'max-depth', len(kids))
+            return []
+        prefix = f"{path}." if path else ''
+        return [(child, values, depth + 1, index, node, f"{prefix}{position}")
+                for position, (child, values) in reversed(list(enumerate(kids)))]
+
+    top = call_with_timeout(resolve_path, timeout, window, root, props, backend) if root else None
+    stack = children_of(top, 0, -1, None, root or '')
+    index = 0
+    while stack:
+        if budget.stopped is None and budget.max_nodes is not None \
+                and budget.visited >= budget.max_nodes:
+            budget.stopped = 'max-nodes'
+        if budget.stopped is not None:
+            # Everything still pending is unread; report it per parent
+            pending = {}
+            for _, _, _, _, parent_node, path in stack:
+                parent_path = path.rpartition('.')[0]
+                count, _ = pending.get(parent_path, (0, None))
+                pending[parent_path] = (count + 1, parent_node)
+            for parent_path in sorted(pending, key=path_key):
+                count, parent_node = pending[parent_path]
+                budget.cut(parent_path, parent_node, budget.stopped, count)
+            return
+        element, values, depth, parent, _, path = stack.pop()
+        node = Node(depth=depth, parent=parent, element=element, **values)
+        budget.visited += 1
+        yield node
+        if expand is None or expand(node):
+            stack.extend(children_of(element, depth, index, node, path))
+        index += 1
+
+
+def read_nodes(window, props=BASIC, budget=None, root=None, backend=None):
+    """capture() when unbounded, else a bounded walk() (a lazy iterator)."""
+    if root or (budget is not None and budget.any()):
+        return walk(window, props, backend, budget, root)
+    return capture(window, props, backend)
+
+
+def node_wrapper(node, backend=None):
+    """Actionable wrapper (click(), type_keys(), ...) for a captured node."""
+    backend = backend or get_backend()
+    return backend.wrap_element(node.element)
+
+
+def rect_dict(rect):
+    """rect tuple -> the {'left', 'top', 'right', 'bottom'} dict used in script output."""
+    left, top, right, bottom = rect
+    return {'left': left, 'top': top, 'right': right, 'bottom': bottom}
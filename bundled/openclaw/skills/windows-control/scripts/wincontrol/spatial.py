@@ -0,0 +1,124 @@
+"""
+Spatial index - which elements are at a point or inside a region
+
+Grid buckets element rectangles into uniform cells (CELL pixels), so a
+hit test or region query only looks at the few rects registered in the
+cells it touches instead of comparing every rect of the window. Rects
+spanning more than MAX_CELLS cells (panes, documents, the window's big
+containers) are kept in a short separate list rather than copied into
+hundreds of cells.
+
+TreeSnapshot.grid() builds one over a captured tree on first use;
+element_at() finds the top-level window under a point (cheap Win32 rects,
+no UIA) and hit-tests its snapshot (a fresh cached one when there is one,
+see wincontrol.cache).
+"""
+from collections import defaultdict
+from . import cache
+from .backend import get_backend
+from .handles import element_id
+from .snapshot import BASIC, rect_dict
+from .windows import iter_window_entries
+
+CELL = 64
+MAX_CELLS = 256
+
+
+class Grid:
+    """Uniform grid over rectangles, keyed by any int (snapshot node index)."""
+
+    def __init__(self, cell=CELL):
+        self.cell = cell
+        self.cells = defaultdict(list)
+        self.large = []
+        self.rects = {}
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _span(self, left, top, right, bottom):
+        cell = self.cell
+        return (range(left // cell, (right - 1) // cell + 1),
+                range(top // cell, (bottom - 1) // cell + 1))
+
+    def add(self, key, rect):
+        left, top, right, bottom = rect
+        if right <= left or bottom <= top:
+            return
+        self.rects[key] = rect
+        columns, rows = self._span(left, top, right, bottom)
+        if len(columns) * len(rows) > MAX_CELLS:
+            self.large.append(key)
+            return
+        for cx in columns:
+            for cy in rows:
+                self.cells[(cx, cy)].append(key)
+
+    def at(self, x, y):
+        """Keys whose rect contains (x, y), in key order."""
+        rects = self.rects
+        candidates = self.cells.get((x // self.cell, y // self.cell), []) + self.large
+        return sorted(key for key in candidates
+                      if rects[key][0] <= x < rects[key][2] and rects[key][1] <= y < rects[key][3])
+
+    def within(self, region, partial=False):
+        """Keys whose rect lies inside region (or just intersects it), in key order."""
+        left, top, right, bottom = region
+        if right <= left or bottom <= top:
+            return []
+        columns, rows = self._span(left, top, right, bottom)
+        if len(columns) * len(rows) > len(self.cells):
+            candidates = set(self.rects)
+        else:
+            candidates = set(self.large)
+            for cx in columns:
+                for cy in rows:
+                    candidates.update(self.cells.get((cx, cy), ()))
+        found = []
+        for key in candidates:
+            l, t, r, b = self.rects[key]
+            if partial:
+                if l < right and r > left and t < bottom and b > top:
+                    found.append(key)
+            elif l >= left and t >= top and r <= right and b <= bottom:
+                found.append(key)
+        return sorted(found)
+
+
+def window_at(desktop, x, y):
+    """Topmost visible top-level window containing (x, y), or None."""
+    for entry in iter_window_entries(desktop):
+        rect = desktop.window_rect(entry.hwnd)
+        if rect and rect[0] <= x < rect[2] and rect[1] <= y < rect[3]:
+            return entry.wrapper(desktop)
+    return None
+
+
+def element_at(x, y, window=None, props=None, backend=None, hits=None):
+    """(window, tree, indices) for the point: the nodes containing it, innermost first.
+
+    window defaults to the top-level window under the point; it is None
+    (and so are the rest) if there is none. The tree may be a fresh cached
+    snapshot; its cache entry is then appended to hits.
+    """
+    backend = backend or get_backend()
+    window = window or window_at(backend, x, y)
+    if window is None:
+        return None, None, []
+    tree, entry = cache.snapshot(window, props or BASIC + ('runtime_id',), backend)
+    if entry is not None and hits is not None:
+        hits.append(entry)
+    return window, tree, tree.at(x, y)
+
+
+def describe_node(window, node):
+    """Output dict for a node: name, type, enabled, rect with center, id."""
+    info = {'name': (node.name or '').strip(), 'type': node.control_type,
+            'enabled': node.enabled if node.enabled is not None else True}
+    if node.rect:
+        info['rect'] = rect_dict(node.rect)
+        info['rect']['center_x'], info['rect']['center_y'] = node.center
+    handle = element_id(window, node)
+    if handle:
+        info['id'] = handle
+    return info
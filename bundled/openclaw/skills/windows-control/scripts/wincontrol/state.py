@@ -0,0 +1,82 @@
+"""
+Small on-disk state shared between script invocations (daemon address, etc.)
+Lives next to the screenshots in %TEMP% so it is per-user and disposable.
+"""
+import os
+import json
+import time
+from contextlib import contextmanager
+
+# How long file_lock() waits, and when a lock file counts as left by a crash
+LOCK_TIMEOUT = 5.0
+STALE_LOCK = 30.0
+
+
+def state_dir():
+    """Return (and create) the directory used for wincontrol state files."""
+    temp_dir = os.environ.get('TEMP', os.environ.get('TMP', '/tmp'))
+    path = os.path.join(temp_dir, 'openclaw-wincontrol')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def state_path(name):
+    return os.path.join(state_dir(), name)
+
+
+def load_json(name, default=None):
+    """Read a JSON state file, returning default if missing or unreadable."""
+    try:
+        with open(state_path(name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(name, data):
+    """Atomically write a JSON state file."""
+    path = state_path(name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    """Hold path as a lock file for the with block, across processes.
+
+    The file is created exclusively; while another process holds it we
+    wait up to timeout seconds (TimeoutError after that). A lock file
+    older than STALE_LOCK seconds was left by a crashed process and is
+    taken over.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except (FileExistsError, PermissionError):
+            try:
+                if time.time() - os.path.getmtime(path) > STALE_LOCK:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{path} is locked by another process")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def remove(name):
+    try:
+        os.remove(state_path(name))
+    except OSError:
+        pass
@@ -0,0 +1,250 @@
+"""
+Columnar tree snapshot - a captured UI tree as flat arrays instead of objects
+
+A Node (or a dict) per element costs a few hundred bytes of Python objects;
+a large browser page has tens of thousands of elements. TreeSnapshot keeps
+one compact array per property instead (parents, depths, control type
+ids, name ids, rects, flags) and stores every distinct string once in an
+interned string table, so repeated names ("", "Close", "Reply") cost an
+int per occurrence.
+
+Queries (select() by type, text and region) run over the arrays. Text
+matching is done once per distinct string, not once per node. Region
+queries and hit tests (at()) go through a spatial grid over the rects
+(spatial.py), built on first use. Dicts and
+JSON are only produced at the edge, for the elements actually output
+(to_dicts()).
+
+capture_tree() fills a TreeSnapshot straight from the backend's batched
+fetch, without creating intermediate Node objects.
+"""
+from array import array
+from .backend import get_backend
+from .deadline import call_timeout, call_with_timeout
+from .names import normalize
+from .snapshot import BASIC, PROPERTIES, Node
+
+FLAG_ENABLED = 1
+FLAG_ENABLED_KNOWN = 2
+FLAG_HAS_RECT = 4
+
+# Properties stored as string ids
+STRING_PROPS = ('automation_id', 'class_name', 'value')
+
+
+class StringTable:
+    """Interned strings: each distinct value stored once, referenced by id."""
+
+    __slots__ = ('strings', 'ids')
+
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, value):
+        """id for value (-1 for None)."""
+        if value is None:
+            return -1
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def get(self, string_id):
+        return self.strings[string_id] if string_id >= 0 else None
+
+
+class TreeSnapshot:
+    """A captured subtree in columnar form (pre-order, window itself excluded).
+
+    Node i has parents[i] (-1 for children of the window), depths[i],
+    type_ids[i] into types, name_ids[i] into strings, rects[4*i:4*i+4],
+    and flags[i] (FLAG_* bits). Live element references are kept in
+    elements so nodes stay actionable (see node()).
+    """
+
+    def __init__(self, props=BASIC, keep_elements=True):
+        self.props = tuple(props)
+        self.strings = StringTable()
+        self.types = StringTable()
+        self.parents = array('i')
+        self.depths = array('H')
+        self.type_ids = array('h')
+        self.name_ids = array('i')
+        self.rects = array('i')
+        self.flags = array('B')
+        self.columns = {prop: array('i') for prop in STRING_PROPS if prop in self.props}
+        self.toggle_states = array('b') if 'toggle_state' in self.props else None
+        self.runtime_ids = [] if 'runtime_id' in self.props else None
+        self.elements = [] if keep_elements else None
+        self._grid = None
+
+    def __len__(self):
+        return len(self.parents)
+
+    # --- building (backend snapshot sink) --------------------------------
+
+    def add(self, depth, parent, element, values):
+        self._grid = None
+        self.parents.append(parent)
+        self.depths.append(depth)
+        self.type_ids.append(self.types.intern(values.get('control_type')))
+        self.name_ids.append(self.strings.intern(values.get('name')))
+        rect = values.get('rect')
+        flags = 0
+        if rect:
+            self.rects.extend(rect)
+            flags |= FLAG_HAS_RECT
+        else:
+            self.rects.extend((0, 0, 0, 0))
+        enabled = values.get('enabled')
+        if enabled is not None:
+            flags |= FLAG_ENABLED_KNOWN | (FLAG_ENABLED if enabled else 0)
+        self.flags.append(flags)
+        for prop, column in self.columns.items():
+            column.append(self.strings.intern(values.get(prop)))
+        if self.toggle_states is not None:
+            state = values.get('toggle_state')
+            self.toggle_states.append(-1 if state is None else state)
+        if self.runtime_ids is not None:
+            self.runtime_ids.append(values.get('runtime_id'))
+        if self.elements is not None:
+            self.elements.append(element)
+        return len(self.parents) - 1
+
+    def result(self):
+        return self
+
+    # --- per-node access --------------------------------------------------
+
+    def name(self, i):
+        return self.strings.get(self.name_ids[i])
+
+    def control_type(self, i):
+        return self.types.get(self.type_ids[i])
+
+    def rect(self, i):
+        if not self.flags[i] & FLAG_HAS_RECT:
+            return None
+        return tuple(self.rects[4 * i:4 * i + 4])
+
+    def center(self, i):
+        if not self.flags[i] & FLAG_HAS_RECT:
+            return None
+        left, top, right, bottom = self.rects[4 * i:4 * i + 4]
+        return ((left + right) // 2, (top + bottom) // 2)
+
+    def enabled(self, i):
+        flags = self.flags[i]
+        return bool(flags & FLAG_ENABLED) if flags & FLAG_ENABLED_KNOWN else None
+
+    def get(self, i, prop):
+        """Any captured property of node i (None if not captured)."""
+        if prop == 'name':
+            return self.name(i)
+        if prop == 'control_type':
+            return self.control_type(i)
+        if prop == 'rect':
+            return self.rect(i)
+        if prop == 'enabled':
+            return self.enabled(i)
+        if prop in self.columns:
+            return self.strings.get(self.columns[prop][i])
+        if prop == 'toggle_state' and self.toggle_states is not None:
+            state = self.toggle_states[i]
+            return None if state < 0 else state
+        if prop == 'runtime_id' and self.runtime_ids is not None:
+            return self.runtime_ids[i]
+        return None
+
+    def node(self, i):
+        """Materialise node i as a Node (usable with snapshot.node_wrapper)."""
+        element = self.elements[i] if self.elements is not None else None
+        return Node(depth=self.depths[i], parent=self.parents[i], element=element,
+                    **{prop: self.get(i, prop) for prop in self.props})
+
+    # --- queries ----------------------------------------------------------
+
+    def grid(self):
+        """Spatial index over the node rects (spatial.Grid), built once."""
+        if self._grid is None:
+            from .spatial import Grid
+            grid = Grid()
+            rects = self.rects
+            for i, flags in enumerate(self.flags):
+                if flags & FLAG_HAS_RECT:
+                    grid.add(i, tuple(rects[4 * i:4 * i + 4]))
+            self._grid = grid
+        return self._grid
+
+    def at(self, x, y):
+        """Indices of nodes whose rect contains (x, y), innermost first.
+
+        Deeper nodes come first; among nodes at the same depth the later
+        one (drawn over its earlier siblings) wins.
+        """
+        return sorted(self.grid().at(x, y), key=lambda i: (self.depths[i], i), reverse=True)
+
+    def select(self, types=None, text=None, region=None, enabled=None, named=False,
+               contained=False):
+        """Indices of nodes matching every given filter, in tree order.
+
+        types: control type names. text: substring of the name, compared
+        normalized (names.normalize: case and full-width forms ignored).
+        region: (left, top, right, bottom); nodes whose rect intersects it
+        (lies inside it with contained=True). enabled: True/False. named:
+        non-empty name only.
+        """
+        candidates = range(len(self))
+        if types is not None:
+            type_ids = {self.types.ids[t] for t in types if t in self.types.ids}
+            candidates = [i for i, type_id in enumerate(self.type_ids) if type_id in type_ids]
+        if text is not None or named:
+            # Each distinct name is tested once, however many nodes share it
+            text_normal = normalize(text) if text is not None else ''
+            strings, name_ids, verdicts = self.strings.strings, self.name_ids, {}
+
+            def name_matches(name_id):
+                verdict = verdicts.get(name_id)
+                if verdict is None:
+                    value = strings[name_id] if name_id >= 0 else ''
+                    verdict = verdicts[name_id] = bool(value.strip()) and text_normal in normalize(value)
+                return verdict
+
+            candidates = [i for i in candidates if name_matches(name_ids[i])]
+        if region is not None:
+            in_region = set(self.grid().within(region, partial=not contained))
+            candidates = [i for i in candidates if i in in_region]
+        if enabled is not None:
+            candidates = [i for i in candidates if self.enabled(i) is enabled]
+        return list(candidates)
+
+    # --- output -----------------------------------------------------------
+
+    def to_dicts(self, indices=None, fields=None):
+        """Plain dicts for JSON output, only for the given nodes."""
+        fields = fields or self.props
+        indices = range(len(self)) if indices is None else indices
+        return [{field: self.get(i, field) for field in fields} for i in indices]
+
+    def nbytes(self):
+        """Approximate payload size of the arrays and string table."""
+        size = sum(a.itemsize * len(a) for a in (self.parents, self.depths, self.type_ids,
+                                                   self.name_ids, self.rects, self.flags))
+        size += sum(a.itemsize * len(a) for a in self.columns.values())
+        size += sum(len(s.encode('utf-8')) for s in self.strings.strings)
+        return size
+
+
+def capture_tree(window, props=BASIC, backend=None, keep_elements=True):
+    """capture(), but into a TreeSnapshot instead of a list of Nodes."""
+    backend = backend or get_backend()
+    unknown = set(props) - set(PROPERTIES)
+    if unknown:
+        raise ValueError(f"Unknown snapshot properties: {', '.join(sorted(unknown))}")
+    tree = TreeSnapshot(props, keep_elements=keep_elements)
+    return call_with_timeout(backend.snapshot, call_timeout(), window, tuple(props), tree)
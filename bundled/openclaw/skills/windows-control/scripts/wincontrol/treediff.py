@@ -0,0 +1,163 @@
+"""
+Tree diffing - fingerprint captured subtrees and report what changed
+
+fingerprint() turns a capture() node list into a TreeState: every node is
+keyed by its UIA runtime id and gets a Merkle-style hash over its own
+name and control type plus the hashes of its children (so child count
+and order are covered too). diff() walks two states top-down and skips
+any subtree whose hash is unchanged, so a cycle only looks at the parts
+of the window that actually changed.
+
+Both states come from full captures: diffing does not make the read
+incremental, the provider still returns the whole window in one batched
+call. What is saved is the per-node work on our side and, more
+importantly, the answer: which nodes appeared, changed or disappeared.
+
+States can be stored under a short token (see save_state/load_state) so
+separate script runs can ask "what changed since last time?".
+"""
+import os
+import glob
+import uuid
+import hashlib
+from . import state as state_files
+
+# Stored states kept on disk; older tokens expire
+MAX_STORED_STATES = 16
+
+
+def node_key(node, parent_key, position):
+    """Stable key for a node: its runtime id, else its path under the parent."""
+    if node.runtime_id:
+        return '.'.join(str(part) for part in node.runtime_id)
+    return f"{parent_key}/{position}"
+
+
+class TreeState:
+    """Fingerprinted snapshot: per-node name, type, subtree hash and children."""
+
+    __slots__ = ('names', 'types', 'hashes', 'children', 'roots')
+
+    def __init__(self, names=None, types=None, hashes=None, children=None, roots=None):
+        self.names = names or {}
+        self.types = types or {}
+        self.hashes = hashes or {}
+        self.children = children or {}
+        self.roots = roots or []
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def subtree(self, key):
+        """key and all of its descendants, pre-order."""
+        keys = []
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            keys.append(current)
+            stack.extend(reversed(self.children.get(current, ())))
+        return keys
+
+    def to_json(self):
+        return {'names': self.names, 'types': self.types, 'hashes': self.hashes,
+                'children': self.children, 'roots': self.roots}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data.get('names'), data.get('types'), data.get('hashes'),
+                   data.get('children'), data.get('roots'))
+
+
+def fingerprint(nodes):
+    """TreeState for a capture() result (needs 'name' and 'runtime_id').
+
+    Returns (state, keys) where keys[i] is the key of nodes[i].
+    """
+    state = TreeState()
+    keys = []
+    counts = {}
+    for node in nodes:
+        parent_key = keys[node.parent] if node.parent >= 0 else ''
+        position = counts.get(parent_key, 0)
+        counts[parent_key] = position + 1
+        key = node_key(node, parent_key, position)
+        keys.append(key)
+        state.names[key] = (node.name or '').strip()
+        state.types[key] = node.control_type or ''
+        if node.parent >= 0:
+            state.children.setdefault(parent_key, []).append(key)
+        else:
+            state.roots.append(key)
+
+    # Pre-order reversed: children are always hashed before their parent
+    for key in reversed(keys):
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(f"{key}\x00{state.types[key]}\x00{state.names[key]}".encode('utf-8', 'replace'))
+        for child in state.children.get(key, ()):
+            digest.update(state.hashes[child].encode('ascii'))
+        state.hashes[key] = digest.hexdigest()
+    return state, keys
+
+
+class Changes:
+    """Result of diff(): keys that appeared, changed (name) or were removed."""
+
+    def __init__(self):
+        self.appeared = []
+        self.changed = []
+        self.removed = []
+        self.visited = 0
+
+    def __bool__(self):
+        return bool(self.appeared or self.changed or self.removed)
+
+    def __repr__(self):
+        return (f"<Changes +{len(self.appeared)} ~{len(self.changed)} -{len(self.removed)}"
+                f" visited={self.visited}>")
+
+
+def diff(old, new):
+    """Compare two TreeStates, descending only into subtrees whose hash differs."""
+    changes = Changes()
+    stack = [(old.roots, new.roots)]
+    while stack:
+        old_keys, new_keys = stack.pop()
+        for key in old_keys:
+            if key not in new.hashes:
+                changes.removed.extend(old.subtree(key))
+        for key in new_keys:
+            changes.visited += 1
+            if key not in old.hashes:
+                changes.appeared.extend(new.subtree(key))
+                continue
+            if old.hashes[key] == new.hashes[key]:
+                continue
+            if old.names.get(key) != new.names[key]:
+                changes.changed.append(key)
+            stack.append((old.children.get(key, []), new.children.get(key, [])))
+    return changes
+
+
+# --- tokens ---------------------------------------------------------------
+
+def save_state(tree_state, owner=''):
+    """Store a TreeState and return its token. owner ties it to a window."""
+    token = uuid.uuid4().hex[:12]
+    state_files.save_json(f"tree-{token}.json", {'owner': owner, 'state': tree_state.to_json()})
+    stored = sorted(glob.glob(state_files.state_path('tree-*.json')), key=os.path.getmtime)
+    for path in stored[:-MAX_STORED_STATES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return token
+
+
+def load_state(token, owner=''):
+    """TreeState stored under token, or None if unknown, expired or for another window."""
+    if not token.isalnum():
+        return None
+    data = state_files.load_json(f"tree-{token}.json")
+    if not data or data.get('owner', '') != owner:
+        return None
+    return TreeState.from_json(data.get('state', {}))
@@ -0,0 +1,236 @@
+"""
+Wait engine - wake on UI Automation events, poll with backoff as a fallback
+
+wait_for() re-checks its conditions whenever the backend reports a
+relevant change (window opened, structure changed, Name/Value/text
+changed) instead of sleeping a fixed 500 ms between full re-scans. The
+subscription covers the desktop plus the windows the conditions name, and
+windows that appear later are added as soon as they exist.
+
+If events are unavailable (subscription fails) conditions are polled with
+an adaptive backoff: quick checks right after the wait starts, slowing
+down to one per second. Even with events a slow safety re-check runs, so
+a missed event only costs latency, never the result.
+
+Text conditions keep the previous capture of their window and diff
+against it (treediff.py), so a re-check only searches nodes that
+appeared or changed since the last cycle. The re-read itself is not
+incremental: it is one batched capture of the whole window. The event
+handlers are not told which element changed, so there is no subtree to
+re-read on its own. What is saved is the re-read of quiet windows: with
+events a window is captured again only once it has reported a change
+(WindowEvents), or on the safety re-check. Without events every check
+captures each matching window.
+
+Conditions combine with mode='any' (first one wins) or mode='all' (each
+must have been met; a met condition stays met).
+"""
+import time
+import threading
+from .snapshot import capture
+from .treediff import diff, fingerprint
+from .windows import find_window, find_windows
+
+FIRST_INTERVAL = 0.05
+MAX_INTERVAL = 1.0
+BACKOFF = 1.6
+# Re-check this often even when events are flowing (missed events)
+EVENT_RECHECK = 2.0
+# Minimum gap between checks, so a chatty window cannot keep us busy
+MIN_GAP = 0.05
+# Captured for text conditions (runtime ids key the cycle-to-cycle diff)
+DIFF_PROPS = ('name', 'control_type', 'runtime_id')
+
+
+class Condition:
+    """Something to wait for.
+
+    check(desktop) returns a truthy result once satisfied, else None.
+    watch(desktop) returns windows whose subtree changes are relevant.
+    With events=True check is called as check(desktop, events), where
+    events is the wait's WindowEvents (None while polling).
+    """
+
+    def __init__(self, label, check, watch=None, events=False):
+        self.label = label
+        self.check = check
+        self.watch = watch or (lambda desktop: [])
+        self.events = events
+
+    def __repr__(self):
+        return f"<Condition {self.label}>"
+
+
+class WindowEvents:
+    """Change events seen per watched window during one wait_for().
+
+    version(hwnd) changes whenever the window reports a change and on
+    every safety re-check (including the last check before the timeout),
+    so a condition that saw the same version last time knows the window
+    has nothing new.
+    """
+
+    def __init__(self, subscription, wake):
+        self.subscription = subscription
+        self.wake = wake
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.sweeps = 0
+
+    def watch(self, window):
+        hwnd = window.handle
+        with self.lock:
+            if hwnd in self.counts:
+                return
+            self.counts[hwnd] = 0
+
+        def changed():
+            with self.lock:
+                self.counts[hwnd] += 1
+            self.wake()
+
+        try:
+            self.subscription.watch(window, changed)
+        except Exception:
+            with self.lock:
+                del self.counts[hwnd]
+            raise
+
+    def sweep(self):
+        """Safety re-check: treat every window as changed."""
+        with self.lock:
+            self.sweeps += 1
+
+    def version(self, hwnd):
+        """Opaque change counter for hwnd, or None if it is not watched."""
+        with self.lock:
+            count = self.counts.get(hwnd)
+            return None if count is None else (self.sweeps, count)
+
+
+def window_exists(title):
+    return Condition(f"window '{title}'", lambda desktop: find_window(desktop, title))
+
+
+def text_in_window(text, window_title):
+    """Text (substring, case-insensitive) shown by any control of a matching window.
+
+    The result is (node, how) with how = 'present' (there at the first
+    check), 'appeared' or 'changed'. Each check re-captures the whole
+    window, diffs it against the previous capture and searches only the
+    nodes that appeared or changed. A watched window with no change
+    event since its last capture is not captured again.
+    """
+    text_lower = text.lower()
+    previous = {}
+    versions = {}
+
+    def check(desktop, events=None):
+        for window in find_windows(desktop, window_title):
+            hwnd = window.handle
+            # Read before the capture: an event during it forces the next one
+            version = events.version(hwnd) if events is not None else None
+            if version is not None and versions.get(hwnd) == version:
+                continue
+            nodes = capture(window, DIFF_PROPS, desktop)
+            state, keys = fingerprint(nodes)
+            old = previous.get(hwnd)
+            previous[hwnd] = state
+            versions[hwnd] = version
+            if old is None:
+                candidates = ((node, 'present') for node in nodes)
+            else:
+                changes = diff(old, state)
+                how = dict.fromkeys(changes.appeared, 'appeared')
+                how.update(dict.fromkeys(changes.changed, 'changed'))
+                candidates = ((node, how[key]) for node, key in zip(nodes, keys) if key in how)
+            for node, reason in candidates:
+                if node.name and text_lower in node.name.lower():
+                    return node, reason
+        return None
+
+    return Condition(f"text '{text}' in '{window_title}'", check,
+                     lambda desktop: find_windows(desktop, window_title), events=True)
+
+
+class WaitResult:
+    """Outcome of wait_for(): ok, per-condition results, elapsed seconds, wake source."""
+
+    def __init__(self, ok, results, elapsed, events):
+        self.ok = ok
+        self.results = results
+        self.elapsed = elapsed
+        self.events = events
+
+    def met(self, conditions):
+        """Conditions that were satisfied."""
+        return [c for c, r in zip(conditions, self.results) if r is not None]
+
+
+def subscribe(desktop, callback):
+    """Event subscription from the backend, or None to fall back to polling."""
+    try:
+        return desktop.subscribe(callback)
+    except Exception:
+        return None
+
+
+def wait_for(desktop, conditions, mode='any', timeout=30.0):
+    """Block until any/all conditions are met or timeout seconds pass."""
+    if mode not in ('any', 'all'):
+        raise ValueError(f"Unknown wait mode '{mode}'")
+    done = any if mode == 'any' else all
+    results = [None] * len(conditions)
+    start = time.monotonic()
+    deadline = start + timeout
+    wake = threading.Event()
+    subscription = subscribe(desktop, wake.set)
+    events = WindowEvents(subscription, wake.set) if subscription is not None else None
+    interval = FIRST_INTERVAL
+    last_check = 0.0
+    try:
+        while True:
+            wake.clear()
+            last_check = time.monotonic()
+            if subscription is not None:
+                # Before checking, so no change between capture and subscription is missed
+                for i, condition in enumerate(conditions):
+                    if results[i] is None:
+                        try:
+                            for window in condition.watch(desktop):
+                                events.watch(window)
+                        except Exception:
+                            pass
+            for i, condition in enumerate(conditions):
+                if results[i] is not None:
+                    continue
+                try:
+                    if condition.events:
+                        results[i] = condition.check(desktop, events) or None
+                    else:
+                        results[i] = condition.check(desktop) or None
+                except Exception:
+                    results[i] = None
+            if done(r is not None for r in results):
+                return WaitResult(True, results, time.monotonic() - start, subscription is not None)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return WaitResult(False, results, time.monotonic() - start, subscription is not None)
+
+            if subscription is not None:
+                if not wake.wait(min(EVENT_RECHECK, remaining)):
+                    events.sweep()
+            else:
+                wake.wait(min(interval, remaining))
+                interval = min(interval * BACKOFF, MAX_INTERVAL)
+
+            gap = MIN_GAP - (time.monotonic() - last_check)
+            if gap > 0:
+                time.sleep(min(gap, max(0.0, deadline - time.monotonic())))
+    finally:
+        if subscription is not None:
+            try:
+                subscription.close()
+            except Exception:
+                pass
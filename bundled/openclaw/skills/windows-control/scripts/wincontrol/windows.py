@@ -0,0 +1,236 @@
+"""
+Top-level window lookup shared by the scripts
+
+Windows are resolved through a process-wide index keyed by hwnd. Building
+the index only uses cheap in-process Win32 calls (EnumWindows,
+GetWindowText, GetClassName) instead of one cross-process UIA
+window_text() per window, and the hwnds that matched a selector are
+remembered (for the MAX_SELECTORS most recent selectors). Resolving the
+same selector's first match again walks the current z-order (EnumWindows
+plus a GetWindowText per window) only down to the remembered hwnd: it is
+returned if no window above it is new, retitled or now matching,
+otherwise the index is rebuilt. The index lives as long as the process,
+i.e. across every command served by the daemon.
+
+Window filters accept these selector forms:
+    Notepad                 title contains (case-insensitive) - the default
+    exact:Untitled - Notepad  title equals
+    prefix:Untitled         title starts with (case-insensitive)
+    regex:^.* - Notepad$    regular expression search (case-insensitive)
+    process:chrome.exe      owning process name (".exe" optional)
+    class:#32770            window class name
+    sel:Window[process=notepad][name^=Untitled]
+                            the Window step of an element selector (query.py)
+"""
+import re
+import time
+from collections import OrderedDict
+
+SELECTOR_KINDS = ('exact', 'prefix', 'regex', 'process', 'class', 'sel')
+# Selectors whose matches are remembered (least recently used dropped)
+MAX_SELECTORS = 64
+
+
+class Selector:
+    """A parsed window filter."""
+
+    def __init__(self, kind, value):
+        self.kind = kind
+        self.value = value
+        self.key = f"{kind}:{value}"
+        self._lower = value.lower()
+        if kind == 'regex':
+            try:
+                self._pattern = re.compile(value, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Bad window filter 'regex:{value}': {e}") from None
+        elif kind == 'process' and not self._lower.endswith('.exe'):
+            self._lower += '.exe'
+        elif kind == 'sel':
+            from .query import QueryError, compile_query
+            self._step = compile_query(value).window
+            if self._step is None:
+                raise QueryError(f"Window filter 'sel:{value}' needs a leading Window[...] step")
+
+    def __repr__(self):
+        return f"Selector({self.key!r})"
+
+    def matches(self, entry, desktop=None):
+        """Check a WindowEntry; process names are looked up lazily."""
+        if self.kind == 'contains':
+            return self._lower in entry.title.lower()
+        if self.kind == 'exact':
+            return entry.title == self.value
+        if self.kind == 'prefix':
+            return entry.title.lower().startswith(self._lower)
+        if self.kind == 'regex':
+            return bool(self._pattern.search(entry.title))
+        if self.kind == 'class':
+            return entry.class_name == self.value
+        if self.kind == 'process':
+            return (entry.process_name(desktop) or '').lower() == self._lower
+        if self.kind == 'sel':
+            return self._step.matches_entry(entry, desktop)
+        return False
+
+
+def parse_selector(spec):
+    """Parse a window filter string (or pass a Selector through)."""
+    if isinstance(spec, Selector):
+        return spec
+    kind, sep, value = spec.partition(':')
+    if sep and kind in SELECTOR_KINDS:
+        return Selector(kind, value)
+    return Selector('contains', spec)
+
+
+class WindowEntry:
+    """Cached facts about one top-level window."""
+
+    __slots__ = ('hwnd', 'title', 'class_name', 'pid', '_process', '_wrapper', 'checked')
+
+    def __init__(self, hwnd, title, class_name, pid):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.pid = pid
+        self._process = None
+        self._wrapper = None
+        self.checked = time.monotonic()
+
+    def process_name(self, desktop):
+        if self._process is None and desktop is not None:
+            self._process = desktop.process_name(self.pid) or ''
+        return self._process
+
+    def wrapper(self, desktop):
+        """UIA wrapper for this hwnd, created once and reused."""
+        if self._wrapper is None:
+            self._wrapper = desktop.wrap(self.hwnd)
+        return self._wrapper
+
+
+class WindowIndex:
+    """hwnd -> WindowEntry, plus the last resolution of each selector."""
+
+    def __init__(self):
+        self.entries = {}
+        self.order = []
+        self.hits = OrderedDict()
+        self.stats = {'hits': 0, 'refreshes': 0}
+
+    def refresh(self, desktop):
+        """Re-enumerate top-level windows with cheap Win32 calls."""
+        entries = {}
+        order = desktop.top_level_handles()
+        for hwnd in order:
+            title = desktop.window_title(hwnd)
+            entry = self.entries.get(hwnd)
+            if entry is None or entry.title != title:
+                old = entry
+                entry = WindowEntry(hwnd, title, desktop.window_class(hwnd), desktop.window_pid(hwnd))
+                if old is not None and old.pid == entry.pid:
+                    # Same window, new title: keep the UIA wrapper and process name
+                    entry._wrapper, entry._process = old._wrapper, old._process
+            entry.checked = time.monotonic()
+            entries[hwnd] = entry
+        self.entries = entries
+        self.order = order
+        self.stats['refreshes'] += 1
+
+    def cached_first(self, desktop, selector):
+        """The selector's previous first match if it is still the top-most one, else None."""
+        hits = self.hits.get(selector.key)
+        if not hits:
+            return None
+        self.hits.move_to_end(selector.key)
+        for hwnd in desktop.top_level_handles():
+            entry = self.entries.get(hwnd)
+            if entry is None or desktop.window_title(hwnd) != entry.title:
+                # A new or retitled window above the hit may match now
+                return None
+            if hwnd == hits[0]:
+                return entry if selector.matches(entry, desktop) else None
+            if selector.matches(entry, desktop):
+                return None
+        return None
+
+    def resolve(self, desktop, spec, first=False):
+        """Wrappers of windows matching spec, in z-order.
+
+        With first=True the selector's previous first match is returned
+        without rebuilding the index while it is still the top-most match.
+        """
+        selector = parse_selector(spec)
+        if first:
+            entry = self.cached_first(desktop, selector)
+            if entry is not None:
+                entry.checked = time.monotonic()
+                self.stats['hits'] += 1
+                return [entry.wrapper(desktop)]
+
+        self.refresh(desktop)
+        matches = [self.entries[h] for h in self.order if selector.matches(self.entries[h], desktop)]
+        self.hits[selector.key] = [e.hwnd for e in matches]
+        self.hits.move_to_end(selector.key)
+        while len(self.hits) > MAX_SELECTORS:
+            self.hits.popitem(last=False)
+        if first:
+            matches = matches[:1]
+        wrappers = []
+        for entry in matches:
+            try:
+                wrappers.append(entry.wrapper(desktop))
+            except Exception:
+                continue
+        return wrappers
+
+    def forget(self, hwnd):
+        self.entries.pop(hwnd, None)
+
+
+_index = WindowIndex()
+
+
+def get_index():
+    return _index
+
+
+def find_windows(desktop, title=None):
+    """All top-level windows matching a window filter (see module docstring).
+
+    With no filter, returns every top-level window in z-order.
+    """
+    if not title:
+        return desktop.windows()
+    return _index.resolve(desktop, title)
+
+
+def iter_window_entries(desktop, title=None, skip_untitled=False):
+    """Lazily yield WindowEntry records of matching windows in z-order.
+
+    No UIA wrapper is created here, so a scan that stops early (or runs
+    the per-window work elsewhere, see scan.py) never touches the
+    remaining windows.
+    """
+    selector = parse_selector(title) if title else None
+    _index.refresh(desktop)
+    for hwnd in list(_index.order):
+        entry = _index.entries[hwnd]
+        if skip_untitled and not entry.title:
+            continue
+        if selector is not None and not selector.matches(entry, desktop):
+            continue
+        yield entry
+
+
+def find_window(desktop, title):
+    """First top-level window matching a window filter, or None."""
+    matches = _index.resolve(desktop, title, first=True)
+    return matches[0] if matches else None
+
+
+def window_titles(desktop):
+    """Non-empty titles of all top-level windows (for 'Available windows' hints)."""
+    _index.refresh(desktop)
+    return [_index.entries[h].title for h in _index.order if _index.entries[h].title]